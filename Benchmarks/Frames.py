@@ -0,0 +1,223 @@
+"""
+Headless end-to-end frame benchmark: boots Game with SDL's dummy video driver, opens AppState on a generated
+database and replays scripted interactions through the event queue, timing update and render of every frame.
+Prints (or writes with --out) the p50/p95/p99 of the frame times of every scenario, in milliseconds, as JSON.
+
+    python Benchmarks/Frames.py --freezers 5 --boxes 12 --cells 100 --out frames.json
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame as p
+
+from Benchmarks.Inventory import generate
+from Game import Game
+from States.AppState import AppState
+from UI.Button import TextButton
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile, q from 0 to 100.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summary(times: list[float]) -> dict:
+    """
+    Statistics in milliseconds of a list of times in seconds.
+    """
+    return {"frames": len(times),
+            "p50": round(percentile(times, 50) * 1000, 3),
+            "p95": round(percentile(times, 95) * 1000, 3),
+            "p99": round(percentile(times, 99) * 1000, 3),
+            "max": round(max(times) * 1000, 3)}
+
+
+def find_button(canvas, text: str) -> TextButton | None:
+    """
+    Returns the first visible TextButton with the given text under canvas.
+    """
+    for child in canvas.children:
+        if isinstance(child, TextButton) and child.text == text and child.visible:
+            return child
+        found = find_button(child, text)
+        if found is not None:
+            return found
+    return None
+
+
+class FrameDriver:
+    """
+    Runs the frames of a game one by one (like Game.game_loop, without waiting between them), posting the
+    events of a scripted interaction before a frame and timing its update and render.
+    """
+    def __init__(self, game: Game):
+        self.game = game
+        self.update_times: list[float] = []
+        self.render_times: list[float] = []
+
+    def reset(self):
+        self.update_times, self.render_times = [], []
+
+    def frame(self, events=()):
+        for event in events:
+            p.event.post(event)
+        game = self.game
+        game.get_dt()
+        game.get_events()
+        start = time.perf_counter()
+        game.update()
+        updated = time.perf_counter()
+        game.render()
+        end = time.perf_counter()
+        if game.metrics is not None:
+            game.metrics.on_frame(end - start)
+        self.update_times.append(updated - start)
+        self.render_times.append(end - updated)
+
+    def frames(self, n: int):
+        for _ in range(n):
+            self.frame()
+
+    def move(self, pos):
+        self.frame([p.event.Event(p.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))])
+
+    def click(self, pos):
+        self.move(pos)
+        self.frame([p.event.Event(p.MOUSEBUTTONDOWN, pos=pos, button=1)])
+        self.frame([p.event.Event(p.MOUSEBUTTONUP, pos=pos, button=1)])
+
+    def sweep(self, points):
+        """
+        Moves the pointer through points, a frame per point (e.g. hovering over a grid).
+        """
+        for point in points:
+            self.move(point)
+
+    def type(self, text: str):
+        for char in text:
+            self.frame([p.event.Event(p.KEYDOWN, key=ord(char), mod=0, unicode=char, scancode=0)])
+            self.frame([p.event.Event(p.KEYUP, key=ord(char), mod=0, unicode=char, scancode=0)])
+
+    def wheel(self, pos, y: int, times: int = 1):
+        self.move(pos)
+        for _ in range(times):
+            self.frame([p.event.Event(p.MOUSEWHEEL, x=0, y=y, flipped=False)])
+
+
+# Scenarios: scenario(driver, app, frames), they run in this order, each one starting where the previous ended
+
+def idle(driver: FrameDriver, app: AppState, frames: int):
+    driver.frames(frames)
+
+
+def open_freezer(driver: FrameDriver, app: AppState, frames: int):
+    freezer = next(iter(app.freezers.values()))
+    driver.click(freezer.btn.rect.center)
+    grid = app.box_grid
+    cells = [grid.cell_rect(row, col).center for row in range(grid.rows) for col in range(grid.cols)]
+    driver.sweep((cells * (frames // len(cells) + 1))[:frames])
+
+
+def open_box(driver: FrameDriver, app: AppState, frames: int):
+    driver.click(app.box_grid.cell_rect(0, 0).center)
+    for _ in range(max(1, frames // 20)):
+        driver.wheel(app.cell_list.rect.center, -3, times=5)
+        driver.wheel(app.cell_list.rect.center, 3, times=5)
+
+
+def search(driver: FrameDriver, app: AppState, frames: int):
+    driver.click(app.search_bar.rect.center)
+    driver.type("HeLa")
+    driver.click(app.search_btn.rect.center)
+    driver.wheel(app.result_list.rect.center, -1, times=frames // 2)
+    driver.click((5, app.game.GAME_H - 5))
+    app.destroy_result_panel()
+    driver.frames(2)
+
+
+def add_box(driver: FrameDriver, app: AppState, frames: int):
+    driver.click(find_button(app.box_panel, "Aggiungi scatola").rect.center)
+    dialog = app.game.state_stack.top()
+    grid = dialog.grid
+    cells = [grid.cell_rect(row, col).center for row in range(grid.rows) for col in range(grid.cols)]
+    driver.sweep(cells[:frames])
+    driver.click(grid.cell_rect(1, 1).center)
+    driver.click(find_button(dialog.ci.canvas, "Annulla").rect.center)
+    driver.click(find_button(dialog.canvas, "Annulla").rect.center)
+    driver.frames(2)
+
+
+SCENARIOS = {"idle": idle, "open_freezer": open_freezer, "open_box": open_box, "search": search, "add_box": add_box}
+
+
+def run(db_path: str, frames: int = 60, scenarios=None) -> dict:
+    """
+    Runs the scenarios on a new game and AppState.
+    :param db_path: the database opened by AppState
+    :param frames: about how many frames every scenario lasts
+    :param scenarios: names of the scenarios to run, None for all of them
+    :return: {scenario: {"update": stats, "render": stats, "frame": stats}}
+    """
+    game = Game(ROOT)
+    game.dirty_rendering = True
+    game.db_path = db_path
+    app = AppState(game)
+    game.load_state(app)
+    driver = FrameDriver(game)
+    driver.frames(3)
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        if scenarios is not None and name not in scenarios:
+            continue
+        driver.reset()
+        scenario(driver, app, frames)
+        results[name] = {"update": summary(driver.update_times),
+                         "render": summary(driver.render_times),
+                         "frame": summary([u + r for u, r in zip(driver.update_times, driver.render_times)])}
+    app.con.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--freezers", type=int, default=5)
+    parser.add_argument("--boxes", type=int, default=12, help="boxes per freezer")
+    parser.add_argument("--cells", type=int, default=100, help="cells per box")
+    parser.add_argument("--frames", type=int, default=60, help="frames per scenario (about)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--db", help="use this database instead of generating one")
+    parser.add_argument("--out", help="write the JSON here instead of printing it")
+    args = parser.parse_args()
+
+    # The prints of the app go to stderr, stdout is for the report
+    with tempfile.TemporaryDirectory() as work, contextlib.redirect_stdout(sys.stderr):
+        db_path = args.db or generate(os.path.join(work, "celle.db"), args.freezers, args.boxes, args.cells)
+        report = {"database": {"freezers": args.freezers, "boxes_per_freezer": args.boxes, "cells_per_box": args.cells}
+                  if not args.db else args.db,
+                  "scenarios": run(db_path, args.frames, args.scenario)}
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Generates a celle.db with a lab-sized inventory, to reproduce large databases.
+
+    python Benchmarks/Inventory.py big.db --freezers 10 --boxes 100 --cells 100
+    python Benchmarks/Inventory.py big.db --copy-of celle.db --cells 150    # the real rows plus the generated ones
+"""
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sqlite3
+
+# Same tables of celle.db (AppState.init, plus the riga/colonna columns added later, see CelleDbConn.session.sql)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS freezers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT
+);
+CREATE TABLE IF NOT EXISTS scatole (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    in_freezer INTEGER NOT NULL,
+    nome TEXT,
+    FOREIGN KEY (in_freezer) REFERENCES freezers(id)
+);
+CREATE TABLE IF NOT EXISTS celle (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    in_scatola INTEGER NOT NULL,
+    in_freezer INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    data TEXT NOT NULL,
+    descrizione TEXT NOT NULL,
+    riga INTEGER,
+    colonna INTEGER,
+    FOREIGN KEY (in_scatola) REFERENCES scatole(id),
+    FOREIGN KEY (in_freezer) REFERENCES freezers(id)
+);
+"""
+
+# Positions in a box (see AddBoxDialogState)
+BOX_ROWS = 10
+BOX_COLS = 15
+
+# Cell lines, most used first: the k-th is used about 1/k as often as the first
+TIPI = ("HeLa", "HEK293", "CHO", "fibroblasti", "Jurkat", "MCF-7", "A549", "U2OS", "SH-SY5Y", "NIH-3T3",
+        "cheratinociti", "linfociti", "HepG2", "Vero", "THP-1", "PC12")
+TIPI_WEIGHTS = tuple(1 / (rank + 1) for rank in range(len(TIPI)))
+# Most cells have no description
+DESCRIZIONI = ("", "", "", "", "", "", "DMSO 10%", "congelate in FBS + DMSO", "da scongelare per prime",
+               "contaminazione sospetta", "trasfettate", "clone selezionato")
+# Boxes are filled between these dates, more of them in the last years
+FIRST_DAY = datetime.date(2015, 1, 1)
+LAST_DAY = datetime.date(2024, 12, 31)
+
+
+def box_cells(rng: random.Random, box_id: int, freezer_id: int, count: int):
+    """
+    The rows of the cells of a box: most of them of the same cell line, frozen within a few weeks and placed
+    from the first position on, with the gaps left by the vials taken out since.
+    """
+    capacity = BOX_ROWS * BOX_COLS
+    count = min(count, capacity)
+    # Positions taken: the first count + gaps ones, minus the gaps
+    span = min(capacity, count + rng.randint(0, count // 5))
+    positions = sorted(rng.sample(range(span), count))
+    main_tipo = rng.choices(TIPI, TIPI_WEIGHTS)[0]
+    # Triangular towards LAST_DAY: the inventory grows over the years
+    start = FIRST_DAY + datetime.timedelta(days=int(rng.triangular(0, (LAST_DAY - FIRST_DAY).days,
+                                                                   (LAST_DAY - FIRST_DAY).days)))
+    for position in positions:
+        tipo = main_tipo if rng.random() < 0.8 else rng.choices(TIPI, TIPI_WEIGHTS)[0]
+        day = start + datetime.timedelta(days=rng.randint(0, 30))
+        riga, colonna = divmod(position, BOX_COLS)
+        yield (box_id, freezer_id, f"cella {tipo} p{rng.randint(2, 40)}", tipo, day.strftime("%d.%m.%y"),
+               rng.choice(DESCRIZIONI), riga, colonna)
+
+
+def generate(path: str, freezers: int = 5, boxes_per_freezer: int = 10, cells_per_box: int = 50,
+             seed: int = 0, copy_of: str | None = None) -> str:
+    """
+    Writes a celle.db with the given number of freezers, boxes and cells, replacing the file if it exists.
+    :param path: where to write the database
+    :param cells_per_box: cells in every box, at most BOX_ROWS * BOX_COLS
+    :param seed: seed of the random values, the same arguments always give the same database
+    :param copy_of: a database (e.g. the real celle.db) copied before adding the generated rows
+    :return: path
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    if copy_of is not None:
+        shutil.copyfile(copy_of, path)
+    con = sqlite3.connect(path)
+    # A generated copy: nothing to lose if the machine crashes while it is written
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+    con.executescript(SCHEMA)
+    for f in range(freezers):
+        freezer_id = con.execute("INSERT INTO freezers (nome) VALUES (?)", (f"Freezer {f + 1}",)).lastrowid
+        for b in range(boxes_per_freezer):
+            box_id = con.execute("INSERT INTO scatole (in_freezer, nome) VALUES (?, ?)",
+                                 (freezer_id, f"Scatola {b + 1}")).lastrowid
+            con.executemany(
+                """INSERT INTO celle (in_scatola, in_freezer, nome, tipo, data, descrizione, riga, colonna)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                box_cells(rng, box_id, freezer_id, cells_per_box))
+    con.commit()
+    con.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="the database to write")
+    parser.add_argument("--freezers", type=int, default=5)
+    parser.add_argument("--boxes", type=int, default=10, help="boxes per freezer")
+    parser.add_argument("--cells", type=int, default=50, help=f"cells per box, at most {BOX_ROWS * BOX_COLS}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--copy-of", help="start from a copy of this database")
+    args = parser.parse_args()
+    generate(args.path, args.freezers, args.boxes, args.cells, args.seed, args.copy_of)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Headless microbenchmarks of the UI and animation primitives, every one at a few sizes to show how it scales.
+Prints the time of a call of every benchmark at every size; --save stores them as the baseline, --compare
+flags the ones that got slower than the baseline by more than --threshold (and exits with 1 if any did).
+
+    python Benchmarks/Micro.py --save                  # on the commit to compare against
+    python Benchmarks/Micro.py --compare               # after the change
+    python Benchmarks/Micro.py --only tween_update --only stack_push_pop
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame as p
+
+from Game import Game
+from Generic.Stack import Stack
+from Tween.Tween import TweenManager
+from UI.Abstract import UICanvas, UIContainer
+from UI.Entry import Entry
+from UI.Grid import UIGrid
+from Utils import Draw, Image, Text
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+
+
+# Benchmarks: setup(game, n) returns the function that is timed, which must leave things as it found them
+
+def draw_rect_alpha(game: Game, n: int):
+    """
+    A translucent rounded n x n rect (the shape comes from the cache after the first call).
+    """
+    surface = p.Surface((n + 10, n + 10))
+    rect = p.Rect(5, 5, n, n)
+    return lambda: Draw.draw_rect_alpha(surface, (40, 40, 40, 200), rect, corner_radius=10)
+
+
+def draw_centered_text(game: Game, n: int):
+    """
+    A text of n characters (rendered once, then from the text cache).
+    """
+    surface = p.Surface((game.GAME_W, 100))
+    rect = surface.get_rect()
+    text = ("cella HeLa " * n)[:n]
+    font = game.font_medium
+    return lambda: Text.draw_centered_text(font, surface, text, (255, 255, 255), rect)
+
+
+def pack(game: Game, n: int):
+    """
+    UIContainer.pack of the last of n children.
+    """
+    parent = UIContainer(UICanvas(game), width=300, height=10)
+    for _ in range(n):
+        UIContainer(parent, width=300, height=20).pack("vert", pady=2)
+    last = parent.children[-1]
+    return lambda: last.pack("vert", pady=2)
+
+
+def grid_add_child(game: Game, n: int):
+    """
+    UIGrid.add_child of a child into a grid of n cells that are all taken.
+    """
+    side = max(1, round(n ** 0.5))
+    grid = UIGrid(UICanvas(game), width=600, height=600, rows=side, cols=side, pad=(2, 2))
+    for i in range(side * side):
+        grid.add_child(UIContainer(grid), *divmod(i, side))
+    child = grid.cells[(0, 0)]
+    return lambda: grid.add_child(child, 0, 0)
+
+
+def tween_update(game: Game, n: int):
+    """
+    TweenManager.update of a frame with n running tweens.
+    """
+    tweener = TweenManager()
+    for i in range(n):
+        tweener.add_tween(SimpleNamespace(x=0.0), "x", 0.0, 100.0, 1e9)
+    return lambda: tweener.update(1 / 60)
+
+
+def entry_keystroke(game: Game, n: int):
+    """
+    A character typed and deleted at the end of an entry holding n characters.
+    """
+    entry = Entry(UICanvas(game), width=400, height=40)
+    entry.text = "a" * n
+    typed = p.event.Event(p.KEYDOWN, key=p.K_b, mod=0, unicode="b", scancode=0)
+    backspace = p.event.Event(p.KEYDOWN, key=p.K_BACKSPACE, mod=0, unicode="\b", scancode=0)
+
+    def keystroke():
+        entry.on_key_down(typed)
+        entry.on_key_down(backspace)
+    return keystroke
+
+
+def stack_push_pop(game: Game, n: int):
+    """
+    Stack.push and pop on a stack holding n items.
+    """
+    stack = Stack()
+    for i in range(n):
+        stack.push(i)
+
+    def push_pop():
+        stack.push(n)
+        stack.pop()
+    return push_pop
+
+
+def images_from_spritesheet(game: Game, n: int):
+    """
+    images_from_spritesheet of a sheet of n 32x32 tiles.
+    """
+    side = max(1, round(n ** 0.5))
+    path = os.path.join(tempfile.mkdtemp(), "sheet.png")
+    p.image.save(p.Surface((32 * side, 32 * side), p.SRCALPHA), path)
+    return lambda: Image.images_from_spritesheet(path, (32, 32))
+
+
+# name -> (setup, sizes)
+BENCHMARKS = {
+    "draw_rect_alpha": (draw_rect_alpha, (16, 64, 256, 720)),
+    "draw_centered_text": (draw_centered_text, (8, 32, 128)),
+    "pack": (pack, (10, 100, 1000)),
+    "grid_add_child": (grid_add_child, (16, 150, 1024)),
+    "tween_update": (tween_update, (1, 10, 100, 1000)),
+    "entry_keystroke": (entry_keystroke, (10, 100, 1000)),
+    "stack_push_pop": (stack_push_pop, (10, 1000, 100000)),
+    "images_from_spritesheet": (images_from_spritesheet, (1, 16, 256)),
+}
+
+
+def measure(function, repeat: int = 5, min_time: float = 0.2) -> float:
+    """
+    Seconds per call of function: the best of repeat runs of as many calls as fill min_time.
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(names=None, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Runs the benchmarks on a headless game.
+    :param names: the benchmarks to run, None for all of them
+    :return: {benchmark: {size: microseconds per call}}, sizes as strings like in the JSON
+    """
+    game = Game(ROOT)
+    results = {}
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        results[name] = {str(n): round(measure(setup(game, n), repeat, min_time) * 1e6, 3) for n in sizes}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[tuple[str, str, float, float, float]]:
+    """
+    :return: [(benchmark, size, baseline us, current us, ratio)] of the measurements slower than
+    threshold times the baseline
+    """
+    slower = []
+    for name, sizes in results.items():
+        for n, us in sizes.items():
+            before = baseline.get(name, {}).get(n)
+            if before and us / before > threshold:
+                slower.append((name, n, before, us, us / before))
+    return slower
+
+
+def report(results: dict, baseline: dict | None = None, threshold: float = 1.25) -> str:
+    lines = []
+    for name, sizes in results.items():
+        for n, us in sizes.items():
+            line = f"{name:<26}{n:>8}{us:>14.3f} us"
+            before = (baseline or {}).get(name, {}).get(n)
+            if before:
+                ratio = us / before
+                line += f"{before:>14.3f} us  x{ratio:.2f}" + ("  SLOWER" if ratio > threshold else "")
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds every repeat lasts (about)")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="store the results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="compare with the baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio to the baseline above which a benchmark is flagged as slower")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    results = run(args.only, args.repeat, args.min_time)
+    print(report(results, baseline, args.threshold))
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.save}")
+    if baseline is not None:
+        slower = compare(results, baseline, args.threshold)
+        if slower:
+            print(f"{len(slower)} benchmarks slower than x{args.threshold} the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Latency of the queries AppState runs while browsing (search_cell, open_freezer_by_id, open_box_by_id,
+open_cell_by_id, refresh_freezers), on generated inventories of 10k, 100k and 1M cells (see Inventory.py),
+first on the tables as AppState creates them and then with the candidate indexes of INDEXES.
+Prints the p50/p95 of every query in ms with the rows it returned, and the EXPLAIN QUERY PLAN of every
+statement: "SCAN" means that the whole table is read.
+The search can't be helped by these indexes: LIKE '%text%' reads every cell whatever the indexes.
+
+    python Benchmarks/Queries.py                      # about a minute, most of it generating the 1M database
+    python Benchmarks/Queries.py --cells 100000 --workdir /tmp/inventories --out queries.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Benchmarks.Inventory import generate
+from Benchmarks.Frames import percentile
+from States.AppState import (SEARCH_CELLS, SELECT_BOXES_IN_FREEZER, SELECT_CELL, SELECT_CELLS_IN_BOX,
+                             SELECT_FREEZERS, search_parameters)
+
+SIZES = (10_000, 100_000, 1_000_000)
+FREEZERS = 10
+CELLS_PER_BOX = 100
+# Indexes on the columns the queries filter by
+INDEXES = {
+    "idx_scatole_in_freezer": "CREATE INDEX idx_scatole_in_freezer ON scatole (in_freezer)",
+    "idx_celle_in_scatola": "CREATE INDEX idx_celle_in_scatola ON celle (in_scatola)",
+}
+
+
+class Inventory:
+    """
+    Ids of a generated database, to pick the parameters of the queries from.
+    """
+    def __init__(self, con: sqlite3.Connection, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.freezers = [row[0] for row in con.execute("SELECT id FROM freezers")]
+        self.boxes = [row[0] for row in con.execute("SELECT id FROM scatole")]
+        self.max_cell = con.execute("SELECT max(id) FROM celle").fetchone()[0]
+        self.con = con
+
+    def freezer(self) -> int:
+        return self.rng.choice(self.freezers)
+
+    def box(self) -> int:
+        return self.rng.choice(self.boxes)
+
+    def cell(self) -> tuple:
+        return self.con.execute(SELECT_CELL, (self.rng.randint(1, self.max_cell),)).fetchone()
+
+
+def open_cell_steps(inventory: Inventory):
+    # open_cell_by_id: the cell, then the boxes of its freezer and the cells of its box
+    cell = inventory.cell()
+    return [(SELECT_CELL, (cell[0],)), (SELECT_BOXES_IN_FREEZER, (cell[2],)), (SELECT_CELLS_IN_BOX, (cell[1],))]
+
+
+# AppState method (and search text) -> function returning the [(sql, parameters)] of a call
+CASES = {
+    "refresh_freezers": lambda inventory: [(SELECT_FREEZERS, ())],
+    "open_freezer_by_id": lambda inventory: [(SELECT_BOXES_IN_FREEZER, (inventory.freezer(),))],
+    "open_box_by_id": lambda inventory: [(SELECT_CELLS_IN_BOX, (inventory.box(),))],
+    "open_cell_by_id": open_cell_steps,
+    # A common cell line, a rarer word and a text that is nowhere
+    "search_cell HeLa": lambda inventory: [(SEARCH_CELLS, search_parameters("HeLa"))],
+    "search_cell DMSO": lambda inventory: [(SEARCH_CELLS, search_parameters("DMSO"))],
+    "search_cell zzz": lambda inventory: [(SEARCH_CELLS, search_parameters("zzz"))],
+}
+
+
+def time_case(con: sqlite3.Connection, steps, repeats: int, budget: float) -> dict:
+    """
+    Runs a case (with new parameters every time) repeats times, or fewer if they take more than budget seconds,
+    fetching all the rows like AppState does.
+    """
+    times, rows = [], 0
+    started = time.perf_counter()
+    while len(times) < repeats and (len(times) < 3 or time.perf_counter() - started < budget):
+        queries = steps()
+        start = time.perf_counter()
+        rows = 0
+        for sql, parameters in queries:
+            rows += len(con.execute(sql, parameters).fetchall())
+        times.append(time.perf_counter() - start)
+    return {"runs": len(times), "rows": rows,
+            "p50": round(percentile(times, 50) * 1000, 3), "p95": round(percentile(times, 95) * 1000, 3)}
+
+
+def query_plans(con: sqlite3.Connection, inventory: Inventory) -> dict:
+    plans = {}
+    for name, steps in CASES.items():
+        for sql, parameters in steps(inventory):
+            key = " ".join(sql.split())
+            if key not in plans:
+                plans[key] = "; ".join(row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql, parameters))
+    return plans
+
+
+def run_size(path: str, repeats: int, budget: float) -> dict:
+    con = sqlite3.connect(path)
+    inventory = Inventory(con)
+    result = {}
+    for label, indexes in (("no_indexes", {}), ("indexes", INDEXES)):
+        for sql in indexes.values():
+            con.execute(sql)
+        result[label] = {"cases": {name: time_case(con, lambda steps=steps: steps(inventory), repeats, budget)
+                                   for name, steps in CASES.items()},
+                         "plans": query_plans(con, inventory)}
+    # The database can be reused as it was generated
+    for name in INDEXES:
+        con.execute(f"DROP INDEX {name}")
+    con.close()
+    return result
+
+
+def inventory_path(workdir: str, cells: int) -> str:
+    """
+    The database with about that many cells in workdir, generated if it isn't there yet.
+    """
+    path = os.path.join(workdir, f"inventory-{cells}.db")
+    if not os.path.exists(path):
+        boxes_per_freezer = math.ceil(cells / (FREEZERS * CELLS_PER_BOX))
+        generate(path + ".tmp", FREEZERS, boxes_per_freezer, CELLS_PER_BOX)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def report(results: dict) -> str:
+    lines = []
+    for cells, result in results.items():
+        lines.append(f"{cells} cells{'':<20}{'p50 ms':>10}{'p95 ms':>10}{'indexed p50':>13}{'p95':>9}{'rows':>9}")
+        for name, before in result["no_indexes"]["cases"].items():
+            after = result["indexes"]["cases"][name]
+            lines.append(f"  {name:<28}{before['p50']:>10.3f}{before['p95']:>10.3f}{after['p50']:>13.3f}"
+                         f"{after['p95']:>9.3f}{before['rows']:>9}")
+        for label in ("no_indexes", "indexes"):
+            lines.append(f"  plans, {label.replace('_', ' ')}:")
+            for sql, plan in result[label]["plans"].items():
+                lines.append(f"    {plan:<66} {sql[:70]}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", type=int, action="append", help=f"sizes of the inventories, default {SIZES}")
+    parser.add_argument("--repeats", type=int, default=50, help="runs of every query")
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds after which a query stops repeating")
+    parser.add_argument("--workdir", help="keep the generated databases here and reuse them")
+    parser.add_argument("--out", help="write the results as JSON here too")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        workdir = args.workdir or work
+        os.makedirs(workdir, exist_ok=True)
+        results = {}
+        for cells in args.cells or SIZES:
+            results[cells] = run_size(inventory_path(workdir, cells), args.repeats, args.budget)
+    print(report(results))
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,49 @@
 import os
+import traceback
 
 import pygame as p
 import time
 
 from Generic.Stack import Stack
 from Tween.Tween import TweenManager
+from Utils.Assets import AssetManager
+from Utils.Capture import ProfileCapture
+from Utils.Compositor import Compositor
+from Utils.Fonts import FontRegistry
+from Utils.Input import InputDispatcher
+from Utils.Metrics import CountingSurface, GameMetrics
+from Utils.Profiler import FrameProfiler
+from Utils.Scheduler import scheduler
+from Utils.Startup import StartupTimer
 
-
+# Sizes of the named fonts (font_tiny, font_small...), any other size can be asked to Game.fonts
+FONT_SIZES = {"tiny": 5, "small": 12, "medium": 20, "big": 40}
 
 
 class Game:
-    def __init__(self, workdir: str = os.getcwd()):
+    def __init__(self, workdir: str = os.getcwd(), startup: StartupTimer | None = None):
+        # Phases of the startup, see Utils/Startup.py
+        self.startup = startup if startup is not None else StartupTimer()
         self.need_key_event_handling = True
         self.events = None
         self.fps: int = 60
         self.clock = p.time.Clock()
         self.font_dir = None
+        self.fonts: FontRegistry | None = None
         self.assets_dir = None
-        self.font_medium = None  # This has to be set!
+        self.assets: AssetManager | None = None
         self.title_screen = None
-        p.init()
-        p.mixer.init()
+        # Damage-tracking render mode: only the rects reported through invalidate() are redrawn and presented
+        self.dirty_rendering = False
+        self._present_all = True
+        # Adaptive frame loop: while nothing is animating, sleep until an event arrives or a timer is due
+        self.adaptive_fps = False
+        self.max_idle_wait = 1.0
+        self.pending_events = []
+        self._frame_requested = False
+        # Only the display is opened now: fonts are initialized by the first font opened (see Utils/Fonts.py)
+        # and the mixer by the first sound (see init_audio)
+        p.display.init()
         # self.GAME_W, self.GAME_H = 640, 320
         # self.SCREEN_W, self.SCREEN_H = 960, 540
         # self.GAME_W, self.GAME_H = 1920, 1080
@@ -30,6 +53,7 @@ class Game:
         self.SCREEN_CENTER = (self.GAME_W / 2, self.GAME_H / 2)
         self.game_canvas = p.Surface((self.GAME_W, self.GAME_H))
         self.screen = p.display.set_mode((self.SCREEN_W, self.SCREEN_H))
+        self.startup.mark("display")
         self.running, self.playing = True, True
         self.actions: dict[str, int] = {'left': 0, 'right': 0, 'up': 0, 'jump': 0, 'down': 0, 'action1': 0,
                                         'glide': 0, 'start': 0, 'mouse_sx': 0, 'mouse_dx': 0}
@@ -40,35 +64,111 @@ class Game:
         self.state_stack = Stack()
 
         self.tweener = TweenManager()
+        # Timers and repeating callbacks (Utils/Timer.py), run at the start of every frame
+        self.scheduler = scheduler
 
         # self.event_system = EventSystem()
 
-        # TODO: Make a render stack
         # Structure:
         #  key: layer
         #  value: list of render functions to call
         self.render_stack = {"background": [], "foreground": [], "above_all": []}
+        self.compositor = Compositor((self.GAME_W, self.GAME_H), self.render_stack)
+        # Delivers the events to the widgets of the current state
+        self.input = InputDispatcher(self)
+        # Debug overlay with the frame times and the slowest widgets, toggled with F3
+        self.profiler = FrameProfiler(self)
+        # cProfile and stack samples of the next frames, started and stopped with F4 and saved next to the database
+        self.capture = ProfileCapture(self)
+        # Metrics written to a JSON-lines file, see enable_metrics
+        self.metrics: GameMetrics | None = None
 
         self.mousepos = None
+        # Pointer position in screen coordinates, followed through the mouse events so that replayed events
+        # (see Benchmarks/Frames.py) move it too
+        self.pointer = p.mouse.get_pos()
         self.base_dir = workdir
+        # The database opened by AppState
+        self.db_path = os.path.join(self.base_dir, "celle.db")
         try:
             self.load_assets()
             self.load_map()
             self.load_states()
             self.load_sounds()
-        except:
-            pass
+        except Exception:
+            traceback.print_exc()
+        self.startup.mark("fonts")
 
     def game_loop(self):
         while self.playing:
             self.get_dt()
             self.get_events()
+            start = time.perf_counter()
             self.update()
             self.render()
-            self.clock.tick(self.fps)
+            if self.metrics is not None:
+                self.metrics.on_frame(time.perf_counter() - start)
+            if self.adaptive_fps and self.is_idle():
+                self.wait_for_events()
+            else:
+                self.clock.tick(self.fps)
+
+    def enable_metrics(self, path: str | None = None, interval: float = 60.0, **exporter_args):
+        """
+        Starts recording the metrics of the game (see Utils/Metrics.py) and writing them to a JSON-lines file.
+        :param path: the file, by default metrics.jsonl next to the database
+        :param interval: seconds between two lines of the file
+        :param exporter_args: max_bytes and backups of the rotation, see JsonlExporter
+        :return: None
+        """
+        if self.metrics is not None:
+            self.metrics.exporter.stop()
+        if path is None:
+            path = os.path.join(os.path.dirname(self.db_path), "metrics.jsonl")
+        self.metrics = GameMetrics(self, path, interval, **exporter_args)
+        # Blits are counted on the surfaces everything is rendered to
+        self.game_canvas = CountingSurface((self.GAME_W, self.GAME_H))
+        self.compositor.surface_class = CountingSurface
+        self.compositor.surfaces.clear()
+        self.compositor.invalidate()
+        self._present_all = True
+        self.metrics.exporter.start(self.scheduler)
+
+    def request_frame(self):
+        """
+        Asks for another frame at full frame rate, for things that animate without events or tweens
+        (e.g. an ImageButton playing its hover animation). Has to be called every frame it is needed.
+        :return: None
+        """
+        self._frame_requested = True
+
+    def is_idle(self) -> bool:
+        """
+        True when the next frame would look the same as this one unless an event arrives or a timer fires.
+        """
+        frame_requested, self._frame_requested = self._frame_requested, False
+        return not (frame_requested or self.events or self.pending_events) and self.tweener.is_empty()
+
+    def wait_for_events(self):
+        """
+        Blocks until an event arrives or the next scheduled callback is due, at most max_idle_wait seconds.
+        The event that wakes the loop is handled in the next frame.
+        :return: None
+        """
+        timeout = self.max_idle_wait
+        deadline = self.scheduler.next_deadline()
+        if deadline is not None:
+            timeout = min(timeout, deadline - self.scheduler.clock())
+        timeout_ms = int(timeout * 1000)
+        if timeout_ms <= 0:
+            return
+        event = p.event.wait(timeout_ms)
+        if event.type != p.NOEVENT:
+            self.pending_events.append(event)
 
     def get_events(self):
-        self.events = p.event.get()
+        self.events = self.pending_events + p.event.get()
+        self.pending_events = []
         aux_prev_jump_action = self.actions['jump']
         aux_prev_mouse_sx = self.actions['mouse_sx']
         aux_prev_mouse_dx = self.actions['mouse_dx']
@@ -76,6 +176,18 @@ class Game:
             if event.type == p.QUIT:
                 self.playing, self.running = False, False
 
+            if event.type in (p.VIDEOEXPOSE, p.WINDOWEXPOSED):
+                self._present_all = True
+
+            if event.type == p.KEYDOWN and event.key == p.K_F3:
+                self.profiler.toggle()
+
+            if event.type == p.KEYDOWN and event.key == p.K_F4:
+                self.capture.toggle()
+
+            if event.type in (p.MOUSEMOTION, p.MOUSEBUTTONDOWN, p.MOUSEBUTTONUP):
+                self.pointer = event.pos
+
             if event.type == p.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     self.actions['mouse_sx'] = 1
@@ -130,19 +242,74 @@ class Game:
         # print(self.jump_action_changed)
 
     def update(self):
-        self.mousepos = (
-            p.mouse.get_pos()[0] * self.GAME_W / self.SCREEN_W, p.mouse.get_pos()[1] * self.GAME_H / self.SCREEN_H)
+        self.mousepos = (self.pointer[0] * self.GAME_W / self.SCREEN_W, self.pointer[1] * self.GAME_H / self.SCREEN_H)
         # self.state_stack.top().update(self.dt, self.actions)
+        self.scheduler.run_due()
+        self.input.dispatch(self.events, self.state_stack.top().input_canvases())
         self.state_stack.top().update(self.dt)
-        self.tweener.update()
+        self.tweener.update(self.dt)
 
     def render(self):
-        self.state_stack.top().render(self.game_canvas)
-        # for layer in self.render_stack.keys():
-        #     for render_function in self.render_stack[layer]:
-        #         render_function(self.game_canvas)
-        self.screen.blit(p.transform.scale(self.game_canvas, (self.SCREEN_W, self.SCREEN_H)), (0, 0))
-        p.display.flip()  # ??
+        if not self.dirty_rendering:
+            self.compositor.invalidate(layer=self.state_stack.top().layer)
+        rects = self.compositor.compose(self.game_canvas)
+        self.present(rects)
+        self.startup.on_frame()
+        self.capture.on_frame()
+
+    def present(self, rects: list[p.Rect]):
+        """
+        Shows the frame: the whole game canvas, or only the changed rects of it in the dirty rendering mode.
+        :param rects: the areas of the game canvas that changed, as returned by Compositor.compose
+        :return: None
+        """
+        if self._present_all or rects and rects[0] == self.game_canvas.get_rect():
+            self._present_all = False
+            self.screen.blit(p.transform.scale(self.game_canvas, (self.SCREEN_W, self.SCREEN_H)), (0, 0))
+            p.display.flip()  # ??
+        elif rects:
+            p.display.update([self.present_rect(rect) for rect in rects])
+
+    def invalidate(self, rect=None, layer: str | None = None):
+        """
+        Reports a changed area of the game canvas: in the next frame that area of the layer is rendered again
+        and, in the dirty rendering mode, it is the only part of the screen that gets updated.
+        :param rect: the area (in game coordinates) that has to be redrawn. None means the whole layer
+        :param layer: the render layer that changed. None means the layer of the current state
+        :return: None
+        """
+        if layer is None and not self.state_stack.is_empty():
+            layer = self.state_stack.top().layer
+        self.compositor.invalidate(rect, layer)
+
+    def add_to_layer(self, render_function, layer: str):
+        """
+        Draws render_function in the given layer, on top of what is already there (e.g. an overlay).
+        :return: None
+        """
+        self.render_stack[layer].append(render_function)
+        self.compositor.invalidate(layer=layer)
+
+    def remove_from_layer(self, render_function, layer: str):
+        if render_function in self.render_stack[layer]:
+            self.render_stack[layer].remove(render_function)
+            self.compositor.invalidate(layer=layer)
+
+    def present_rect(self, rect: p.Rect) -> p.Rect:
+        """
+        Copies a region of the game canvas to the screen, scaling only that region.
+        :param rect: region of the game canvas
+        :return: the corresponding region of the screen
+        """
+        if (self.GAME_W, self.GAME_H) == (self.SCREEN_W, self.SCREEN_H):
+            self.screen.blit(self.game_canvas, rect, rect)
+            return rect
+        sx, sy = self.SCREEN_W / self.GAME_W, self.SCREEN_H / self.GAME_H
+        screen_rect = p.Rect(int(rect.x * sx), int(rect.y * sy), int(rect.right * sx) - int(rect.x * sx),
+                             int(rect.bottom * sy) - int(rect.y * sy))
+        region = self.game_canvas.subsurface(rect)
+        self.screen.blit(p.transform.scale(region, screen_rect.size), screen_rect)
+        return screen_rect
 
     def get_dt(self):
         now = time.time()
@@ -154,17 +321,31 @@ class Game:
         # To be modified
         self.assets_dir = os.path.join(self.base_dir, "Assets")
         print(self.base_dir, self.assets_dir)
+        # Images are loaded through here, see Utils/Assets.py
+        self.assets = AssetManager(self.assets_dir)
         # self.sprite_dir = os.path.join(self.assets_dir, "sprites")
         self.font_dir = os.path.join(self.assets_dir, "font")
-        # self.font_medium = p.font_medium.Font(os.path.join(self.font_dir, "PressStart2P-vaV7.ttf"), 20)
-        self.font_medium = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Regular.ttf"), 20)
-        self.font_big = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Regular.ttf"), 40)
-        self.font_small = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Regular.ttf"), 12)
-        self.font_tiny = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Regular.ttf"), 5)
-        # self.font_big_bold = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Bold.ttf"), 40)
-        # self.font_medium_bold = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Bold.ttf"), 20)
-        # self.font_small_bold = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Bold.ttf"), 10)
-        # self.font_tiny_bold = p.font.Font(os.path.join(self.font_dir, "Comfortaa-Bold.ttf"), 5)
+        # Fonts are opened when first used, see Utils/Fonts.py. The ones every screen uses are opened now
+        self.fonts = FontRegistry(self.font_dir)
+        self.fonts.preload([FONT_SIZES["medium"], FONT_SIZES["small"]])
+        # self.fonts.get(20, "PressStart2P-vaV7.ttf")
+        # self.fonts.get(40, "Comfortaa-Bold.ttf")
+
+    @property
+    def font_tiny(self) -> p.font.Font:
+        return self.fonts.get(FONT_SIZES["tiny"])
+
+    @property
+    def font_small(self) -> p.font.Font:
+        return self.fonts.get(FONT_SIZES["small"])
+
+    @property
+    def font_medium(self) -> p.font.Font:
+        return self.fonts.get(FONT_SIZES["medium"])
+
+    @property
+    def font_big(self) -> p.font.Font:
+        return self.fonts.get(FONT_SIZES["big"])
 
     def load_states(self):
         # TO BE DEFINED
@@ -173,7 +354,7 @@ class Game:
         # self.state_stack.push(self.title_screen)
 
     def load_state(self, state):
-        self.state_stack.push(state)
+        self.push_state(state)
 
     def load_map(self):
         pass
@@ -195,14 +376,28 @@ class Game:
             self.actions[action] = False
 
     def load_sounds(self):
+        # Sounds have to call init_audio before being loaded
         pass
 
+    def init_audio(self):
+        """
+        Opens the audio device, the first time a sound is needed: most screens never play one,
+        and opening the device is one of the slowest parts of pygame.init().
+        :return: None
+        """
+        if not p.mixer.get_init():
+            p.mixer.init()
+
     def push_state(self, state):
         self.state_stack.push(state)
+        state.canvas.set_input_attached(True)
+        self.add_to_layer(state.render, state.layer)
 
     def pop_state(self, how_many: int = 1):
         for _ in range(how_many):
-            self.state_stack.pop()
+            state = self.state_stack.pop()
+            state.canvas.set_input_attached(False)
+            self.remove_from_layer(state.render, state.layer)
 
 
 
@@ -0,0 +1,156 @@
+class GapBuffer:
+    """
+    Editable text with the gap at the caret: the text before the caret is a list, the text after it is a
+    list in reverse order, so inserting, deleting and moving the caret by one character is O(1).
+    Every side also keeps the running sum of the character advances (widths in pixels), so the x of the
+    caret, or of any index, does not require measuring the text.
+
+    abc|defg -> left = ['a', 'b', 'c'], right = ['g', 'f', 'e', 'd']
+    """
+    def __init__(self, text: str = "", advance=None):
+        """
+        :param text: initial text, the caret is placed at its end
+        :param advance: function returning the advance of a character, by default every character is 1 wide
+        """
+        self.advance = advance if advance is not None else (lambda char: 1)
+        self._left: list[str] = []
+        self._right: list[str] = []
+        # _left_advances[i] = advance of the first i characters of left, same for right (from the end of the text)
+        self._left_advances: list[int] = [0]
+        self._right_advances: list[int] = [0]
+        self._text: str | None = None
+        self.set_text(text)
+
+    def __len__(self):
+        return len(self._left) + len(self._right)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._left) + "".join(reversed(self._right))
+        return self._text
+
+    def set_text(self, text: str):
+        """
+        Replaces the whole text, the caret goes to its end.
+        """
+        self._left = list(text)
+        self._right = []
+        self._left_advances = [0]
+        for char in self._left:
+            self._left_advances.append(self._left_advances[-1] + self.advance(char))
+        self._right_advances = [0]
+        self._text = text
+
+    @property
+    def caret(self) -> int:
+        """
+        Index of the caret: the number of characters before it.
+        """
+        return len(self._left)
+
+    @property
+    def width(self) -> int:
+        return self._left_advances[-1] + self._right_advances[-1]
+
+    @property
+    def caret_advance(self) -> int:
+        """
+        Advance of the text before the caret, i.e. the x of the caret relative to the start of the text.
+        """
+        return self._left_advances[-1]
+
+    def advance_to(self, index: int) -> int:
+        """
+        Advance of the first index characters.
+        """
+        if index <= len(self._left):
+            return self._left_advances[index]
+        return self.width - self._right_advances[len(self) - index]
+
+    def char_before_caret(self) -> str | None:
+        return self._left[-1] if self._left else None
+
+    def char_after_caret(self) -> str | None:
+        return self._right[-1] if self._right else None
+
+    def insert(self, chars: str):
+        """
+        Inserts chars at the caret, the caret moves after them.
+        """
+        for char in chars:
+            self._left.append(char)
+            self._left_advances.append(self._left_advances[-1] + self.advance(char))
+        if chars:
+            self._text = None
+
+    def delete_left(self, count: int = 1) -> str:
+        """
+        Deletes up to count characters before the caret (backspace).
+        :return: the deleted characters
+        """
+        deleted = []
+        while count > 0 and self._left:
+            deleted.append(self._left.pop())
+            self._left_advances.pop()
+            count -= 1
+        if deleted:
+            self._text = None
+        return "".join(reversed(deleted))
+
+    def delete_right(self, count: int = 1) -> str:
+        """
+        Deletes up to count characters after the caret (delete).
+        :return: the deleted characters
+        """
+        deleted = []
+        while count > 0 and self._right:
+            deleted.append(self._right.pop())
+            self._right_advances.pop()
+            count -= 1
+        if deleted:
+            self._text = None
+        return "".join(deleted)
+
+    def delete_word_left(self) -> str:
+        """
+        Deletes the word before the caret (ctrl + backspace): a single space if the caret follows one,
+        otherwise everything up to the previous space.
+        """
+        if self.char_before_caret() == " ":
+            return self.delete_left()
+        count = 0
+        while count < len(self._left) and self._left[-1 - count] != " ":
+            count += 1
+        return self.delete_left(count)
+
+    def delete_word_right(self) -> str:
+        """
+        Deletes the word after the caret (ctrl + delete), like delete_word_left.
+        """
+        if self.char_after_caret() == " ":
+            return self.delete_right()
+        count = 0
+        while count < len(self._right) and self._right[-1 - count] != " ":
+            count += 1
+        return self.delete_right(count)
+
+    def move_caret(self, delta: int):
+        """
+        Moves the caret by delta characters (negative to the left), stopping at the ends of the text.
+        """
+        while delta < 0 and self._left:
+            char = self._left.pop()
+            self._left_advances.pop()
+            self._right.append(char)
+            self._right_advances.append(self._right_advances[-1] + self.advance(char))
+            delta += 1
+        while delta > 0 and self._right:
+            char = self._right.pop()
+            self._right_advances.pop()
+            self._left.append(char)
+            self._left_advances.append(self._left_advances[-1] + self.advance(char))
+            delta -= 1
+
+    def set_caret(self, index: int):
+        self.move_caret(max(0, min(index, len(self))) - self.caret)
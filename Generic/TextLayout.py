@@ -0,0 +1,259 @@
+from bisect import bisect_right
+
+
+class TextLayout:
+    """
+    Multi-line text wrapped to a width, with a caret.
+    The text is split in paragraphs (at '\\n') and every paragraph keeps the offsets where its lines start,
+    so an edit wraps again only the paragraphs it touched; the following ones just get renumbered.
+
+    paragraphs = ["hello world", ""], width of 6 characters -> breaks = [[0, 6], [0]]
+    lines: "hello ", "world", ""
+    """
+    def __init__(self, text: str = "", width: int = 100, advance=None):
+        """
+        :param text: initial text, the caret is placed at its end
+        :param width: width the lines are wrapped to
+        :param advance: function returning the advance of a character, by default every character is 1 wide
+        """
+        self.width = width
+        self.advance = advance if advance is not None else (lambda char: 1)
+        self.paragraphs: list[str] = []
+        self.breaks: list[list[int]] = []
+        # first_line[i] = index of the first line of paragraph i, the last item is the number of lines
+        self.first_line: list[int] = [0]
+        self.caret: tuple[int, int] = (0, 0)  # (paragraph, offset in the paragraph)
+        self._text: str | None = None
+        self.set_text(text)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "\n".join(self.paragraphs)
+        return self._text
+
+    def set_text(self, text: str):
+        """
+        Replaces the whole text, the caret goes to its end.
+        """
+        self.paragraphs = text.split("\n")
+        self.breaks = [self._wrap(paragraph) for paragraph in self.paragraphs]
+        self._renumber(0)
+        self.caret = (len(self.paragraphs) - 1, len(self.paragraphs[-1]))
+        self._text = text
+
+    def set_width(self, width: int):
+        if width != self.width:
+            self.width = width
+            self.breaks = [self._wrap(paragraph) for paragraph in self.paragraphs]
+            self._renumber(0)
+
+    def _wrap(self, paragraph: str) -> list[int]:
+        """
+        Offsets where the lines of paragraph start. Lines break after the last space that fits,
+        or inside the word if it is longer than a line; spaces never start a new line.
+        """
+        starts = [0]
+        x = 0
+        after_space = 0
+        for i, char in enumerate(paragraph):
+            advance = self.advance(char)
+            if x + advance > self.width and i > starts[-1] and char != " ":
+                start = after_space if after_space > starts[-1] else i
+                starts.append(start)
+                x = sum(self.advance(c) for c in paragraph[start:i])
+            x += advance
+            if char == " ":
+                after_space = i + 1
+        return starts
+
+    def _renumber(self, paragraph: int):
+        del self.first_line[paragraph + 1:]
+        for breaks in self.breaks[paragraph:]:
+            self.first_line.append(self.first_line[-1] + len(breaks))
+
+    def _replace(self, first: int, last: int, paragraphs: list[str]):
+        """
+        Replaces the paragraphs first..last (included) and wraps the new ones.
+        """
+        self.paragraphs[first:last + 1] = paragraphs
+        self.breaks[first:last + 1] = [self._wrap(paragraph) for paragraph in paragraphs]
+        self._renumber(first)
+        self._text = None
+
+    # Lines
+
+    @property
+    def line_count(self) -> int:
+        return self.first_line[-1]
+
+    def _locate_line(self, line: int) -> tuple[int, int, int]:
+        """
+        Returns paragraph, start and end offset of a line.
+        """
+        paragraph = bisect_right(self.first_line, line) - 1
+        paragraph = min(paragraph, len(self.paragraphs) - 1)
+        breaks = self.breaks[paragraph]
+        k = line - self.first_line[paragraph]
+        end = breaks[k + 1] if k + 1 < len(breaks) else len(self.paragraphs[paragraph])
+        return paragraph, breaks[k], end
+
+    def line(self, line: int) -> str:
+        paragraph, start, end = self._locate_line(line)
+        return self.paragraphs[paragraph][start:end]
+
+    def caret_position(self) -> tuple[int, int]:
+        """
+        Returns the line of the caret and its x relative to the start of the line.
+        """
+        paragraph, offset = self.caret
+        breaks = self.breaks[paragraph]
+        k = bisect_right(breaks, offset) - 1
+        x = sum(self.advance(char) for char in self.paragraphs[paragraph][breaks[k]:offset])
+        return self.first_line[paragraph] + k, x
+
+    def text_before_caret(self) -> str:
+        """
+        Returns the text of the line of the caret that comes before the caret.
+        """
+        paragraph, offset = self.caret
+        breaks = self.breaks[paragraph]
+        return self.paragraphs[paragraph][breaks[bisect_right(breaks, offset) - 1]:offset]
+
+    # Editing
+
+    def insert(self, chars: str):
+        """
+        Inserts chars (possibly containing '\\n') at the caret, the caret moves after them.
+        """
+        paragraph, offset = self.caret
+        text = self.paragraphs[paragraph]
+        new = (text[:offset] + chars).split("\n")
+        caret_offset = len(new[-1])
+        new[-1] += text[offset:]
+        self._replace(paragraph, paragraph, new)
+        self.caret = (paragraph + len(new) - 1, caret_offset)
+
+    def delete_left(self, count: int = 1) -> bool:
+        """
+        Deletes up to count characters before the caret, joining paragraphs at their start.
+        :return: whether something was deleted
+        """
+        deleted = False
+        for _ in range(count):
+            paragraph, offset = self.caret
+            text = self.paragraphs[paragraph]
+            if offset > 0:
+                self._replace(paragraph, paragraph, [text[:offset - 1] + text[offset:]])
+                self.caret = (paragraph, offset - 1)
+            elif paragraph > 0:
+                previous = self.paragraphs[paragraph - 1]
+                self._replace(paragraph - 1, paragraph, [previous + text])
+                self.caret = (paragraph - 1, len(previous))
+            else:
+                break
+            deleted = True
+        return deleted
+
+    def delete_right(self, count: int = 1) -> bool:
+        """
+        Deletes up to count characters after the caret, joining paragraphs at their end.
+        :return: whether something was deleted
+        """
+        deleted = False
+        for _ in range(count):
+            paragraph, offset = self.caret
+            text = self.paragraphs[paragraph]
+            if offset < len(text):
+                self._replace(paragraph, paragraph, [text[:offset] + text[offset + 1:]])
+            elif paragraph + 1 < len(self.paragraphs):
+                self._replace(paragraph, paragraph + 1, [text + self.paragraphs[paragraph + 1]])
+            else:
+                break
+            deleted = True
+        return deleted
+
+    def delete_word_left(self) -> bool:
+        """
+        Deletes a single space or line break before the caret, otherwise everything up to the previous space.
+        """
+        paragraph, offset = self.caret
+        text = self.paragraphs[paragraph]
+        if offset == 0 or text[offset - 1] == " ":
+            return self.delete_left()
+        start = text.rfind(" ", 0, offset) + 1
+        self._replace(paragraph, paragraph, [text[:start] + text[offset:]])
+        self.caret = (paragraph, start)
+        return True
+
+    def delete_word_right(self) -> bool:
+        """
+        Deletes a single space or line break after the caret, otherwise everything up to the next space.
+        """
+        paragraph, offset = self.caret
+        text = self.paragraphs[paragraph]
+        if offset == len(text) or text[offset] == " ":
+            return self.delete_right()
+        end = text.find(" ", offset)
+        end = end if end != -1 else len(text)
+        self._replace(paragraph, paragraph, [text[:offset] + text[end:]])
+        return True
+
+    # Caret movement
+
+    def move_caret(self, delta: int):
+        """
+        Moves the caret by delta characters, a line break counts as one.
+        """
+        paragraph, offset = self.caret
+        while delta < 0:
+            if offset > 0:
+                offset -= 1
+            elif paragraph > 0:
+                paragraph -= 1
+                offset = len(self.paragraphs[paragraph])
+            else:
+                break
+            delta += 1
+        while delta > 0:
+            if offset < len(self.paragraphs[paragraph]):
+                offset += 1
+            elif paragraph + 1 < len(self.paragraphs):
+                paragraph += 1
+                offset = 0
+            else:
+                break
+            delta -= 1
+        self.caret = (paragraph, offset)
+
+    def move_caret_to_line(self, line: int, x: int):
+        """
+        Puts the caret on a line, at the character boundary closest to x.
+        """
+        line = max(0, min(line, self.line_count - 1))
+        paragraph, start, end = self._locate_line(line)
+        text = self.paragraphs[paragraph]
+        if end < len(text) and end > start:
+            # A wrapped line: its end is the start of the next line
+            end -= 1
+        offset, position = start, 0
+        while offset < end:
+            advance = self.advance(text[offset])
+            if position + advance / 2 > x:
+                break
+            position += advance
+            offset += 1
+        self.caret = (paragraph, offset)
+
+    def move_caret_vertically(self, lines: int):
+        line, x = self.caret_position()
+        if 0 <= line + lines < self.line_count:
+            self.move_caret_to_line(line + lines, x)
+
+    def move_caret_to_line_start(self):
+        line, _ = self.caret_position()
+        self.move_caret_to_line(line, 0)
+
+    def move_caret_to_line_end(self):
+        line, _ = self.caret_position()
+        self.move_caret_to_line(line, float("inf"))
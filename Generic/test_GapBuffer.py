@@ -0,0 +1,55 @@
+import unittest
+from GapBuffer import GapBuffer
+
+
+class GapBufferTest(unittest.TestCase):
+    def setUp(self):
+        # Every character is as wide as its position in the alphabet, spaces are 1 wide
+        self.buffer = GapBuffer("abc def", advance=lambda char: 1 if char == " " else ord(char) - ord("a") + 1)
+
+    def test_initial_caret_at_end(self):
+        self.assertEqual(self.buffer.caret, 7)
+        self.assertEqual(self.buffer.text, "abc def")
+        self.assertEqual(self.buffer.caret_advance, 1 + 2 + 3 + 1 + 4 + 5 + 6)
+
+    def test_insert_in_the_middle(self):
+        self.buffer.move_caret(-4)
+        self.buffer.insert("xy")
+        self.assertEqual(self.buffer.text, "abcxy def")
+        self.assertEqual(self.buffer.caret, 5)
+        self.assertEqual(self.buffer.caret_advance, 6 + 24 + 25)
+        self.assertEqual(self.buffer.width, 6 + 24 + 25 + 1 + 15)
+
+    def test_advance_to_after_caret(self):
+        self.buffer.set_caret(2)
+        self.assertEqual(self.buffer.advance_to(2), 3)
+        self.assertEqual(self.buffer.advance_to(5), 6 + 1 + 4)
+        self.assertEqual(self.buffer.advance_to(7), self.buffer.width)
+
+    def test_delete(self):
+        self.buffer.set_caret(3)
+        self.assertEqual(self.buffer.delete_left(), "c")
+        self.assertEqual(self.buffer.delete_right(), " ")
+        self.assertEqual(self.buffer.text, "abdef")
+        self.assertEqual(self.buffer.width, 1 + 2 + 4 + 5 + 6)
+        self.buffer.set_caret(0)
+        self.assertEqual(self.buffer.delete_left(), "")
+
+    def test_delete_word(self):
+        self.assertEqual(self.buffer.delete_word_left(), "def")
+        self.assertEqual(self.buffer.delete_word_left(), " ")
+        self.buffer.set_caret(0)
+        self.assertEqual(self.buffer.delete_word_right(), "abc")
+        self.assertEqual(self.buffer.text, "")
+
+    def test_caret_stops_at_the_ends(self):
+        self.buffer.move_caret(100)
+        self.assertEqual(self.buffer.caret, 7)
+        self.buffer.move_caret(-100)
+        self.assertEqual(self.buffer.caret, 0)
+        self.assertEqual(self.buffer.caret_advance, 0)
+        self.assertEqual(self.buffer.text, "abc def")
+
+
+if __name__ == '__main__':
+    unittest.main()
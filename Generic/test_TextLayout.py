@@ -0,0 +1,68 @@
+import unittest
+from TextLayout import TextLayout
+
+
+class TextLayoutTest(unittest.TestCase):
+    def setUp(self):
+        # Every character is 1 wide, lines hold 6 characters
+        self.layout = TextLayout("hello world\nbye", width=6)
+
+    def test_wrap(self):
+        self.assertEqual(self.layout.line_count, 3)
+        self.assertEqual([self.layout.line(i) for i in range(3)], ["hello ", "world", "bye"])
+
+    def test_long_word_is_split(self):
+        self.layout.set_text("abcdefghij")
+        self.assertEqual([self.layout.line(i) for i in range(self.layout.line_count)], ["abcdef", "ghij"])
+
+    def test_caret_position(self):
+        self.assertEqual(self.layout.caret_position(), (2, 3))
+        self.layout.move_caret(-4)
+        self.assertEqual(self.layout.caret, (0, 11))
+        self.assertEqual(self.layout.caret_position(), (1, 5))
+
+    def test_text_before_caret(self):
+        self.assertEqual(self.layout.text_before_caret(), "bye")
+        self.layout.caret = (0, 9)
+        self.assertEqual(self.layout.text_before_caret(), "wor")
+        self.layout.caret = (0, 0)
+        self.assertEqual(self.layout.text_before_caret(), "")
+
+    def test_insert_rewraps_and_renumbers(self):
+        self.layout.caret = (0, 0)
+        self.layout.insert("a ")
+        self.assertEqual([self.layout.line(i) for i in range(self.layout.line_count)], ["a ", "hello ", "world", "bye"])
+        self.assertEqual(self.layout.first_line, [0, 3, 4])
+        self.layout.insert("x\ny")
+        self.assertEqual(self.layout.text, "a x\nyhello world\nbye")
+        self.assertEqual(self.layout.caret, (1, 1))
+
+    def test_delete_joins_paragraphs(self):
+        self.layout.caret = (1, 0)
+        self.assertTrue(self.layout.delete_left())
+        self.assertEqual(self.layout.text, "hello worldbye")
+        self.assertEqual(self.layout.caret, (0, 11))
+        self.assertTrue(self.layout.delete_right())
+        self.assertEqual(self.layout.text, "hello worldye")
+        self.layout.set_text("")
+        self.assertFalse(self.layout.delete_left())
+
+    def test_delete_word(self):
+        self.layout.caret = (0, 11)
+        self.layout.delete_word_left()
+        self.assertEqual(self.layout.text, "hello \nbye")
+        self.layout.delete_word_left()
+        self.assertEqual(self.layout.text, "hello\nbye")
+
+    def test_vertical_movement(self):
+        self.layout.caret = (0, 2)
+        self.layout.move_caret_vertically(1)
+        self.assertEqual(self.layout.caret, (0, 8))
+        self.layout.move_caret_vertically(1)
+        self.assertEqual(self.layout.caret, (1, 2))
+        self.layout.move_caret_to_line_end()
+        self.assertEqual(self.layout.caret, (1, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,10 @@ from States.State import State
 from UI.Button import TextButton
 from UI.Containers import HorizContainer
 from UI.Entry import Entry
-from UI.Grid import UIGrid
+from UI.Grid import GridView
 from UI.Label import Label
 from Utils.Colors import *
+from Utils.Metrics import metrics
 from models import Cella
 from ui_custom import CellInputInterface
 import pygame as p
@@ -15,7 +16,7 @@ CII_HEIGHT = 400
 
 class AddBoxDialogState(State):
     def __init__(self, game, prev_state, connection: Connection, cursor: Cursor):
-        super().__init__(game)
+        super().__init__(game, layer="above_all")
 
         # TODO: Match the palette from the other window
 
@@ -76,28 +77,21 @@ class AddBoxDialogState(State):
         buttons_group.add_child(annulla_button)
                                     
         
-        self.grid = UIGrid(self.canvas,
-                           center=p.Vector2(self.game.SCREEN_CENTER),
-                           width=600,
-                           height=400,
-                           rows=GRID_ROWS,
-                           cols=GRID_COLS,
-                           bg_color=DARK_10,
-                           corner_radius=0,
-                           pad=(10, 10))
+        self.grid = GridView(self.canvas,
+                             center=p.Vector2(self.game.SCREEN_CENTER),
+                             width=600,
+                             height=400,
+                             rows=GRID_ROWS,
+                             cols=GRID_COLS,
+                             bg_color=DARK_10,
+                             corner_radius=0,
+                             pad=(10, 10),
+                             font=self.game.font_small,
+                             fg_color=p.Vector3(TEXT) * 0.5,
+                             hover_color=DARK,
+                             command=self.on_cell_click)
         for i in range(self.grid.rows * self.grid.cols):
-            r, c = i // self.grid.cols, i % self.grid.cols
-            self.grid.add_child(
-                TextButton(self.canvas, 
-                           text=f"{i}",
-                           font=self.game.font_small,
-                           fg_color=p.Vector3(TEXT) * 0.5,
-                           bg_color="transparent",
-                           hover_color=DARK,
-                           corner_radius=0,
-                           command=lambda i=r, j=c: self.on_cell_click(i, j)), 
-                    r, 
-                    c)
+            self.grid.set_label((i // self.grid.cols, i % self.grid.cols), f"{i}")
 
         Label(self.canvas,
               x=self.grid.rect.left,
@@ -117,13 +111,17 @@ class AddBoxDialogState(State):
         if self.ci and self.ci.visible:
             self.ci.update(dt)
 
+    def input_canvases(self):
+        if self.ci and self.ci.visible:
+            return [self.ci.canvas, self.canvas]
+        return [self.canvas]
+
     def enter_state(self):
         super().enter_state()
-        print("Entering AddBoxDialogState, state stack: ", self.game.state_stack)
+        metrics.counter("add_box_dialog.opened").inc()
 
     def exit_state(self):
         self.prev_state.refresh_scatole()
-        print("Exiting AddBoxDialogState, state stack: ", self.game.state_stack)
         super().exit_state()
 
     def on_cell_click(self, row, col):
@@ -149,15 +147,11 @@ class AddBoxDialogState(State):
             data=self.ci.data_entry.text,
             descrizione=self.ci.descrizione_entry.text
         )
-        cell = self.grid.cells[self.selected_coords]
-        cell.fg_color = ACCENT
-        cell.bg_color = cell.original_bg_color = LIGHT
-        print(self.altered_cells)
+        self.grid.set_color(self.selected_coords, LIGHT, fg_color=ACCENT)
+        metrics.counter("add_box_dialog.cells_edited").inc()
         self.canvas.toggle_visibility()
 
     def on_ok_button_click(self):
-        print("OK button clicked")
-        print(self.name_entry.text, self.prev_state.currently_opened_freezer)
         self.cursor.execute(
             'INSERT INTO scatole (in_freezer, nome) VALUES (?, ?)', (self.prev_state.currently_opened_freezer, self.name_entry.text)
         )
@@ -179,4 +173,6 @@ class AddBoxDialogState(State):
                  coords[1])
             )
         self.connection.commit()
+        metrics.counter("boxes.added").inc()
+        metrics.counter("cells.added").inc(len(self.altered_cells))
         self.exit_state()
\ No newline at end of file
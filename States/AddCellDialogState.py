@@ -6,7 +6,7 @@ from UI.Label import Label
 
 class AddCellDialogState(State):
     def __init__(self, game, connection: Connection, cursor: Cursor):
-        super().__init__(game)
+        super().__init__(game, layer="above_all")
         self.cursor = cursor
         self.connection = connection
 
@@ -12,7 +12,7 @@ import pygame as p
 
 class AddFreezerDialogState(State):
     def __init__(self, game, prev_state, connection: Connection, cursor: Cursor):
-        super().__init__(game)
+        super().__init__(game, layer="above_all")
         self.cursor = cursor
         self.connection = connection
         self.prev_state = prev_state
@@ -1,47 +1,43 @@
 from functools import partial
 import sqlite3 as sql
 
-from pygame import Color, PixelArray
 import pygame
 from States.State import State
 from States.AddFreezerDialogState import AddFreezerDialogState
 from States.AddBoxDialogState import AddBoxDialogState
 from UI.Entry import Entry
-from UI.Grid import UIGrid
+from UI.Grid import GridView
 from UI.Label import Label
-from UI.Containers import VertContainer
+from UI.Containers import VertContainer, VirtualList
 from UI.Button import ImageButton, TextButton
 from Utils.Colors import *
-
-from pygame.image import load
-from pygame.transform import smoothscale
+from Utils.Metrics import InstrumentedConnection
 
 from models import Cella, Freezer
 from ui_custom import CellInputInterface
 
+# Rows of search results shown at once, the others are reached by scrolling
+MAX_RESULT_ROWS = 10
+CELL_LIST_HEIGHT = 320
 
-def change_black_to_white(img):
-    # Convert the image to a format that allows pixel manipulation
-    img = img.convert_alpha()
-
-    # Get the pixel array
-    pixel_array = PixelArray(img)
-
-    # Iterate over each pixel and change black to white
-    for y in range(img.get_height()):
-        for x in range(img.get_width()):
-            # Check if the pixel is black
-            if img.unmap_rgb(pixel_array[x, y])[:3] == (0, 0, 0):
-                pixel_array[x, y] = Color(
-                    255, 255, 255, 255)  # Change to white
-
-    # Convert the pixel array back to a surface
-    img = pixel_array.make_surface()
+# Queries run while browsing, also timed by Benchmarks/Queries.py
+SELECT_FREEZERS = "SELECT * FROM freezers"
+SELECT_BOXES_IN_FREEZER = "SELECT * FROM scatole WHERE in_freezer = ?"
+SELECT_CELLS_IN_BOX = "SELECT * FROM celle WHERE in_scatola = ?"
+SELECT_CELL = "SELECT * FROM celle WHERE id = ?"
+SEARCH_CELLS = """SELECT * FROM celle
+                  WHERE nome LIKE ? OR
+                  tipo LIKE ? OR
+                  data LIKE ? OR
+                  descrizione LIKE ?"""
 
-    # Clean up the pixel array
-    del pixel_array
 
-    return img
+def search_parameters(query_string: str) -> tuple[str, ...]:
+    """
+    Parameters of SEARCH_CELLS: the cells with query_string anywhere in one of the columns.
+    """
+    pattern = f"%{query_string}%"
+    return pattern, pattern, pattern, pattern
 
 
 class AppState(State):
@@ -51,6 +47,7 @@ class AppState(State):
         self.con = None
         self.cur = None
         self.init()
+        self.game.startup.mark("db")
 
         self.bg_color = BACKGROUND
 
@@ -59,7 +56,13 @@ class AppState(State):
         self.currently_opened_box = None
         self.currently_selected_cell = None
         self.ci: CellInputInterface = None
-        self.box_grid = None
+        self.box_grid: GridView = None
+        self.boxes_in_grid: list = []
+        self.result_panel = None
+        self.result_list: VirtualList = None
+        self.search_results: list = []
+        self.cell_list: VirtualList = None
+        self.cells_in_box: list = []
 
         PANELS_OFFSET_Y = 100
         PANELS_Y = 120
@@ -72,7 +75,8 @@ class AppState(State):
                                             height=PANEL_HEIGHT, 
                                             bg_color=DARK_10, 
                                             corner_radius=0, 
-                                            pad=(10, 10))
+                                            pad=(10, 10),
+                                            retained=True)
 
         label1 = Label(self.canvas, 
                        10, 
@@ -94,8 +98,7 @@ class AppState(State):
                           corner_radius=label1.height // 2,
                           command=lambda: AddFreezerDialogState(self.game, self, self.con, self.cur).enter_state())
 
-        img = load(self.game.assets_dir + "\\sprites\\ui\\refresh.png")
-        img = smoothscale(img, (btn1.width, btn1.width))
+        img = self.game.assets.image("sprites/ui/refresh.png", (btn1.width, btn1.width))
         btn_refresh = ImageButton(self.canvas, 
                                   x=btn1.rect.right, 
                                   y=PANELS_Y * .5 +
@@ -116,7 +119,8 @@ class AppState(State):
             height=PANEL_HEIGHT, 
             bg_color=DARK_10,
             pad=(10, 10), 
-            corner_radius=0)
+            corner_radius=0,
+            retained=True)
 
         Label(self.canvas, 
               self.box_panel.x, 
@@ -133,7 +137,8 @@ class AppState(State):
                                         height=400, 
                                         bg_color=DARK_10,
                                         pad=(10, 10), 
-                                        corner_radius=0)
+                                        corner_radius=0,
+                                        retained=True)
 
         Label(self.canvas, 
               self.cell_panel.x, 
@@ -176,20 +181,25 @@ class AppState(State):
                               bg_color="transparent")
         
         self.refresh_freezers()
+        self.game.startup.mark("ui")
 
     def update(self, dt):
         super().update(dt)
         if self.ci is not None:
             self.ci.update(dt)
 
+    def input_canvases(self):
+        if self.ci is not None and self.ci.visible:
+            return [self.ci.canvas, self.canvas]
+        return [self.canvas]
+
     def render(self, surf):
         super().render(surf)
-        if self.ci is not None:
-            self.ci.render(surf)
 
     # Database methods
     def init(self):
-        self.con = sql.connect("celle.db")
+        # Records the latency of every statement, see Utils/Metrics.py. The dialogs get the same cursor
+        self.con = InstrumentedConnection(sql.connect(self.game.db_path))
         self.cur = self.con.cursor()
 
         # Create 'freezers' table
@@ -242,18 +252,12 @@ class AppState(State):
         self.freezers_panel.add_child(btn)
 
     def search_cell(self, query_string: str) -> None:
-        self.cur.execute("""SELECT * FROM celle 
-                                   WHERE nome LIKE ? OR 
-                                   tipo LIKE ? OR
-                                   data LIKE ? OR
-                                   descrizione LIKE ?""",
-                         (f"%{query_string}%",
-                         f"%{query_string}%",
-                         f"%{query_string}%",
-                         f"%{query_string}%"))
+        self.cur.execute(SEARCH_CELLS, search_parameters(query_string))
         self.create_result_panel(self.cur.fetchall())
     
     def create_result_panel(self, results: list) -> None:
+        self.destroy_result_panel()
+        self.search_results = results
         self.result_panel = VertContainer(self.canvas,
                                           self.search_bar.x,
                                           self.search_bar.rect.bottom + 10,
@@ -262,16 +266,15 @@ class AppState(State):
                                           corner_radius=0,
                                           pad=(10, 10)
                                           )
-        for cell in results:
-            txt = f"{cell[3]}, in box di id {cell[1]}, in freezer di id {cell[2]}"
-            self.result_panel.add_child(TextButton(self.canvas,
-                                                   text=txt,
-                                                   fg_color=TEXT,
-                                                   bg_color="transparent",
-                                                   corner_radius=0,
-                                                   hover_color=LIGHT,
-                                                   font=self.game.font_small,
-                                                   command=partial(self.open_cell_by_id, cell[0])))
+        row_height = self.game.font_small.get_height() + 10
+        self.result_list = VirtualList(self.canvas,
+                                       height=max(1, min(len(results), MAX_RESULT_ROWS)) * row_height,
+                                       bg_color="transparent",
+                                       corner_radius=0,
+                                       row_height=row_height,
+                                       row_count=len(results),
+                                       build_row=self._build_result_row)
+        self.result_panel.add_child(self.result_list)
         self.result_panel.add_child(TextButton(self.canvas,
                                                text="Chiudi risultati",
                                                bg_color="transparent",
@@ -280,6 +283,19 @@ class AppState(State):
                                                corner_radius=0,
                                                font=self.game.font_small,
                                                command=self.destroy_result_panel))
+
+    def _build_result_row(self, index: int, btn: TextButton | None) -> TextButton:
+        cell = self.search_results[index]
+        if btn is None:
+            btn = TextButton(self.canvas,
+                             fg_color=TEXT,
+                             bg_color="transparent",
+                             corner_radius=0,
+                             hover_color=LIGHT,
+                             font=self.game.font_small)
+        btn.text = f"{cell[3]}, in box di id {cell[1]}, in freezer di id {cell[2]}"
+        btn.command = partial(self.open_cell_by_id, cell[0])
+        return btn
         
     def destroy_result_panel(self):
         if self.result_panel is not None:
@@ -293,7 +309,7 @@ class AppState(State):
         for frz in self.freezers_panel.children:
             if frz != self.freezers_panel.children[frz_ind]:
                 frz.bg_color = frz.original_bg_color = DARK_10
-        self.cur.execute("SELECT * FROM scatole WHERE in_freezer = ?", (_id,))
+        self.cur.execute(SELECT_BOXES_IN_FREEZER, (_id,))
         boxes = self.cur.fetchall()
         self.box_panel.clear()
         self.box_panel.add_child(TextButton(self.canvas, 
@@ -311,57 +327,40 @@ class AppState(State):
 
     def _create_box_grid(self, boxes):
         cols = 3
-        rows = len(boxes) // cols + 1
+        rows = (len(boxes) + cols - 1) // cols
         BOX_DIM = 100
-        self.box_grid = UIGrid(self.canvas,
-                               rows=rows,
-                               cols=cols,
-                               height=BOX_DIM * rows,
-                               pad=(10, 10),
-                               bg_color=LIGHT,
-                               corner_radius=0,
-                               border_width=2)
-        self.box_panel.add_child(self.box_grid)
-        self.box_grid.recalculate_cell_dimensions()
-        # This sets (correctly) the width and height of the grid
+        self.boxes_in_grid = boxes
+        self.box_grid = GridView(self.canvas,
+                                 rows=rows,
+                                 cols=cols,
+                                 height=BOX_DIM * rows,
+                                 pad=(10, 10),
+                                 bg_color=LIGHT,
+                                 fg_color=TEXT,
+                                 corner_radius=0,
+                                 border_width=2,
+                                 font=self.game.font_small,
+                                 hover_color=DARK,
+                                 command=self._on_box_cell_click)
+        # Packing sets the width of the grid to the one of the panel
         self.box_panel.add_child(self.box_grid)
-        rows = 3
-        
-        
-        index = row = col = 0
-        while index < len(boxes):
-            box = boxes[index]
-            tb = TextButton(self.canvas,
-                       text=box[2],
-                       corner_radius=0,
-                       font=self.game.font_small,
-                       bg_color="transparent",
-                       fg_color=TEXT,
-                       hover_color=DARK,
-                       command = partial(self.open_box_by_id, box[0], row, col))
-                    # this should work as well:    command=lambda i=box[0], j=row, k=col: self.open_box_by_id(box[0], row, col))
-                    #    command=lambda: self.open_box_v2(tb))
-            tb.box = box
-            self.box_grid.add_child(tb, row=row, col=col)
-            index += 1
-            col += 1
-            if col >= cols:
-                col = 0
-                row += 1
+        for index, box in enumerate(boxes):
+            self.box_grid.set_label(divmod(index, cols), box[2])
+
+    def _on_box_cell_click(self, row: int, col: int):
+        index = row * self.box_grid.cols + col
+        # The last row can have empty cells
+        if index < len(self.boxes_in_grid):
+            self.open_box_by_id(self.boxes_in_grid[index][0], row, col)
 
     def open_box_by_id(self, _id: int, row: int, col: int):
         """Open a box by its id"""
         # Select the box
         self.currently_opened_box = _id
-        self.box_grid.cells[(row, col)].bg_color = self.box_grid.cells[(row, col)].original_bg_color = DARK
-       
-        # Deselect the other boxes
-        for b in self.box_grid.children:
-            if b != self.box_grid.cells[(row, col)]:
-                b.bg_color = b.original_bg_color = DARK_10
+        self.box_grid.select((row, col))
         
         # Get the cells in the box
-        self.cur.execute("SELECT * FROM celle WHERE in_scatola = ?", (_id,))
+        self.cur.execute(SELECT_CELLS_IN_BOX, (_id,))
         cells = self.cur.fetchall()
         self.cell_panel.clear()
         self.cell_panel.add_child(TextButton(self.canvas,
@@ -371,26 +370,40 @@ class AppState(State):
                                              corner_radius=0,
                                              hover_color=DARK,
                                              command=self.add_new_cell))
-        for cell in cells:
-            self.cell_panel.add_child(Label(self.canvas, 
-                                            text=cell[3], 
-                                            fg_color=TEXT, 
-                                            bg_color="transparent",
-                                            corner_radius=0))
+        self.cells_in_box = cells
+        self.cell_list = VirtualList(self.canvas,
+                                     height=CELL_LIST_HEIGHT,
+                                     bg_color="transparent",
+                                     corner_radius=0,
+                                     row_height=self.game.font_medium.get_height() + 20,
+                                     row_count=len(cells),
+                                     build_row=self._build_cell_row)
+        self.cell_panel.add_child(self.cell_list)
+
+    def _build_cell_row(self, index: int, label: Label | None) -> Label:
+        cell = self.cells_in_box[index]
+        if label is None:
+            label = Label(self.canvas,
+                          fg_color=TEXT,
+                          bg_color="transparent",
+                          corner_radius=0)
+        label.text = cell[3]
+        label.bg_color = LIGHT if cell[0] == self.currently_selected_cell else label.original_bg_color
+        return label
             
     def open_cell_by_id(self, _id: int) -> None:
-        self.cur.execute("SELECT * FROM celle WHERE id = ?", (_id,))
+        self.cur.execute(SELECT_CELL, (_id,))
         cella = self.cur.fetchone()
         self.open_freezer_by_id(cella[2])
-        print(cella, self.box_grid.cells)
-        selected_box_coords = [key for key in self.box_grid.cells.keys() if self.box_grid.cells[key].box[0] == cella[1]][0]
+        index = [box[0] for box in self.boxes_in_grid].index(cella[1])
+        selected_box_coords = divmod(index, self.box_grid.cols)
 
         self.destroy_result_panel()
         self.open_box_by_id(cella[1], selected_box_coords[0], selected_box_coords[1])
-        for cell in self.cell_panel.children:
-            if cell.text == cella[3]:
-                cell.bg_color = LIGHT
-                break
+        self.currently_selected_cell = cella[0]
+        index = [cell[0] for cell in self.cells_in_box].index(cella[0])
+        self.cell_list.scroll_to(index)
+        self.cell_list.refresh()
     
     def add_new_cell(self):
         self.canvas.toggle_visibility()
@@ -401,8 +414,12 @@ class AppState(State):
         self.ci = CellInputInterface(self.game, 
                                      rect=rect,
                                      on_close=self.on_cell_input_close)
+        # Drawn as an overlay, so that typing in it doesn't redraw the panels below
+        self.ci.canvas.layer = "above_all"
+        self.game.add_to_layer(self.ci.render, "above_all")
         
     def on_cell_input_close(self):
+        self.game.remove_from_layer(self.ci.render, "above_all")
         if self.ci.action == "cancel":
             self.canvas.toggle_visibility()
             return
@@ -428,7 +445,7 @@ class AppState(State):
         
 
     def refresh_freezers(self):
-        self.cur.execute("SELECT * FROM freezers")
+        self.cur.execute(SELECT_FREEZERS)
         freezers = self.cur.fetchall()
         self.freezers_panel.children.clear()
         for freezer in freezers:
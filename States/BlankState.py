@@ -86,14 +86,21 @@ class BlankState(State):
 
     def update(self, delta_time):
         super().update(delta_time)
+        # Everything here moves every frame
+        self.game.request_frame()
 
         # Update the circle, the label is automatically updated by the canvas
         self.circle.update(delta_time)
 
         self.ci.update(delta_time)
 
+    def input_canvases(self):
+        return [self.ci.canvas, self.canvas]
+
         # Move the label with sine wave
+        self.label.invalidate()
         self.label.rect.y = self.game.SCREEN_CENTER[1] + 5 * sin(time() * 2)
+        self.label.invalidate()
 
 
 class Circle:
@@ -109,8 +116,13 @@ class Circle:
         circle(surface, color=(255, 255, 255),
                center=self.position, radius=self.radius)
 
+    def get_rect(self):
+        return pygame.Rect(self.position.x - self.radius, self.position.y - self.radius, 2 * self.radius, 2 * self.radius)
+
     def update(self, delta_time):
+        self.game.invalidate(self.get_rect())
         self.position += self.velocity * self.speed_mag * delta_time
+        self.game.invalidate(self.get_rect())
         if self.position.x < 0 or self.position.x > self.game.GAME_W:
             self.velocity.x *= -1
         if self.position.y < 0 or self.position.y > self.game.GAME_H:
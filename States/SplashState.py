@@ -0,0 +1,34 @@
+from States.State import State
+from Utils.Colors import BACKGROUND
+
+
+class SplashState(State):
+    """
+    First screen of the app: a frame with just a message, presented before the main state is built, so that
+    the window shows something right away instead of staying black while the database is opened and the UI created.
+    In the update after its first frame it builds the main state and replaces itself with it.
+    """
+    def __init__(self, game, build_state, msg="Caricamento..."):
+        """
+        :param build_state: function called with the game, returning the state to show next (e.g. AppState)
+        :param msg: the message in the middle of the screen
+        """
+        super().__init__(game, msg)
+        self.bg_color = BACKGROUND
+        self.build_state = build_state
+        self.presented = False
+
+    def render(self, surface):
+        super().render(surface)
+        self.presented = True
+
+    def update(self, delta_time):
+        if not self.presented:
+            # The next frame has to come right away, not when the adaptive frame loop wakes up
+            self.game.request_frame()
+            return
+        self.game.startup.mark("splash")
+        state = self.build_state(self.game)
+        self.exit_state()
+        state.enter_state()
+        self.game.startup.finish_after_frame()
@@ -11,6 +11,7 @@ class State:
     def __init__(self, game, msg=None, layer="foreground"):
         self.game = game
         self.canvas: UICanvas = UICanvas(game)
+        self.canvas.layer = layer
         self.bg_color = BLACK
         self.render_stack = Stack()
         self.prev_state = None
@@ -28,27 +29,31 @@ class State:
     def update(self, delta_time):
         self.canvas.update(delta_time)
 
+    def input_canvases(self) -> list[UICanvas]:
+        """
+        Root canvases that receive the pointer and the keyboard (see Utils/Input.py), topmost first.
+        """
+        return [self.canvas]
+
     def enter_state(self):
         """Aggiunge lo stato allo stack di stati del gioco"""
         if self.game.state_stack.size() > 1:
             self.prev_state = self.game.state_stack.top()  # ossia l'ultimo elemento dello stack di stati
-        self.game.state_stack.push(self)
-        self.game.render_stack[self.layer].append(self.render)
+        self.game.push_state(self)
 
     def exit_state(self):
         """Rimuove lo stato dallo stack di stati del gioco"""
-        self.game.state_stack.pop()
+        self.game.pop_state()
 
     def change_layer(self, layer):
-        self.game.render_stack[self.layer].remove(self.render)
-        self.layer = layer
-        self.game.render_stack[self.layer].append(self.render)
+        self.game.remove_from_layer(self.render, self.layer)
+        self.layer = self.canvas.layer = layer
+        self.game.add_to_layer(self.render, self.layer)
 
     def change_render_index_in_layer(self, index):
         self.game.render_stack[self.layer].remove(self.render)
         self.game.render_stack[self.layer].insert(index, self.render)
+        self.game.invalidate(layer=self.layer)
 
     def set_above_all(self):
-        self.game.render_stack[self.layer].remove(self.render)
-        self.layer = "above_all"
-        self.game.render_stack["above_all"].append(self.render)
+        self.change_layer("above_all")
@@ -1,6 +1,276 @@
 import time
+from bisect import bisect_right
+from functools import lru_cache
+
+import pygame
+
+
+def linear(t):
+    return t
+
+
+def ease_in_quad(t):
+    return t * t
+
+
+def ease_out_quad(t):
+    return t * (2 - t)
+
+
+def ease_in_out_quad(t):
+    if t < 0.5:
+        return 2 * t * t
+    else:
+        return -1 + (4 - 2 * t) * t
+
+
+def ease_in_cubic(t):
+    return t * t * t
+
+
+def ease_out_cubic(t):
+    return 1 + (t - 1) * t * t
+
+
+def ease_in_out_cubic(t):
+    if t < 0.5:
+        return 4 * t * t * t
+    else:
+        return (t - 1) * (2 * t - 2) * (2 * t - 2) + 1
+
+
+# Easing functions by id, the id of a name is in EASING_IDS. TweenManager stores just the id of every tween
+EASINGS = [linear, ease_in_quad, ease_out_quad, ease_in_out_quad, ease_in_cubic, ease_out_cubic, ease_in_out_cubic]
+EASING_IDS = {easing.__name__: i for i, easing in enumerate(EASINGS)}
+# Ids of the easing functions used directly as motion (e.g. a CubicBezier) by running tweens, with the number
+# of tweens using every id: when the last one ends the id is freed, and reused by the next function
+_function_ids = {}
+_function_users: dict[int, int] = {}
+_free_ids: list[int] = []
+
+
+def register_easing(name: str, easing) -> int:
+    """
+    Makes an easing function usable by name as the motion of a tween.
+    :param name: the name, an existing one is replaced
+    :param easing: easing(t) -> eased t, with t going from 0 to 1
+    :return: the id of the easing
+    """
+    if name in EASING_IDS:
+        EASINGS[EASING_IDS[name]] = easing
+    else:
+        EASING_IDS[name] = len(EASINGS)
+        EASINGS.append(easing)
+    return EASING_IDS[name]
+
+
+def lerp(a, b, t):
+    """
+    Linear interpolation of numbers, of anything supporting + - and * by a number (e.g. pygame.Vector2),
+    of tuples component by component, of pygame.Color and pygame.Rect.
+    """
+    interpolate = interpolator(a)
+    if interpolate is None:
+        return a + (b - a) * t
+    return interpolate(a, b, t)
+
+
+def lerp_tuple(a, b, t):
+    return tuple(x + (y - x) * t for x, y in zip(a, b))
+
+
+def lerp_color(a, b, t):
+    # Color arithmetic saturates, and the easing can overshoot: the channels are computed and clamped here
+    return pygame.Color(*(min(255, max(0, round(x + (y - x) * t))) for x, y in zip(a, b)))
+
+
+def lerp_rect(a, b, t):
+    return pygame.Rect(*(round(x + (y - x) * t) for x, y in zip(a, b)))
+
+
+def interpolator(value):
+    """
+    Returns the function interpolating values like this one, None for the ones interpolated
+    with plain arithmetic (numbers, vectors).
+    """
+    if isinstance(value, Keyframes):
+        return value.interpolate
+    if isinstance(value, pygame.Color):
+        return lerp_color
+    if isinstance(value, pygame.Rect):
+        return lerp_rect
+    if isinstance(value, tuple):
+        return lerp_tuple
+    return None
+
+
+class CubicBezier:
+    """
+    Easing curve defined like the CSS cubic-bezier(x1, y1, x2, y2): the curve from (0, 0) to (1, 1) with
+    control points (x1, y1) and (x2, y2), giving the eased progress (y) for a progress (x).
+    The curve is solved once (at the first evaluation) for `samples` evenly spaced x, then an evaluation is a lookup
+    in that table and a linear interpolation, whatever the curve. Use cubic_bezier() to share the tables of equal curves.
+    """
+    def __init__(self, x1: float, y1: float, x2: float, y2: float, samples: int = 256):
+        """
+        :param x1: x of the first control point, between 0 and 1
+        :param y1: y of the first control point, can be outside 0..1 (the curve overshoots)
+        :param x2: x of the second control point, between 0 and 1
+        :param y2: y of the second control point
+        :param samples: size of the lookup table
+        """
+        if not (0 <= x1 <= 1 and 0 <= x2 <= 1):
+            raise ValueError("The x of the control points must be between 0 and 1")
+        self.points = (x1, y1, x2, y2)
+        self.samples = samples
+        self.table: list[float] | None = None
+
+    def build_table(self):
+        self.table = [self._y(self._solve(k / (self.samples - 1))) for k in range(self.samples)]
+        self.table.append(self.table[-1])  # So that t = 1 can read table[i + 1]
+
+    def _x(self, s):
+        x1, _, x2, _ = self.points
+        return 3 * (1 - s) ** 2 * s * x1 + 3 * (1 - s) * s * s * x2 + s ** 3
+
+    def _y(self, s):
+        _, y1, _, y2 = self.points
+        return 3 * (1 - s) ** 2 * s * y1 + 3 * (1 - s) * s * s * y2 + s ** 3
+
+    def _solve(self, x: float) -> float:
+        """
+        Returns the parameter s of the curve at which its x is x. x(s) is monotonic, so a bisection always works.
+        """
+        low, high = 0.0, 1.0
+        for _ in range(30):
+            s = (low + high) / 2
+            if self._x(s) < x:
+                low = s
+            else:
+                high = s
+        return (low + high) / 2
+
+    def __call__(self, t: float) -> float:
+        if t <= 0:
+            return 0.0
+        if t >= 1:
+            return 1.0
+        if self.table is None:
+            self.build_table()
+        position = t * (self.samples - 1)
+        i = int(position)
+        y = self.table[i]
+        return y + (self.table[i + 1] - y) * (position - i)
+
+    def __repr__(self):
+        return f"CubicBezier{self.points}"
+
+
+@lru_cache(maxsize=None)
+def cubic_bezier(x1: float, y1: float, x2: float, y2: float) -> CubicBezier:
+    """
+    Returns the curve with these control points, with its table computed only the first time.
+    """
+    return CubicBezier(x1, y1, x2, y2)
+
+
+class Keyframes:
+    """
+    Value going through several keyframes, e.g. [(0, 0), (0.3, 100, "ease_out"), (1, 80, "ease_in_out")]:
+    every keyframe is (time, value) or (time, value, motion), where time goes from 0 to 1 (fraction of the
+    duration of the tween) and motion is the easing of the segment ending at that keyframe (linear by default).
+    Used as from_ of a tween (see TweenManager.add_keyframes).
+    """
+    def __init__(self, keyframes):
+        keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        if len(keyframes) < 2:
+            raise ValueError("At least two keyframes are needed")
+        self.times = [keyframe[0] for keyframe in keyframes]
+        self.values = [tuple(keyframe[1]) if isinstance(keyframe[1], list) else keyframe[1] for keyframe in keyframes]
+        self.easings = [easing_function(keyframe[2] if len(keyframe) > 2 else "linear") for keyframe in keyframes]
+        self.interpolators = [interpolator(value) for value in self.values]
+
+    @property
+    def first(self):
+        return self.values[0]
+
+    @property
+    def last(self):
+        return self.values[-1]
+
+    def value_at(self, t: float):
+        i = bisect_right(self.times, t)
+        if i == 0:
+            return self.values[0]
+        if i == len(self.times):
+            return self.values[-1]
+        start, end = self.times[i - 1], self.times[i]
+        local = self.easings[i]((t - start) / (end - start)) if end > start else 1.0
+        a, b = self.values[i - 1], self.values[i]
+        interpolate = self.interpolators[i - 1]
+        return a + (b - a) * local if interpolate is None else interpolate(a, b, local)
+
+    def interpolate(self, keyframes, end, t):
+        # Same signature of the other interpolators: a tween holds the Keyframes as start value
+        return self.value_at(t)
+
+
+def easing_function(motion):
+    """
+    Returns the easing function of a motion: a name (see EASING_IDS) or an easing function (e.g. a CubicBezier).
+    """
+    return EASINGS[EASING_IDS[motion]] if isinstance(motion, str) else motion
+
+
+def easing_id(motion) -> int:
+    """
+    Returns the id of a motion. An easing function gets an id of its own, kept until release_easing
+    has been called as many times as easing_id.
+    """
+    if isinstance(motion, str):
+        return EASING_IDS[motion]
+    easing = _function_ids.get(motion)
+    if easing is None:
+        if _free_ids:
+            easing = _free_ids.pop()
+            EASINGS[easing] = motion
+        else:
+            easing = len(EASINGS)
+            EASINGS.append(motion)
+        _function_ids[motion] = easing
+        _function_users[easing] = 0
+    _function_users[easing] += 1
+    return easing
+
+
+def release_easing(easing: int):
+    """
+    Tells that a tween using the easing with this id has ended. The ids of the names are kept forever.
+    :return: None
+    """
+    users = _function_users.get(easing)
+    if users is None:
+        return
+    if users > 1:
+        _function_users[easing] = users - 1
+        return
+    del _function_users[easing]
+    del _function_ids[EASINGS[easing]]
+    EASINGS[easing] = None
+    _free_ids.append(easing)
+
+
+# The timing functions of CSS
+register_easing("ease", cubic_bezier(0.25, 0.1, 0.25, 1.0))
+register_easing("ease_in", cubic_bezier(0.42, 0.0, 1.0, 1.0))
+register_easing("ease_out", cubic_bezier(0.0, 0.0, 0.58, 1.0))
+register_easing("ease_in_out", cubic_bezier(0.42, 0.0, 0.58, 1.0))
+
 
 class Tween:
+    """
+    A single tween timed by the wall clock, for use outside the game loop. In the game use Game.tweener.
+    """
     def __init__(self, target, duration, on_finish: callable = None, motion: str = "ease_in_out_cubic", **kwargs):
         self.motion = motion
         self.target = target
@@ -24,80 +294,178 @@ class Tween:
     def update(self):
         if not self._is_running:
             return
-
-        if time.time() > self.end_time:
-            self.stop()
-            return
-
+        now = time.time()
+        self.progress = min(1, (now - self.start_time) / self.duration) if self.duration > 0 else 1
         self._update()
+        if now >= self.end_time:
+            self.stop()
 
     def is_finished(self):
         return not self._is_running
 
     def _update(self):
-        self.progress = (time.time() - self.start_time) / self.duration
-        # if self.kwargs.get("tween_property"):
-        #     setattr(self.target, self.kwargs['tween_property'], lerp(self.kwargs['from_'], self.kwargs['to_'], self.progress))
         if self.kwargs.get("tween_property"):
-            setattr(self.target, self.kwargs['tween_property'], Tween.lerp(
+            setattr(self.target, self.kwargs['tween_property'], lerp(
                 self.kwargs['from_'],
                 self.kwargs['to_'],
-                getattr(self, self.motion)(self.progress)
+                easing_function(self.motion)(self.progress)
                 ))
 
     def __repr__(self):
         return f'Tween(target={self.target}, duration={self.duration}, kwargs={self.kwargs})'
-    
-    @staticmethod
-    def lerp(a, b, t):
-        return a + (b - a) * t
 
-    @staticmethod
-    def ease_in_quad(t):
-        return t * t
+    lerp = staticmethod(lerp)
+    ease_in_quad = staticmethod(ease_in_quad)
+    ease_out_quad = staticmethod(ease_out_quad)
+    ease_in_out_quad = staticmethod(ease_in_out_quad)
+    ease_in_cubic = staticmethod(ease_in_cubic)
+    ease_out_cubic = staticmethod(ease_out_cubic)
+    ease_in_out_cubic = staticmethod(ease_in_out_cubic)
 
-    @staticmethod
-    def ease_out_quad(t):
-        return t * (2 - t)
 
-    @staticmethod
-    def ease_in_out_quad(t):
-        if t < 0.5:
-            return 2 * t * t
-        else:
-            return -1 + (4 - 2 * t) * t
-        
-    @staticmethod
-    def ease_in_cubic(t):
-        return t * t * t
-
-    @staticmethod
-    def ease_out_cubic(t):
-        return 1 + (t - 1) * t * t
-
-    @staticmethod
-    def ease_in_out_cubic(t):
-        if t < 0.5:
-            return 4 * t * t * t
-        else:
-            return (t - 1) * (2 * t - 2) * (2 * t - 2) + 1
-    
 class TweenManager:
+    """
+    The running tweens of the game, advanced by the frame dt (see Game.update).
+    Tweens are stored by column (a list per field, the same index in every list is the same tween) instead of as
+    objects, so a frame advances all of them with a few list comprehensions and then only assigns the values.
+    Finished tweens get exactly their final value, are removed, and then their on_finish is called (which
+    can add new tweens).
+    A tween added between two frames doesn't get the dt of the next one, which is the time elapsed before it was
+    added (e.g. the idle wait before the click that started it): it starts moving from the frame after.
+    """
     def __init__(self):
-        self.tweens = []
+        self._next_id = 0
+        self.ids: list[int] = []
+        self.targets: list = []
+        self.properties: list[str] = []
+        self.starts: list = []
+        self.ends: list = []
+        self.elapsed: list[float] = []
+        self.durations: list[float] = []
+        self.easings: list[int] = []
+        # Interpolation function of the values of every tween, None for plain arithmetic (see interpolator)
+        self.interpolators: list = []
+        self.on_finish: list = []
+        # False for the tweens added since the last update, which don't get its dt
+        self.started: list[bool] = []
+        self._unstarted = 0
+        # Tweens added by the on_finish callbacks during update start right away
+        self._updating = False
 
-    def add_tween(self, target, tween_property, from_, to_, duration, on_finish: callable = None, motion: str = "ease_in_out_cubic"):
-        tween = Tween(target, duration, on_finish=on_finish, motion=motion, tween_property=tween_property, from_=from_, to_=to_)
-        tween.start()
-        self.tweens.append(tween)
+    def __len__(self):
+        return len(self.ids)
 
-    def update(self):
-        for tween in self.tweens:
-            tween.update()
-            if tween.is_finished():
-                if tween.on_finish:
-                    tween.on_finish.__call__()
-                self.tweens.remove(tween)
+    def add_tween(self, target, tween_property, from_, to_, duration, on_finish: callable = None,
+                  motion="ease_in_out_cubic") -> int:
+        """
+        Animates target.tween_property from from_ to to_. The values can be numbers, vectors, tuples,
+        pygame.Color and pygame.Rect.
+        :param duration: in seconds
+        :param on_finish: called after the last value is set
+        :param motion: name of the easing (see EASING_IDS), or an easing function like a CubicBezier
+        :return: the id of the tween, for cancel
+        """
+        self._next_id += 1
+        if isinstance(from_, list):
+            from_, to_ = tuple(from_), tuple(to_)
+        setattr(target, tween_property, from_.first if isinstance(from_, Keyframes) else from_)
+        self.ids.append(self._next_id)
+        self.targets.append(target)
+        self.properties.append(tween_property)
+        self.starts.append(from_)
+        self.ends.append(to_)
+        self.elapsed.append(0.0)
+        self.durations.append(float(duration))
+        self.easings.append(easing_id(motion))
+        self.interpolators.append(interpolator(from_))
+        self.on_finish.append(on_finish)
+        self.started.append(self._updating)
+        if not self._updating:
+            self._unstarted += 1
+        return self._next_id
+
+    def add_keyframes(self, target, tween_property, keyframes, duration, on_finish: callable = None,
+                      motion="linear") -> int:
+        """
+        Animates target.tween_property through keyframes (see Keyframes).
+        :param keyframes: a Keyframes, or the list of its keyframes
+        :param motion: easing of the whole timeline, the segments have their own
+        :return: the id of the tween, for cancel
+        """
+        if not isinstance(keyframes, Keyframes):
+            keyframes = Keyframes(keyframes)
+        return self.add_tween(target, tween_property, keyframes, keyframes.last, duration, on_finish, motion)
+
+    def cancel(self, tween_id: int, finish: bool = False):
+        """
+        Stops a tween, leaving the property where it is.
+        :param finish: set the final value and call on_finish, as if the tween had ended
+        :return: None
+        """
+        if tween_id not in self.ids:
+            return
+        index = self.ids.index(tween_id)
+        target, tween_property, end, on_finish = (self.targets[index], self.properties[index], self.ends[index],
+                                                  self.on_finish[index])
+        self._remove({index})
+        if finish:
+            setattr(target, tween_property, end)
+            if on_finish is not None:
+                on_finish()
+
+    def cancel_all(self, target):
+        """
+        Stops every tween of target, e.g. before it gets new ones.
+        """
+        self._remove({i for i, other in enumerate(self.targets) if other is target})
+
+    def update(self, dt: float):
+        """
+        Advances all the tweens by dt seconds.
+        :return: None
+        """
+        if not self.ids:
+            return
+        if self._unstarted:
+            elapsed = self.elapsed = [e + dt if s else e for e, s in zip(self.elapsed, self.started)]
+            self.started = [True] * len(self.ids)
+            self._unstarted = 0
+        else:
+            elapsed = self.elapsed = [e + dt for e in self.elapsed]
+        progress = [e / d if e < d else 1.0 for e, d in zip(elapsed, self.durations)]
+        easings = EASINGS
+        eased = [easings[k](t) for k, t in zip(self.easings, progress)]
+        for target, tween_property, a, b, t, interpolate in zip(self.targets, self.properties, self.starts, self.ends,
+                                                                eased, self.interpolators):
+            if interpolate is None:
+                setattr(target, tween_property, a + (b - a) * t)
+            else:
+                setattr(target, tween_property, interpolate(a, b, t))
+        finished = {i for i, t in enumerate(progress) if t >= 1.0}
+        if finished:
+            callbacks = [self.on_finish[i] for i in sorted(finished)]
+            for i in finished:
+                # The eased value of some easings is not exactly 1 at the end
+                setattr(self.targets[i], self.properties[i], self.ends[i])
+            self._remove(finished)
+            self._updating = True
+            try:
+                for callback in callbacks:
+                    if callback is not None:
+                        callback()
+            finally:
+                self._updating = False
+
+    def _remove(self, indices: set[int]):
+        for i in indices:
+            release_easing(self.easings[i])
+            if not self.started[i]:
+                self._unstarted -= 1
+        keep = [i for i in range(len(self.ids)) if i not in indices]
+        for name in ("ids", "targets", "properties", "starts", "ends", "elapsed", "durations", "easings",
+                     "interpolators", "on_finish", "started"):
+            column = getattr(self, name)
+            setattr(self, name, [column[i] for i in keep])
 
     def is_empty(self) -> bool:
-        return len(self.tweens) == 0
\ No newline at end of file
+        return len(self.ids) == 0
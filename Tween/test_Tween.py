@@ -1,7 +1,11 @@
+import os
 import unittest
 import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
 import pygame
-from Tween import Tween
+from Tween import EASINGS, CubicBezier, Keyframes, Tween, TweenManager, cubic_bezier, easing_function
 
 class TweenTest(unittest.TestCase):
     def setUp(self):
@@ -27,5 +31,159 @@ class TweenTest(unittest.TestCase):
 
         self.assertEqual(square.topleft, (200, 200))
 
+
+class Target:
+    def __init__(self):
+        self.x = 0
+
+
+def added_frame(tweener: TweenManager):
+    """
+    The frame in which the tweens have been added: its dt, a long idle wait here, doesn't move them.
+    """
+    tweener.update(1.0)
+
+
+class TweenManagerTest(unittest.TestCase):
+    def test_driven_by_dt(self):
+        tweener = TweenManager()
+        target = Target()
+        tweener.add_tween(target, "x", 0, 10, 1.0, motion="linear")
+        added_frame(tweener)
+        self.assertEqual(target.x, 0)
+        tweener.update(0.25)
+        self.assertAlmostEqual(target.x, 2.5)
+        tweener.update(0.25)
+        self.assertAlmostEqual(target.x, 5)
+
+    def test_finished_tweens_end_exactly_and_are_all_removed(self):
+        tweener = TweenManager()
+        targets = [Target() for _ in range(3)]
+        finished = []
+        for i, target in enumerate(targets):
+            tweener.add_tween(target, "x", 0, 7, 0.1, on_finish=lambda i=i: finished.append(i), motion="ease_out_quad")
+        added_frame(tweener)
+        tweener.update(0.05)
+        tweener.update(0.06)
+        self.assertEqual([target.x for target in targets], [7, 7, 7])
+        self.assertEqual(finished, [0, 1, 2])
+        self.assertTrue(tweener.is_empty())
+
+    def test_on_finish_can_chain_tweens(self):
+        tweener = TweenManager()
+        target = Target()
+        tweener.add_tween(target, "x", 0, 1, 0.1, on_finish=lambda: tweener.add_tween(target, "x", 1, 0, 0.1))
+        added_frame(tweener)
+        # The chained tween starts when the first one ends, within the frame
+        tweener.update(0.2)
+        self.assertEqual(len(tweener), 1)
+        tweener.update(0.2)
+        self.assertEqual(target.x, 0)
+        self.assertTrue(tweener.is_empty())
+
+    def test_vectors_and_tuples(self):
+        tweener = TweenManager()
+        target = Target()
+        rect = pygame.Rect(0, 0, 10, 10)
+        tweener.add_tween(target, "x", pygame.Vector2(0, 0), pygame.Vector2(10, 20), 1.0, motion="linear")
+        tweener.add_tween(rect, "topleft", (0, 0), (100, 50), 1.0, motion="linear")
+        added_frame(tweener)
+        tweener.update(0.5)
+        self.assertEqual(target.x, pygame.Vector2(5, 10))
+        self.assertEqual(rect.topleft, (50, 25))
+
+    def test_cancel(self):
+        tweener = TweenManager()
+        target, other = Target(), Target()
+        tween_id = tweener.add_tween(target, "x", 0, 10, 1.0, motion="linear")
+        tweener.add_tween(other, "x", 0, 10, 1.0, motion="linear")
+        added_frame(tweener)
+        tweener.update(0.5)
+        tweener.cancel(tween_id)
+        tweener.update(0.25)
+        self.assertEqual((target.x, other.x), (5, 7.5))
+        tweener.cancel_all(other)
+        self.assertTrue(tweener.is_empty())
+
+    def test_added_tween_skips_the_idle_dt(self):
+        tweener = TweenManager()
+        target, running = Target(), Target()
+        tweener.add_tween(running, "x", 0, 10, 4.0, motion="linear")
+        added_frame(tweener)
+        # Added after a second of idle wait, e.g. by a click
+        tweener.add_tween(target, "x", 0, 100, 0.3, motion="linear")
+        tweener.update(1.0)
+        self.assertEqual(len(tweener), 2)
+        self.assertEqual((target.x, running.x), (0, 2.5))
+        tweener.update(0.1)
+        self.assertTrue(0 < target.x < 100)
+        tweener.cancel_all(target)
+        # A tween added and cancelled before the next frame leaves the others running
+        tweener.cancel(tweener.add_tween(target, "x", 0, 100, 0.3))
+        tweener.update(0.4)
+        self.assertAlmostEqual(running.x, 3.75)
+
+
+class EasingTest(unittest.TestCase):
+    def test_cubic_bezier(self):
+        linear = CubicBezier(0, 0, 1, 1)
+        for t in (0, 0.1, 0.5, 0.77, 1):
+            self.assertAlmostEqual(linear(t), t, places=3)
+        # Values of the CSS "ease" timing function
+        ease = easing_function("ease")
+        self.assertAlmostEqual(ease(0.25), 0.4085, places=3)
+        self.assertAlmostEqual(ease(0.5), 0.8024, places=3)
+        self.assertEqual((ease(-1), ease(2)), (0, 1))
+
+    def test_curves_are_shared(self):
+        self.assertIs(cubic_bezier(0.1, 0.2, 0.3, 0.4), cubic_bezier(0.1, 0.2, 0.3, 0.4))
+        with self.assertRaises(ValueError):
+            CubicBezier(-0.5, 0, 1, 1)
+
+    def test_keyframes(self):
+        keyframes = Keyframes([(0, 0), (0.5, 100), (1, 50, "ease_in_quad")])
+        self.assertEqual(keyframes.value_at(0.25), 50)
+        self.assertEqual(keyframes.value_at(0.5), 100)
+        self.assertEqual(keyframes.value_at(0.75), 87.5)
+        self.assertEqual(keyframes.value_at(1), 50)
+
+    def test_tween_colors_rects_and_keyframes(self):
+        tweener = TweenManager()
+        target = Target()
+        rect = Target()
+        tweener.add_tween(target, "x", pygame.Color(0, 0, 0), pygame.Color(255, 100, 50), 1.0, motion="linear")
+        tweener.add_tween(rect, "x", pygame.Rect(0, 0, 10, 10), pygame.Rect(100, 50, 20, 10), 1.0,
+                          motion=CubicBezier(0, 0, 1, 1))
+        positions = Target()
+        tweener.add_keyframes(positions, "x", [(0, pygame.Vector2(0, 0)), (0.5, pygame.Vector2(10, 0)),
+                                               (1, pygame.Vector2(10, 10))], 1.0)
+        added_frame(tweener)
+        tweener.update(0.5)
+        self.assertEqual(target.x, pygame.Color(128, 50, 25))
+        self.assertEqual(rect.x, pygame.Rect(50, 25, 15, 10))
+        self.assertEqual(positions.x, pygame.Vector2(10, 0))
+        tweener.update(0.5)
+        self.assertEqual((target.x, rect.x, positions.x),
+                         (pygame.Color(255, 100, 50), pygame.Rect(100, 50, 20, 10), pygame.Vector2(10, 10)))
+
+    def test_easing_functions_are_released(self):
+        tweener = TweenManager()
+        target = Target()
+        size = len(EASINGS)
+        for i in range(20):
+            shared = CubicBezier(0, 0, 1, 1)
+            tweener.add_tween(target, "x", 0, 10, 1.0, motion=shared)
+            tweener.add_tween(target, "y", 0, 10, 2.0, motion=shared)
+            tweener.add_tween(target, "z", 0, 10, 1.0, motion=lambda t: t)
+            added_frame(tweener)
+            tweener.update(1.0)
+            # The first tween ended, the second keeps using the curve
+            self.assertIn(shared, EASINGS)
+            tweener.update(1.0)
+            self.assertTrue(tweener.is_empty())
+        self.assertLessEqual(len(EASINGS), size + 2)
+        self.assertNotIn(shared, EASINGS)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
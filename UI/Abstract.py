@@ -1,20 +1,199 @@
+from typing import TYPE_CHECKING
+
 import pygame
 
-from Game import Game
+from UI.HitTest import HitTestGrid, hit_testable_widgets
 from Utils import Draw
+from Utils.Text import CachedText
+
+if TYPE_CHECKING:
+    from Game import Game
+
+# Attributes that change what a widget looks like: assigning a new value to one of them reports the widget as changed
+DAMAGE_ATTRIBUTES = frozenset(("rect", "visible", "text", "bg_color", "fg_color", "font", "current_image"))
+# Attributes the rendered text of a widget depends on
+TEXT_ATTRIBUTES = frozenset(("text", "fg_color", "font"))
+# Attributes that decide which widget is under the pointer: changing one of them rebuilds the hit-test index
+LAYOUT_ATTRIBUTES = frozenset(("rect", "visible", "interactable"))
+
+_MISSING = object()
+
+
+class ChildList(list):
+    """
+    List of children that tells its owner about every child added or removed,
+    so that the area they cover gets redrawn.
+    """
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+
+    def append(self, child):
+        super().append(child)
+        child.set_input_attached(self.owner.input_attached)
+        self.owner.on_children_changed((child,))
+
+    def insert(self, index, child):
+        super().insert(index, child)
+        child.set_input_attached(self.owner.input_attached)
+        self.owner.on_children_changed((child,))
+
+    def extend(self, children):
+        children = tuple(children)
+        super().extend(children)
+        for child in children:
+            child.set_input_attached(self.owner.input_attached)
+        self.owner.on_children_changed(children)
+
+    def remove(self, child):
+        super().remove(child)
+        child.set_input_attached(False)
+        self.owner.on_children_changed((child,))
+
+    def pop(self, index=-1):
+        child = super().pop(index)
+        child.set_input_attached(False)
+        self.owner.on_children_changed((child,))
+        return child
+
+    def clear(self):
+        children = tuple(self)
+        super().clear()
+        for child in children:
+            child.set_input_attached(False)
+        self.owner.on_children_changed(children)
 
 
 class UICanvas:
-    def __init__(self, game: Game):
+    # Event types this widget needs from Game.input (e.g. pygame.MOUSEWHEEL), subscribed only while it is in a
+    # live widget tree, see set_input_attached
+    input_events: tuple[int, ...] = ()
+
+    def __init__(self, game: "Game"):
         self.game = game
         self.font = game.font_medium
         self.y = None
         self.width = None
         self.x = None
         self.rect = None
-        self.children: list[UIContainer] = []
+        self.children: list[UIContainer] = ChildList(self)
         self.visible = True
         self.interactable = True
+        # Receives the pointer events (see Utils/Input.py) and the hover
+        self.clickable = False
+        # Can take the keyboard focus with a click
+        self.focusable = False
+        # Set by Game.input on the clickable widget under the pointer, and only on that one
+        self.hovered = False
+        # Render layer (see Game.render_stack) of a root canvas, None for the layer of the current state
+        self.layer = None
+        # Hit-test index of a root canvas, rebuilt in hit_test after a layout change
+        self.hit_index: HitTestGrid | None = None
+        self.layout_changed = True
+        # Whether the input_events of this element are subscribed: a root canvas is live until its state is popped
+        self.input_attached = True
+
+    def __setattr__(self, name, value):
+        if name in DAMAGE_ATTRIBUTES:
+            old = getattr(self, name, _MISSING)
+            object.__setattr__(self, name, value)
+            if old is value or old is _MISSING and (name != "rect" or value is None):
+                return
+            if old is not _MISSING and old == value:
+                return
+            if name in TEXT_ATTRIBUTES and "rendered_text" in self.__dict__:
+                self.rendered_text.invalidate()
+            if name == "rect" and old is not None and old is not _MISSING:
+                self.game.invalidate(old)
+            self.invalidate(layout=name in LAYOUT_ATTRIBUTES)
+        elif name == "interactable":
+            old = getattr(self, name, _MISSING)
+            object.__setattr__(self, name, value)
+            if old is not _MISSING and old != value:
+                self.invalidate_layout()
+        else:
+            object.__setattr__(self, name, value)
+
+    def invalidate(self, layout=True):
+        """
+        Reports this element as changed: its area gets redrawn and the cached surfaces of the
+        retained containers holding it are dropped.
+        Assigning rect, visible, text, bg_color, fg_color, font or current_image does it automatically,
+        call it by hand around in-place changes of the rect (e.g. rect.update).
+        :param layout: whether the rect or the visibility may have changed, False for a change of the looks only
+        :return: None
+        """
+        self.invalidate_backing()
+        root = self.get_root()
+        if layout:
+            root.layout_changed = True
+        self.game.invalidate(self.rect, root.layer)
+
+    def invalidate_area(self, rect):
+        """
+        Reports a changed area drawn by this element (e.g. by its caret).
+        :return: None
+        """
+        self.game.invalidate(rect, self.get_layer())
+
+    def invalidate_layout(self):
+        """
+        Marks the hit-test index of the root canvas as stale.
+        :return: None
+        """
+        self.get_root().layout_changed = True
+
+    def get_root(self) -> "UICanvas":
+        """
+        Returns the root canvas this element belongs to.
+        """
+        node = self
+        while node.__dict__.get("parent") is not None:
+            node = node.parent
+        return node
+
+    def get_layer(self) -> str | None:
+        """
+        Returns the render layer of the root canvas this element belongs to.
+        """
+        return self.get_root().layer
+
+    def invalidate_backing(self):
+        """
+        Drops the cached surface of this element and of every retained container above it.
+        :return: None
+        """
+        node = self
+        while node is not None:
+            if node.__dict__.get("backing") is not None:
+                node.backing = None
+            node = node.__dict__.get("parent")
+
+    def set_input_attached(self, attached: bool):
+        """
+        Subscribes the input_events of this element and of everything under it to Game.input, or unsubscribes them.
+        Done by the ChildList when an element is added to or removed from its parent, and by Game for the canvas
+        of a state pushed on or popped from the stack. Calling it twice with the same value does nothing.
+        :return: None
+        """
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            if node.input_attached != attached:
+                for event_type in node.input_events:
+                    if attached:
+                        node.game.input.subscribe(event_type)
+                    else:
+                        node.game.input.unsubscribe(event_type)
+                node.input_attached = attached
+            nodes.extend(node.children)
+
+    def on_children_changed(self, children):
+        self.invalidate_backing()
+        self.invalidate_layout()
+        for child in children:
+            if getattr(child, "rect", None) is not None:
+                self.invalidate_area(child.rect)
 
     def add_child(self, child):
         if child.parent is not None:
@@ -32,6 +211,47 @@ class UICanvas:
             for ui_element in self.children:
                 ui_element.update(dt)
 
+    def hit_test(self, pos):
+        """
+        Returns the topmost widget of this root canvas at pos that is clickable or has an opaque background,
+        with a single query to the hit-test index, which is rebuilt only after a layout change.
+        """
+        if self.layout_changed:
+            if self.hit_index is None:
+                self.hit_index = HitTestGrid()
+            self.hit_index.rebuild(hit_testable_widgets(self))
+            self.layout_changed = False
+        return self.hit_index.widget_at(pos)
+
+    # Input handlers, called by Game.input. The pointer ones are passed on to the parent unless they return True
+
+    def on_hover(self):
+        pass
+
+    def on_unhover(self):
+        pass
+
+    def on_mouse_down(self, event) -> bool:
+        return False
+
+    def on_mouse_up(self, event) -> bool:
+        return False
+
+    def on_mouse_wheel(self, event) -> bool:
+        return False
+
+    def on_focus(self):
+        pass
+
+    def on_blur(self):
+        pass
+
+    def on_key_down(self, event):
+        pass
+
+    def on_key_up(self, event):
+        pass
+
     def toggle_visibility(self):
         self.visible = not self.visible
         for child in self.children:
@@ -45,7 +265,8 @@ class UICanvas:
 
 class UIContainer(UICanvas):
     def __init__(self, parent: UICanvas, x=0, y=0, center: tuple[int, int] = None, width=None, height=None,
-                 bg_color: tuple | str = (40, 40, 40), fg_color=(0, 0, 0), font: pygame.font.Font | None = None, corner_radius=10, border_width=0):
+                 bg_color: tuple | str = (40, 40, 40), fg_color=(0, 0, 0), font: pygame.font.Font | int | None = None, corner_radius=10, border_width=0,
+                 retained=False):
         """
         Container for GUI
         :param parent: the parent, usually a UICanvas
@@ -56,14 +277,22 @@ class UIContainer(UICanvas):
         :param height: height of the container
         :param bg_color: background colour
         :param fg_color: foreground colour (text)
+        :param font: the font, or its size to use the default face (see Game.fonts). None for game.font_medium
         :param corner_radius: corner radius for smoothed rectangles
+        :param border_width: width of the border, 0 fills the background
+        :param retained: keep the rendered subtree in a surface, re-rendered only after something in it is
+        invalidated. Works for containers with an opaque, square, filled background (like the panels),
+        otherwise the subtree is simply rendered every frame
         """
         super().__init__(parent.game)
+        if isinstance(font, int):
+            font = self.game.fonts.get(font)
         self.font = font if font is not None else self.game.font_medium
-        self.children: list[UIContainer] = []
+        self.children: list[UIContainer] = ChildList(self)
 
         self.parent = parent
-
+        # Not in a tree yet, appending it to the parent subscribes its input_events if the parent is live
+        self.input_attached = False
         self.parent.children.append(self)
 
         self.x = x
@@ -79,8 +308,11 @@ class UIContainer(UICanvas):
         self.fg_color = fg_color
         self.corner_radius = corner_radius
         self.border_width = border_width
+        self.retained = retained
+        self.backing: pygame.Surface | None = None
 
     def rescale(self, rect: pygame.rect.Rect):
+        self.invalidate()
         px, py = self.x, self.y
         self.rect = rect
         horizontal_scaling_factor = float(rect.width) / self.width
@@ -92,12 +324,17 @@ class UIContainer(UICanvas):
             child.y = self.y + round(vertical_scaling_factor * (child.y - py))
             child.height = round(child.height * vertical_scaling_factor)
             child.width = round(child.width * horizontal_scaling_factor)
+            child.invalidate()
             child.rect.update(child.x, child.y, child.width, child.height)
+            child.invalidate()
 
     def render(self, surface: pygame.Surface):
         # super().render(surface)
         # surface.fill(self.original_bg_color, self.rect)
         if self.visible:
+            if self.backing is not None:
+                surface.blit(self.backing, self.rect)
+                return
             # pygame.draw.rect(surface, self.bg_color, self.rect, border_radius=self.corner_radius)
             Draw.draw_rect_alpha(surface, 
                                  color=self.bg_color,
@@ -107,6 +344,22 @@ class UIContainer(UICanvas):
                                  )
             for child in self.children:
                 child.render(surface)
+            if self.retained and self.can_retain(surface):
+                self.backing = surface.subsurface(self.rect).copy()
+
+    def can_retain(self, surface: pygame.Surface) -> bool:
+        """
+        Whether what has just been rendered in self.rect can be reused as is: the background must hide
+        whatever is behind the container, the children must lie inside it and nothing must have been clipped.
+        """
+        bg = self.bg_color
+        if isinstance(bg, str) or len(bg) == 4 and bg[3] != 255:
+            return False
+        if self.corner_radius > 0 or self.border_width != 0:
+            return False
+        if not surface.get_clip().contains(self.rect):
+            return False
+        return all(self.rect.contains(child.rect) for child in self.children)
 
     def update(self, dt):
         if self.visible:
@@ -126,6 +379,8 @@ class UIContainer(UICanvas):
 
         # TODO: Rewrite this method, it's kinda garbage
 
+        self.invalidate()
+        self.parent.invalidate()
         s = side.lower()
         if s == "vert":
             # Not very stonks
@@ -156,6 +411,8 @@ class UIContainer(UICanvas):
         self.rect.update(self.x, self.y, self.width, self.height)
         self.parent.rect.update(
             self.parent.x, self.parent.y, self.parent.width, self.parent.height)
+        self.invalidate()
+        self.parent.invalidate()
         
     def clear(self):
         self.children.clear()
@@ -164,12 +421,12 @@ class UIContainer(UICanvas):
 class UIElement(UIContainer):
     def __init__(self, parent: UICanvas = None, x=0, y=0, center=None, width=None, height=None,
                  bg_color: tuple | str = (40, 40, 40),
-                 fg_color=(0, 0, 0), font: pygame.font.Font | None = None, text: str = "", corner_radius=10):
+                 fg_color=(0, 0, 0), font: pygame.font.Font | int | None = None, text: str = "", corner_radius=10):
         super().__init__(parent, x, y, center, width,
                          height, bg_color, fg_color, font, corner_radius)
 
-        self.clickable: bool = False
         self.text = text
+        self.rendered_text = CachedText()
 
         self.game = self.parent.game
 
@@ -179,8 +436,6 @@ class UIElement(UIContainer):
     def update(self, dt):
         if self.visible:
             super().update(dt)
-            for ui_element in self.children:
-                ui_element.update(dt)
 
     def __str__(self):
         return f"{self.x}, {self.y}, {self.width}, {self.height}\nChildren: {len(self.children)}"
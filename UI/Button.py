@@ -1,7 +1,6 @@
 import pygame
 
 from UI.Abstract import UIElement, UICanvas
-from Utils.Text import draw_centered_text
 
 
 class TextButton(UIElement):
@@ -16,7 +15,7 @@ class TextButton(UIElement):
         bg_color: tuple | str = (50, 50, 50),
         fg_color=(0, 0, 0),
         text: str = "",
-        font: pygame.font.Font | None = None,
+        font: pygame.font.Font | int | None = None,
         corner_radius=10,
         command=lambda: print("Clicked"),
         hover_color=(150, 150, 150),
@@ -24,29 +23,26 @@ class TextButton(UIElement):
         super().__init__(
             parent, x, y, center, width, height, bg_color, fg_color, font, text, corner_radius
         )
-        self.font = self.game.font_medium if font is None else font
         self.hover_color = hover_color
+        self.clickable = True
         self.height = self.font.get_height() + 10
         self.command = None
         if callable(command):
             self.command = command
 
-    def update(self, dt):
-        if self.visible:
-            if self.rect.collidepoint(self.game.mousepos):
-                self.hover(dt)
-                # == -1 perchè voglio che il bottone sia cliccato quando rilasci il bottone del mouse
-                if self.game.clicked_sx == -1:
-                    self.clicked()
-            else:
-                self.unhover()
-
-    def hover(self, dt):
+    def on_hover(self):
         self.bg_color = self.hover_color
 
-    def unhover(self):
+    def on_unhover(self):
         self.bg_color = self.original_bg_color
 
+    def on_mouse_up(self, event) -> bool:
+        # Sul rilascio perchè voglio che il bottone sia cliccato quando rilasci il bottone del mouse
+        if event.button == 1 and self.command is not None:
+            self.clicked()
+            return True
+        return False
+
     def clicked(self):
         if self.command is not None:
             self.command.__call__()
@@ -58,7 +54,7 @@ class TextButton(UIElement):
             # y = int(self.y + self.height * .5)
             # x, y = self.x, self.y
             if self.text != "":
-                draw_centered_text(
+                self.rendered_text.draw_centered(
                     self.font, surface, self.text, self.fg_color, self.rect
                 )
 
@@ -75,7 +71,7 @@ class ImageButton(TextButton):
         bg_color: tuple | str = "transparent",
         fg_color=(0, 0, 0),
         text: str = "",
-        font: pygame.font.Font | None = None,
+        font: pygame.font.Font | int | None = None,
         corner_radius=10,
         command=lambda: print("Clicked"),
         hover_color=(150, 150, 150),
@@ -120,22 +116,18 @@ class ImageButton(TextButton):
 
     def update(self, dt):
         # print(self.current_image_index)
-        if self.rect.collidepoint(self.game.mousepos):
-            if self.game.actions["mouse_sx"]:
-                self.current_image = self.mouse_pressed_image
-            elif self.game.clicked_sx == -1:
-                self.command.__call__()
-            else:
-                self.hover(dt)
-        else:
-            self.unhover()
-        if self.game.clicked_sx == -1 and not self.rect.collidepoint(
-            self.game.mousepos
-        ):
-            self.current_image = self.animation[0]
-            self.current_image_index = 0
+        if self.hovered and not self.game.actions["mouse_sx"]:
+            self.hover(dt)
+
+    def on_mouse_down(self, event) -> bool:
+        if event.button == 1:
+            self.current_image = self.mouse_pressed_image
+            return True
+        return False
 
     def hover(self, dt):
+        if self.animation_list_length > 1:
+            self.game.request_frame()
         self.prev_timestamp += dt
         if self.prev_timestamp >= self._MS_BETWEEN_ANIMATION_FRAMES * dt:
             self.current_image_index = (
@@ -147,12 +139,13 @@ class ImageButton(TextButton):
         # if self.game.clicked_sx == -1:
         #     self.command.__call__()
 
-    def unhover(self):
+    def on_unhover(self):
         """
         Resets the animation
         :return:
         """
         self.current_image_index = 0
+        self.current_image = self.animation[0]
         self.bg_color = self.original_bg_color
 
     def render(self, surface: pygame.Surface):
@@ -1,3 +1,5 @@
+import pygame
+
 from UI.Abstract import UIContainer, UICanvas, UIElement
 from Utils.Text import draw_centered_text
 
@@ -18,9 +20,10 @@ class VertContainer(UIContainer):
         corner_radius=10,
         pad=(0, 0),
         font=None,
+        retained=False,
     ):
         super().__init__(
-            parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius
+            parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius, retained=retained
         )
 
         self.pad = pad
@@ -46,9 +49,10 @@ class HorizContainer(UIContainer):
         corner_radius=10,
         pad=(0, 0),
         font=None,
+        retained=False,
     ):
         super().__init__(
-            parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius
+            parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius, retained=retained
         )
 
         self.pad = pad
@@ -57,4 +61,133 @@ class HorizContainer(UIContainer):
     def add_child(self, child: UIElement):
         super().add_child(child)
         child.pack(side="horiz", padx=self.pad[0], pady=self.pad[1],
-                   modify_dimensions_to_fit=self.modify_children_dimensions_to_fit)
\ No newline at end of file
+                   modify_dimensions_to_fit=self.modify_children_dimensions_to_fit)
+
+class VirtualList(UIContainer):
+    """ Scrollable list that creates widgets only for the rows that are visible """
+    input_events = (pygame.MOUSEWHEEL,)
+
+    def __init__(
+        self,
+        parent: UICanvas,
+        x=0,
+        y=0,
+        center: tuple[int, int] = None,
+        width=100,
+        height=100,
+        bg_color: tuple | str = (40, 40, 40),
+        fg_color=(0, 0, 0),
+        corner_radius=10,
+        pad=(0, 0),
+        font=None,
+        row_height=30,
+        row_count=0,
+        build_row=None,
+        scrollbar_color=(80, 80, 80),
+    ):
+        """
+        :param row_height: height of every row, pad included
+        :param row_count: number of rows in the list
+        :param build_row: build_row(index, widget) -> widget. Fills the row at index: widget is None when a new
+        widget has to be created (build it and return it, it is moved into the list), otherwise it is a widget
+        that scrolled out of view, to be updated for the new row and returned. Rows are moved by changing their
+        rect, so they shouldn't have children.
+        :param scrollbar_color: colour of the scrollbar, drawn when not all the rows fit
+        """
+        super().__init__(
+            parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius
+        )
+        self.pad = pad
+        self.row_height = row_height
+        self.row_count = row_count
+        self.build_row = build_row
+        self.scrollbar_color = scrollbar_color
+        self.first_row = 0
+        self.row_widgets: dict[int, UIElement] = {}  # row index -> widget showing it
+        # Gets the wheel events over the gaps between the rows too
+        self.clickable = True
+        self.layout()
+
+    @property
+    def visible_rows(self) -> int:
+        return max(1, (self.height - self.pad[1]) // self.row_height)
+
+    def set_row_count(self, row_count: int):
+        """
+        Changes the number of rows, every visible row is built again.
+        """
+        self.row_count = row_count
+        self.first_row = max(0, min(self.first_row, row_count - self.visible_rows))
+        self.refresh()
+
+    def refresh(self):
+        """
+        Builds again the visible rows, e.g. after the data they show changed.
+        """
+        self.layout(rebuild=True)
+
+    def scroll_by(self, rows: int):
+        self.scroll_to_first(self.first_row + rows)
+
+    def scroll_to_first(self, first_row: int):
+        first_row = max(0, min(first_row, self.row_count - self.visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.layout()
+
+    def scroll_to(self, index: int):
+        """
+        Scrolls the least needed to make the row at index visible.
+        """
+        if index < self.first_row:
+            self.scroll_to_first(index)
+        elif index >= self.first_row + self.visible_rows:
+            self.scroll_to_first(index - self.visible_rows + 1)
+
+    def layout(self, rebuild=False):
+        """
+        Binds the visible rows to widgets, reusing the widgets of the rows that scrolled out of view.
+        :param rebuild: call build_row for rows that were already bound too
+        """
+        visible = range(self.first_row, min(self.row_count, self.first_row + self.visible_rows))
+        spare = [widget for index, widget in self.row_widgets.items() if index not in visible]
+        self.row_widgets = {index: widget for index, widget in self.row_widgets.items() if index in visible}
+        for index in visible:
+            widget = self.row_widgets.get(index)
+            if widget is None or rebuild:
+                if widget is None and spare:
+                    widget = spare.pop()
+                widget = self.build_row(index, widget)
+                if widget.parent is not self:
+                    self.add_child(widget)
+                self.row_widgets[index] = widget
+            widget.visible = True
+            self._place_row(widget, index)
+        for widget in spare:
+            widget.visible = False
+        self.invalidate()
+
+    def _place_row(self, widget: UIElement, index: int):
+        widget.x = int(self.x + self.pad[0])
+        widget.y = int(self.y + self.pad[1] + (index - self.first_row) * self.row_height)
+        widget.width = int(self.width - 2 * self.pad[0])
+        widget.height = int(self.row_height - self.pad[1])
+        if widget.rect != (widget.x, widget.y, widget.width, widget.height):
+            widget.invalidate()
+            widget.rect.update(widget.x, widget.y, widget.width, widget.height)
+            widget.invalidate()
+
+    def pack(self, side: str, padx: int = 0, pady: int = 0, modify_dimensions_to_fit=True):
+        super().pack(side, padx, pady, modify_dimensions_to_fit)
+        self.layout()
+
+    def on_mouse_wheel(self, event) -> bool:
+        self.scroll_by(-event.y)
+        return True
+
+    def render(self, surface: pygame.Surface):
+        super().render(surface)
+        if self.visible and self.row_count > self.visible_rows:
+            bar_height = max(10, self.height * self.visible_rows // self.row_count)
+            bar_y = self.y + (self.height - bar_height) * self.first_row // (self.row_count - self.visible_rows)
+            pygame.draw.rect(surface, self.scrollbar_color, (self.rect.right - 4, bar_y, 3, bar_height))
@@ -1,10 +1,22 @@
+from typing import TYPE_CHECKING
+
 import pygame
 
+from Generic.GapBuffer import GapBuffer
+from Generic.TextLayout import TextLayout
 from UI.Abstract import UIElement, UICanvas
-from Utils.Text import draw_centered_text
-from Utils.Timer import Timer, SpacedCallback
+from Utils.Text import glyph_advance, render_text, text_width
+from Utils.Timer import SpacedCallback
+
+if TYPE_CHECKING:
+    from Game import Game
 
-from Game import Game
+# Held keys repeat through SDL while an entry has the focus: delay before the first repeat and interval, in ms
+KEY_REPEAT_DELAY = 500
+KEY_REPEAT_INTERVAL = 30
+# Horizontal space between the border and a text that does not fit and scrolls
+TEXT_PADDING = 10
+PASSWORD_CHAR = "*"
 
 ALLOWED_SPECIAL_CHARS = [" ", ".", ",", "!", "?", ":", ";", "-", "_", "+", "=",
                          "(", ")", "[", "]", "{", "}", "<", ">", "/", "\\", "|", "*", "&", "%", "$", "#", "@", "'", '"', "`", "^", "~"]
@@ -13,227 +25,332 @@ ALLOWED_SPECIAL_CHARS = [" ", ".", ",", "!", "?", ":", ";", "-", "_", "+", "=",
 class Entry(UIElement):
     def __init__(self, parent: UICanvas = None, x=0, y=0, center=None, width=100, height=100, bg_color: tuple | str = (50, 50, 50),
                  fg_color=(0, 0, 0), font=None, placeholder: str = "", border_width=1, corner_radius=10, focus_color=(150, 150, 150), is_password=False):
+        # Read by the text buffer, which is created when UIElement.__init__ sets the text
+        self.is_password = is_password
+        # Pixels of text hidden on the left when the text is wider than the entry
+        self.scroll_x = 0
 
         super().__init__(parent, x, y, center, width, height,
                          bg_color, fg_color, font, placeholder, corner_radius)
         self.border_width = border_width
         self.focused = False
         self.focus_color = focus_color
+        self.clickable = True
+        self.focusable = True
         self.original_fg_color = fg_color
-        self.is_password = is_password
         if is_password:
             self.text = ""
-        self.key_pressed_timer = Timer()
         self.placeholder = placeholder
 
-        self.key_pressed = None
         self.enter_key_callback = None
 
         self.caret = Caret(self.game, self)
 
+    @property
+    def text(self) -> str:
+        return self.buffer.text
+
+    @text.setter
+    def text(self, text: str):
+        # Assigned through UICanvas.__setattr__, which takes care of redrawing
+        if "buffer" not in self.__dict__:
+            self.buffer = GapBuffer(text)
+        else:
+            self.buffer.set_text(text)
+        self._place_caret()
+
+    def _glyph_advance(self, char: str) -> int:
+        return glyph_advance(self.font, PASSWORD_CHAR if self.is_password else char)
+
+    def _text_width(self, index: int | None = None) -> int:
+        """
+        Width of the first index characters of the text as drawn, of the whole text for None.
+        """
+        if self.is_password:
+            return text_width(self.font, PASSWORD_CHAR * (len(self.buffer) if index is None else index))
+        return text_width(self.font, self.buffer.text[:index])
+
+    def _text_x(self) -> int:
+        """
+        x where the text starts: centered if it fits in the entry, scrolled by scroll_x otherwise.
+        """
+        width = self._text_width()
+        if width <= self.rect.w - 2 * TEXT_PADDING:
+            return self.rect.centerx - width // 2
+        return self.rect.x + TEXT_PADDING - self.scroll_x
+
+    def _place_caret(self):
+        """
+        Scrolls the text the least needed to keep the caret inside the entry, then moves the caret.
+        """
+        if "caret" not in self.__dict__:
+            return
+        inner_width = self.rect.w - 2 * TEXT_PADDING
+        width = self._text_width()
+        caret_x = self._text_width(self.buffer.caret)
+        if width <= inner_width:
+            self.scroll_x = 0
+        elif caret_x - self.scroll_x > inner_width:
+            self.scroll_x = caret_x - inner_width
+        elif caret_x < self.scroll_x:
+            self.scroll_x = caret_x
+        self.scroll_x = max(0, min(self.scroll_x, width - inner_width))
+        self.caret.index_in_text = self.buffer.caret
+        self.caret.move_to(self._text_x() + caret_x, self.rect.y + (self.rect.h - self.font.get_height()) * .5 - 3)
+
+    def _text_changed(self):
+        self.rendered_text.invalidate()
+        self._place_caret()
+        self.invalidate(layout=False)
+
     def render(self, surface: pygame.Surface):
         if self.visible:
             super().render(surface)
             pygame.draw.rect(surface, self.fg_color, self.rect,
                              width=self.border_width, border_radius=self.corner_radius)
-            text = '*'*len(self.text) if self.is_password else self.text
-            draw_centered_text(self.font, surface, text,
-                               self.fg_color, self.rect)
+            text = PASSWORD_CHAR * len(self.text) if self.is_password else self.text
+            text_surface = self.rendered_text.get(self.font, text, self.fg_color)
+            y = self.rect.centery - text_surface.get_height() // 2
+            if self._text_width() <= self.rect.w - 2 * TEXT_PADDING:
+                surface.blit(text_surface, (self._text_x(), y))
+            else:
+                # Only the part of the text inside the entry
+                visible_part = pygame.Rect(self.scroll_x, 0, self.rect.w - 2 * TEXT_PADDING, text_surface.get_height())
+                surface.blit(text_surface, (self.rect.x + TEXT_PADDING, y), visible_part)
 
             # Render caret
             self.caret.render(surface)
 
-    def update(self, dt):
-        if self.visible:
+    def on_focus(self):
+        self.focused = True
+        self.caret.start_blinking()
+        self.fg_color = self.focus_color
+        pygame.key.set_repeat(KEY_REPEAT_DELAY, KEY_REPEAT_INTERVAL)
+
+        # Clear placeholder
+        if self.text == self.placeholder:
+            self.text = ""
+        self._place_caret()
+
+    def on_blur(self):
+        self.focused = False
+        self.caret.stop_blinking()
+        self.fg_color = self.original_fg_color
+        pygame.key.set_repeat()
 
-            # Update caret
-            self.caret.update(dt)
-
-            if self.key_pressed:
-                self.key_pressed_timer.start(0.5)
-                if self.key_pressed_timer.finished:
-                    if self.key_pressed == pygame.K_BACKSPACE:
-                        self._handle_backspace()
-                    elif self.key_pressed == pygame.K_LEFT:
-                        self._handle_arrow_left()
-                    elif self.key_pressed == pygame.K_RIGHT:
-                        self._handle_arrow_right()
-                    elif self.key_pressed.isalnum() or self.key_pressed in ALLOWED_SPECIAL_CHARS:
-                        self._handle_printable(self.key_pressed)
-                self.key_pressed_timer.update(dt)
-
-            if self.game.clicked_sx == -1:
-                if self.rect.collidepoint(self.game.mousepos):
-                    self.focused = True
-                    self.fg_color = self.focus_color
-                    self.game.need_key_event_handling = False
-
-                    # Clear placeholder
-                    if self.text == self.placeholder:
-                        self.text = ""
-                        self.caret.reset_position()
-                else:
-                    self.focused = False
-                    self.fg_color = self.original_fg_color
-                    self.game.need_key_event_handling = True
-
-                    # Restore placeholder
-                    if self.text == "":
-                        self.text = self.placeholder
-                        self.caret.reset_position()
-
-            if self.focused:
-                for event in self.game.events:
-                    if event.type == pygame.KEYDOWN:
-
-                        if event.mod & pygame.KMOD_CTRL:
-                            if event.key == pygame.K_BACKSPACE:
-                                if self.caret.index_in_text == 0:
-                                    return
-                                if self.text[self.caret.index_in_text - 1] == " ":
-                                    self._handle_backspace()
-                                    return
-                                while self.caret.index_in_text > 0 and self.text[self.caret.index_in_text - 1] != " ":
-                                    self._handle_backspace()
-
-                            if event.key == pygame.K_DELETE:
-                                if self.caret.index_in_text == len(self.text):
-                                    return
-                                if self.text[self.caret.index_in_text] == " ":
-                                    self._hande_delete()
-                                    return
-                                while self.caret.index_in_text < len(self.text) and self.text[self.caret.index_in_text] != " ":
-                                    self._hande_delete()
-
-                        else:
-                            if event.key == pygame.K_BACKSPACE:
-                                # Delete character at the caret position
-                                self._handle_backspace()
-
-                            if event.key == pygame.K_DELETE:
-                                # Delete character after the caret position
-                                self._hande_delete()
-
-                            elif event.key == pygame.K_LEFT:
-                                self._handle_arrow_left()
-
-                            elif event.key == pygame.K_RIGHT:
-                                self._handle_arrow_right()
-
-                            elif event.key == pygame.K_RETURN and self.enter_key_callback:
-                                self.enter_key_callback()
-
-                            elif event.unicode.isalnum() or event.unicode in ALLOWED_SPECIAL_CHARS:
-                                self._handle_printable(event.unicode)
-
-                    if event.type == pygame.KEYUP:
-                        self.key_pressed = None
-                        self.key_pressed_timer.stop()
+        # Restore placeholder
+        if self.text == "":
+            self.text = self.placeholder
+
+    def on_key_down(self, event):
+        if event.mod & pygame.KMOD_CTRL:
+            if event.key == pygame.K_BACKSPACE:
+                self._handle_word_backspace()
+
+            if event.key == pygame.K_DELETE:
+                self._handle_word_delete()
+
+        else:
+            if event.key == pygame.K_BACKSPACE:
+                # Delete character at the caret position
+                self._handle_backspace()
+
+            if event.key == pygame.K_DELETE:
+                # Delete character after the caret position
+                self._hande_delete()
+
+            elif event.key == pygame.K_LEFT:
+                self._handle_arrow_left()
+
+            elif event.key == pygame.K_RIGHT:
+                self._handle_arrow_right()
+
+            elif event.key == pygame.K_HOME:
+                self.buffer.set_caret(0)
+                self._place_caret()
+
+            elif event.key == pygame.K_END:
+                self.buffer.set_caret(len(self.buffer))
+                self._place_caret()
+
+            elif event.key == pygame.K_RETURN and self.enter_key_callback:
+                self.enter_key_callback()
+
+            elif event.unicode.isalnum() or event.unicode in ALLOWED_SPECIAL_CHARS:
+                self._handle_printable(event.unicode)
 
     def clear_text(self):
         self.text = ""
-        self.caret.reset_position()
 
     def set_enter_key_callback(self, callback):
         self.enter_key_callback = callback
 
     def _handle_backspace(self):
-        if self.caret.index_in_text == 0:
-            return
-        self.caret.remove_char(self.text[self.caret.index_in_text - 1])
-        aux_text = list(self.text)
-        aux_text.pop(self.caret.index_in_text)
-        aux_text = "".join(aux_text)
-        self.text = self.text if self.text == "" else aux_text
-        self.key_pressed = pygame.K_BACKSPACE
+        if self.buffer.delete_left():
+            self._text_changed()
 
     def _hande_delete(self):
-        if self.caret.index_in_text == len(self.text):
-            return
-        self.caret.delete_char(self.text[self.caret.index_in_text])
-        aux_text = list(self.text)
-        aux_text.pop(self.caret.index_in_text)
-        aux_text = "".join(aux_text)
-        self.text = self.text if self.text == "" else aux_text
-        self.key_pressed = pygame.K_DELETE
+        if self.buffer.delete_right():
+            self._text_changed()
+
+    def _handle_word_backspace(self):
+        if self.buffer.delete_word_left():
+            self._text_changed()
+
+    def _handle_word_delete(self):
+        if self.buffer.delete_word_right():
+            self._text_changed()
 
     def _handle_printable(self, char):
-        if self.font.size(self.text)[0] <= self.width - 40:
-            aux_text = list(self.text)
-            aux_text.insert(self.caret.index_in_text, char)
-            self.text = "".join(aux_text)
-            self.caret.add_char(char)
-            self.key_pressed = char
+        self.buffer.insert(char)
+        self._text_changed()
 
     def _handle_arrow_left(self):
-        if self.caret.index_in_text == 0:
-            return
-        self.caret.shift_char_left(self.text[self.caret.index_in_text - 1])
-        self.key_pressed = pygame.K_LEFT
+        self.buffer.move_caret(-1)
+        self._place_caret()
 
     def _handle_arrow_right(self):
-        if self.caret.index_in_text == len(self.text):
-            return
-        self.caret.shift_char_right(self.text[self.caret.index_in_text])
-        self.key_pressed = pygame.K_RIGHT
+        self.buffer.move_caret(1)
+        self._place_caret()
 
 
 class Paragraph(Entry):
+    # Scrolls with the wheel
+    input_events = (pygame.MOUSEWHEEL,)
+
     def __init__(self, parent: UICanvas = None, x=0, y=0, center=None, width=100, height=100, bg_color: tuple | str = (50, 50, 50),
                  fg_color=(0, 0, 0), font=None, placeholder: str = "", border_width=1, corner_radius=10, focus_color=(150, 150, 150), is_password=False):
         super().__init__(parent, x, y, center, width, height, bg_color, fg_color,
                          font, placeholder, border_width, corner_radius, focus_color, is_password)
-        
-        self.lines = ["" for _ in range(height // self.font.get_height())]
-        self.line_index = 0
+
         self.line_height = self.font.get_height()
-        
-    def _handle_printable(self, char):
-        txt = self.lines[self.line_index]
-        if self.font.size(txt)[0] <= self.width - 40:
-            aux_text = list(txt)
-            aux_text.insert(self.caret.index_in_text, char)
-            self.lines[self.line_index] = "".join(aux_text)
-            print(self.lines)
-            self.caret.add_char(char)
-            self.key_pressed = char
+        # First line shown, the text scrolls by whole lines
+        self.scroll_line = 0
+        self.caret_line = 0
+        # As tall as a line, so that it never sticks out of the paragraph
+        self.caret.rect.height = self.line_height
+
+    @property
+    def text(self) -> str:
+        return self.layout.text
+
+    @text.setter
+    def text(self, text: str):
+        # Assigned through UICanvas.__setattr__, which takes care of redrawing
+        if "layout" not in self.__dict__:
+            self.layout = TextLayout(text, self.rect.w - 2 * TEXT_PADDING, self._glyph_advance)
         else:
-            self.caret.reset_position()
-            self.text += "\n"
-            self.caret.move_by(0, self.line_height * (self.line_index + 1))
-            self.line_index += 1
+            self.layout.set_text(text)
+        self._place_caret()
 
-    def _handle_backspace(self):
-        # TODO
-        pass
+    @property
+    def visible_lines(self) -> int:
+        return max(1, self.rect.h // self.line_height)
 
     def get_text(self):
-        return "\n".join(l for l in self.lines if l != "")
+        return self.text
+
+    def _place_caret(self):
+        """
+        Wraps the text again if the paragraph got resized, scrolls to the line of the caret and moves the caret.
+        """
+        if "caret" not in self.__dict__:
+            return
+        self.layout.set_width(self.rect.w - 2 * TEXT_PADDING)
+        line, _ = self.layout.caret_position()
+        if line < self.scroll_line:
+            self.scroll_line = line
+        elif line >= self.scroll_line + self.visible_lines:
+            self.scroll_line = line - self.visible_lines + 1
+        self._move_caret()
+
+    def _move_caret(self):
+        line, _ = self.layout.caret_position()
+        # Measured like the line is drawn, the x of the layout is a sum of glyph advances
+        x = text_width(self.font, self.layout.text_before_caret())
+        self.caret_line = line
+        self.caret.index_in_text = self.layout.caret[1]
+        self.caret.move_to(self.rect.x + TEXT_PADDING + x, self.rect.y + (line - self.scroll_line) * self.line_height)
+
+    def scroll_by(self, lines: int):
+        """
+        Scrolls the text without moving the caret, which is hidden while its line is out of view.
+        """
+        scroll_line = max(0, min(self.scroll_line + lines, self.layout.line_count - self.visible_lines))
+        if scroll_line != self.scroll_line:
+            self.scroll_line = scroll_line
+            self._move_caret()
+
+    def on_mouse_wheel(self, event) -> bool:
+        self.scroll_by(-event.y)
+        return True
+
+    def on_key_down(self, event):
+        if event.mod & pygame.KMOD_CTRL:
+            if event.key == pygame.K_BACKSPACE:
+                if self.layout.delete_word_left():
+                    self._text_changed()
+            elif event.key == pygame.K_DELETE:
+                if self.layout.delete_word_right():
+                    self._text_changed()
+            return
 
+        if event.key == pygame.K_BACKSPACE:
+            if self.layout.delete_left():
+                self._text_changed()
+        elif event.key == pygame.K_DELETE:
+            if self.layout.delete_right():
+                self._text_changed()
+        elif event.key == pygame.K_RETURN:
+            self.layout.insert("\n")
+            self._text_changed()
+        elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+            self.layout.move_caret(-1 if event.key == pygame.K_LEFT else 1)
+            self._place_caret()
+        elif event.key in (pygame.K_UP, pygame.K_DOWN):
+            self.layout.move_caret_vertically(-1 if event.key == pygame.K_UP else 1)
+            self._place_caret()
+        elif event.key == pygame.K_HOME:
+            self.layout.move_caret_to_line_start()
+            self._place_caret()
+        elif event.key == pygame.K_END:
+            self.layout.move_caret_to_line_end()
+            self._place_caret()
+        elif event.unicode.isalnum() or event.unicode in ALLOWED_SPECIAL_CHARS:
+            self.layout.insert(event.unicode)
+            self._text_changed()
 
     def render(self, surface: pygame.Surface):
         if self.visible:
             pygame.draw.rect(surface, self.bg_color, self.rect, width=self.border_width, border_radius=self.corner_radius)
-            self.caret.render(surface)
-            for i, line in enumerate(self.lines):
-                draw_centered_text(self.font, surface, line, self.fg_color,
-                                   pygame.Rect(self.rect.x, self.rect.y + i * self.line_height, self.rect.width, self.line_height))
+            self.layout.set_width(self.rect.w - 2 * TEXT_PADDING)
+            # Only the visible lines, their surfaces come from the text cache and are rendered again only when edited
+            x = self.rect.x + TEXT_PADDING
+            last_line = min(self.layout.line_count, self.scroll_line + self.visible_lines)
+            for line in range(self.scroll_line, last_line):
+                y = self.rect.y + (line - self.scroll_line) * self.line_height
+                surface.blit(render_text(self.font, self.layout.line(line), self.fg_color), (x, y))
+            if self.layout.line_count > self.visible_lines:
+                bar_height = max(10, self.rect.h * self.visible_lines // self.layout.line_count)
+                bar_y = self.rect.y + (self.rect.h - bar_height) * self.scroll_line // (self.layout.line_count - self.visible_lines)
+                pygame.draw.rect(surface, self.fg_color, (self.rect.right - 4, bar_y, 3, bar_height))
+            if self.scroll_line <= self.caret_line < last_line:
+                self.caret.render(surface)
 
 # --------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
 class Caret:
-    def __init__(self, game: Game, parent: Entry):
+    def __init__(self, game: "Game", parent: Entry):
         self.game = game
         self.parent = parent
         self.font = self.parent.font
         self.reset_position()
-        self.timer = Timer()
         self.visible = True
 
         self.CARET_BLINK_SPEED = 0.4
+        # Started when the entry gets the focus, an unfocused caret is not drawn. Run by the scheduler of the game
         self.blink = SpacedCallback(self.toggle_visibility, 0.5)
-        self.blink.start()
 
         self.color = (230, 230, 230)
 
@@ -258,39 +375,17 @@ class Caret:
             self.topleft, (2, self.parent.font.get_height() + 6))
         self.index_in_text = len(self.parent.text)
 
-    def add_char(self, char):
-        self.topleft += pygame.Vector2(self.parent.font.size(char)[0] * .5, 0)
-        self.rect.topleft = self.topleft
-        self.index_in_text += 1
-
-    def remove_char(self, char):
-        self.topleft -= pygame.Vector2(self.parent.font.size(char)[0] * .5, 0)
-        self.rect.topleft = self.topleft
-        self.index_in_text -= 1
-
-    def delete_char(self, char):
-        # We don't need to move the caret to the left because the character after the caret will be deleted
-        self.topleft += pygame.Vector2(self.parent.font.size(char)[0] * 0.5, 0)
-        self.rect.topleft = self.topleft
-
-    def shift_char_right(self, char):
-        self.topleft += pygame.Vector2(self.parent.font.size(char)[0], 0)
-        self.rect.topleft = self.topleft
-        self.index_in_text += 1
-
-    def shift_char_left(self, char):
-        self.topleft -= pygame.Vector2(self.parent.font.size(char)[0], 0)
-        self.rect.topleft = self.topleft
-        self.index_in_text -= 1
-
     def hide(self):
         self.visible = False
         self.hiding = True
+        self.blink.stop()
+
+    def start_blinking(self):
+        self.visible = True
+        self.blink.start()
 
-    def update(self, dt):
-        if not self.hiding:
-            self.blink.update(dt)
-            # print("Caret position:", self.topleft, self.index_in_text)
+    def stop_blinking(self):
+        self.blink.stop()
 
     def render(self, surface: pygame.Surface):
         if self.visible and self.parent.focused:
@@ -300,10 +395,16 @@ class Caret:
     def move_to(self, x, y):
         self.topleft = pygame.Vector2(x, y)
         self.rect.topleft = self.topleft
+        self.parent.invalidate(layout=False)
 
     def move_by(self, dx, dy):
         self.topleft += pygame.Vector2(dx, dy)
         self.rect.topleft = self.topleft
+        self.parent.invalidate(layout=False)
 
     def toggle_visibility(self):
         self.visible = not self.visible
+        if self.parent.focused:
+            # The caret is drawn into the backing of a retained container holding the entry
+            self.parent.invalidate_backing()
+            self.parent.invalidate_area(self.rect)
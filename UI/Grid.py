@@ -1,5 +1,10 @@
+import pygame
+
 from UI.Abstract import UIContainer
+from Utils import Draw
 from Utils.Colors import WHITE
+from Utils.Metrics import metrics
+from Utils.Text import render_text
 
 
 class UIGrid(UIContainer):
@@ -18,9 +23,11 @@ class UIGrid(UIContainer):
     def add_child(self, child, row, col):
         super().add_child(child)
         self.cells[(row, col)] = child
+        child.invalidate()
         child.rect.update(self.x + col * (self.cell_width + self.pad[0]) + self.pad[0],
                           self.y + row * (self.cell_height + self.pad[1]) + self.pad[1],
                           self.cell_width, self.cell_height)
+        child.invalidate()
 
     def recalculate_cell_dimensions(self):
         self.cell_width = (self.width - self.pad[0]) // self.cols - self.pad[0]
@@ -37,7 +44,233 @@ class UIGrid(UIContainer):
     def clear(self):
         super().clear()
         self.cells.clear()
-        print(f"Cleared grid: cells: {self.cells}, children: {self.children}")
+        metrics.counter("grid.clears").inc()
+
+    def update(self, dt):
+        super().update(dt)
+
+class GridGeometry:
+    """
+    Position of the cells of a grid: rows x cols cells of the same size, separated and surrounded by pad.
+    Coordinates are relative to the top left corner of the grid.
+    """
+    def __init__(self, rows: int, cols: int, width: int, height: int, pad=(0, 0)):
+        self.rows = rows
+        self.cols = cols
+        self.pad = pad
+        # w = pad_x + (cell_w + pad_x) * cols => cell_w = (w - pad_x) // cols - pad_x
+        self.cell_width = max(1, (width - pad[0]) // cols - pad[0])
+        self.cell_height = max(1, (height - pad[1]) // rows - pad[1])
+
+    def cell_rect(self, row: int, col: int) -> pygame.Rect:
+        return pygame.Rect(self.pad[0] + col * (self.cell_width + self.pad[0]),
+                           self.pad[1] + row * (self.cell_height + self.pad[1]),
+                           self.cell_width, self.cell_height)
+
+    def cell_at(self, x: float, y: float) -> tuple[int, int] | None:
+        """
+        Returns (row, col) of the cell containing the point, None outside the cells (or between them).
+        """
+        col, dx = divmod(int(x) - self.pad[0], self.cell_width + self.pad[0])
+        row, dy = divmod(int(y) - self.pad[1], self.cell_height + self.pad[1])
+        if 0 <= row < self.rows and 0 <= col < self.cols and dx < self.cell_width and dy < self.cell_height:
+            return row, col
+        return None
+
+
+class GridView(UIContainer):
+    """
+    Grid of cells drawn by a single widget, for grids with many cells (the positions in a box, the boxes
+    in a freezer): instead of a button per cell, all the cells are drawn in one surface, kept between frames,
+    and only the cells that changed (label, colour, hover, selection) are drawn again.
+    The hovered cell is computed from the pointer position, a click on a cell calls command(row, col).
+    """
+    def __init__(self, parent, x=0, y=0, center=None, width=100, height=100, bg_color=(40, 40, 40), fg_color=WHITE,
+                 corner_radius=0, pad=(0, 0), font=None, rows=1, cols=1, border_width=0,
+                 cell_color="transparent", hover_color=(150, 150, 150), selected_color=None, cell_radius=0,
+                 command=None):
+        """
+        :param rows: number of rows
+        :param cols: number of columns
+        :param pad: space between the cells and around them
+        :param cell_color: background of the cells without a colour of their own (see set_color)
+        :param hover_color: background of the cell under the pointer
+        :param selected_color: background of the selected cells, None for hover_color
+        :param cell_radius: corner radius of the cells
+        :param command: command(row, col), called when a cell is clicked
+        """
+        super().__init__(parent, x, y, center, width, height, bg_color, fg_color, font, corner_radius, border_width)
+        self.rows = rows
+        self.cols = cols
+        self.pad = pad
+        self.cell_color = (0, 0, 0, 0) if cell_color == "transparent" else cell_color
+        self.hover_color = hover_color
+        self.selected_color = selected_color if selected_color is not None else hover_color
+        self.cell_radius = cell_radius
+        self.command = command
+        self.clickable = True
+        # (row, col) -> value, for the cells that have one
+        self.labels: dict[tuple[int, int], str] = {}
+        self.colors: dict[tuple[int, int], tuple] = {}
+        self.fg_colors: dict[tuple[int, int], tuple] = {}
+        self.selected: set[tuple[int, int]] = set()
+        self.hovered_cell: tuple[int, int] | None = None
+        self.geometry: GridGeometry | None = None
+        self._geometry_key = None
+        # Every cell drawn on the background, the dirty cells are drawn again before it is blitted
+        self.surface: pygame.Surface | None = None
+        self.dirty_cells: set[tuple[int, int]] = set()
+
+    def cell_rect(self, row: int, col: int) -> pygame.Rect:
+        """
+        Returns the rect of a cell, in game coordinates.
+        """
+        return self._get_geometry().cell_rect(row, col).move(self.rect.topleft)
+
+    def cell_at(self, pos) -> tuple[int, int] | None:
+        """
+        Returns (row, col) of the cell at pos (in game coordinates), None if there is none.
+        """
+        if pos is None:
+            return None
+        return self._get_geometry().cell_at(pos[0] - self.rect.x, pos[1] - self.rect.y)
+
+    def _get_geometry(self) -> GridGeometry:
+        """
+        Returns the geometry for the current size of the grid, after a change of size the cells are all drawn again.
+        """
+        key = (self.rows, self.cols, self.rect.size, self.pad)
+        if self.geometry is None or key != self._geometry_key:
+            self.geometry = GridGeometry(self.rows, self.cols, self.rect.width, self.rect.height, self.pad)
+            self._geometry_key = key
+            self.surface = None
+        return self.geometry
+
+    # Cell state
+
+    def set_label(self, cell: tuple[int, int], label: str | None):
+        if self.labels.get(cell) != label:
+            if label is None:
+                del self.labels[cell]
+            else:
+                self.labels[cell] = label
+            self.redraw_cell(cell)
+
+    def set_color(self, cell: tuple[int, int], color=None, fg_color=None):
+        """
+        Changes the colours of a cell, None goes back to cell_color and fg_color of the grid.
+        """
+        for colors, value in ((self.colors, color), (self.fg_colors, fg_color)):
+            if value is None:
+                colors.pop(cell, None)
+            else:
+                colors[cell] = value
+        self.redraw_cell(cell)
+
+    def select(self, cell: tuple[int, int] | None, exclusive: bool = True):
+        """
+        Selects a cell.
+        :param cell: the cell, None only deselects the others
+        :param exclusive: deselect the other cells
+        :return: None
+        """
+        if exclusive:
+            for other in self.selected - {cell}:
+                self.deselect(other)
+        if cell is not None and cell not in self.selected:
+            self.selected.add(cell)
+            self.redraw_cell(cell)
+
+    def deselect(self, cell: tuple[int, int]):
+        if cell in self.selected:
+            self.selected.discard(cell)
+            self.redraw_cell(cell)
+
+    def set_hovered_cell(self, cell: tuple[int, int] | None):
+        if cell != self.hovered_cell:
+            previous, self.hovered_cell = self.hovered_cell, cell
+            for changed in (previous, cell):
+                if changed is not None:
+                    self.redraw_cell(changed)
+
+    def clear(self):
+        """
+        Removes labels, colours and selection of all the cells.
+        """
+        super().clear()
+        self.labels.clear()
+        self.colors.clear()
+        self.fg_colors.clear()
+        self.selected.clear()
+        self.surface = None
+        self.invalidate(layout=False)
+
+    def redraw_cell(self, cell: tuple[int, int]):
+        """
+        Draws a cell again in the next frame, without touching the others.
+        :return: None
+        """
+        if self.surface is None:
+            return
+        self.dirty_cells.add(cell)
+        self.invalidate_backing()
+        self.invalidate_area(self.cell_rect(*cell))
+
+    # Input
 
     def update(self, dt):
-        super().update(dt)
\ No newline at end of file
+        if self.visible:
+            self.set_hovered_cell(self.cell_at(self.game.mousepos) if self.hovered else None)
+
+    def on_unhover(self):
+        self.set_hovered_cell(None)
+
+    def on_mouse_up(self, event) -> bool:
+        if event.button != 1 or self.command is None:
+            return False
+        cell = self.cell_at(self.game.mousepos)
+        if cell is None:
+            return False
+        self.command(*cell)
+        return True
+
+    # Rendering
+
+    def render(self, surface: pygame.Surface):
+        if not self.visible:
+            return
+        geometry = self._get_geometry()
+        if self.surface is None:
+            self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            Draw.draw_rect_alpha(self.surface, self.bg_color, self.surface.get_rect(),
+                                 corner_radius=self.corner_radius, width=self.border_width)
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    self._draw_cell(geometry, (row, col), clear=False)
+            self.dirty_cells.clear()
+        elif self.dirty_cells:
+            for cell in self.dirty_cells:
+                if 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols:
+                    self._draw_cell(geometry, cell, clear=True)
+            self.dirty_cells.clear()
+        surface.blit(self.surface, self.rect)
+
+    def _draw_cell(self, geometry: GridGeometry, cell: tuple[int, int], clear: bool):
+        rect = geometry.cell_rect(*cell)
+        if clear:
+            # Only the background of the grid is below a cell (the border, if any, is outside it)
+            self.surface.fill(self.bg_color if self.border_width == 0 else (0, 0, 0, 0), rect)
+        if cell == self.hovered_cell:
+            color = self.hover_color
+        elif cell in self.selected:
+            color = self.selected_color
+        else:
+            color = self.colors.get(cell, self.cell_color)
+        if Draw.normalize_color(color)[3] != 0:
+            Draw.draw_rect_alpha(self.surface, color, rect, corner_radius=self.cell_radius)
+        label = self.labels.get(cell)
+        if label:
+            text = render_text(self.font, label, self.fg_colors.get(cell, self.fg_color))
+            if text.get_width() > rect.width:
+                text = text.subsurface((0, 0, rect.width, min(text.get_height(), rect.height)))
+            self.surface.blit(text, text.get_rect(center=rect.center))
@@ -0,0 +1,63 @@
+from Utils import Draw
+
+# Side of the square cells of the grid, in pixels
+CELL_SIZE = 64
+
+
+class HitTestGrid:
+    """
+    Uniform grid over the rects of the widgets of a canvas, to find the widget under a point
+    without testing every widget.
+    """
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list] = {}  # (col, row) -> widgets overlapping the cell, bottom to top
+
+    def rebuild(self, widgets):
+        """
+        Indexes the given widgets.
+        :param widgets: widgets in render order, a widget covers the ones before it
+        :return: None
+        """
+        self.cells.clear()
+        cs = self.cell_size
+        for widget in widgets:
+            rect = widget.rect
+            if rect.w <= 0 or rect.h <= 0:
+                continue
+            for col in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                for row in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                    self.cells.setdefault((col, row), []).append(widget)
+
+    def widget_at(self, pos):
+        """
+        Returns the topmost widget whose rect contains pos, None if there is none.
+        """
+        if pos is None:
+            return None
+        x, y = int(pos[0]), int(pos[1])
+        candidates = self.cells.get((x // self.cell_size, y // self.cell_size))
+        if candidates is None:
+            return None
+        for widget in reversed(candidates):
+            if widget.rect.collidepoint(x, y):
+                return widget
+        return None
+
+
+def hit_testable_widgets(canvas):
+    """
+    Visible, interactable widgets under canvas that can receive the pointer (clickable) or hide what is behind them
+    (opaque background), in render order.
+    """
+    widgets = []
+    stack = list(reversed(canvas.children))
+    while stack:
+        widget = stack.pop()
+        if not widget.visible or not widget.interactable:
+            continue
+        if widget.rect is not None and (widget.clickable or Draw.normalize_color(widget.bg_color)[3] == 255):
+            widgets.append(widget)
+        stack.extend(reversed(widget.children))
+    return widgets
+
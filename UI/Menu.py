@@ -1,5 +1,3 @@
-import os
-
 import pygame
 
 from UI.Button import TextButton
@@ -11,8 +9,10 @@ class Menu(UIElement):
     def __init__(self, parent: UICanvas = None, x=0, y=0, center=None, width=100, height=100,
                  bg_color: tuple | str = (40, 40, 40), default: str = None,
                  fg_color=(0, 0, 0), text: str = "", corner_radius=10, options: list[str] = [""]):
-        super().__init__(parent, x, y, center, width, height, bg_color, fg_color, text, corner_radius)
+        super().__init__(parent, x, y, center, width, height, bg_color, fg_color, text=text,
+                         corner_radius=corner_radius)
         self.options = options
+        self.clickable = True
         self.options_container = UIContainer(parent=self, x=x, y=y + height, width=width, height=height*len(options), corner_radius=10)
         self.options_container.visible = False
 
@@ -37,7 +37,7 @@ class Menu(UIElement):
 
     def option_selected_event_handler(self):
         for button in self.buttons:
-            if button.rect.collidepoint(self.game.mousepos):
+            if button.hovered:
                 self.selected_option = button.text
                 self.close_menu()
 
@@ -53,39 +53,40 @@ class Menu(UIElement):
             else:
                 surface.blit(self.open_menu_sprite, self.menu_sprite_rect)
 
-    def update(self, dt):
-        for child in self.children:
-            child.update(dt)
+    def on_mouse_up(self, event) -> bool:
         # al momento del rilascio del bottone del mouse
-        if self.game.clicked_sx == -1:
-            if self.rect.collidepoint(self.game.mousepos):
-                if self.open:
-                    self.close_menu()
-                else:
-                    self.open_menu()
+        if event.button == 1:
+            if self.open:
+                self.close_menu()
+            else:
+                self.open_menu()
+            return True
+        return False
 
     def open_menu(self):
         self.open = True
+        self.invalidate()
         self.options_container.visible = True
         for button in self.buttons:
             button.visible = True
 
     def close_menu(self):
         self.open = False
+        self.invalidate()
         self.options_container.visible = False
         for button in self.buttons:
             button.visible = False
 
     def load_sprites(self):
-        self.ui_sprites_dir = os.path.join(self.game.base_dir, "Assets/sprites/ui")
-        self.open_menu_sprite = pygame.image.load(os.path.join(self.ui_sprites_dir, 'Open Menu.png')).convert_alpha()
-        oms = self.open_menu_sprite.copy()
-        # cms = self.close_menu_sprite.copy()
+        self.ui_sprites_dir = self.game.assets.path("sprites/ui")
         padx = 5
         pady = 5
         self.menu_sprite_rect = pygame.rect.Rect(self.x + self.width - self.height + padx, self.y + pady, self.height - 2*padx, self.height - 2*pady)
-        self.close_menu_sprite = pygame.transform.scale(pygame.transform.flip(oms, flip_x=False, flip_y=True), self.menu_sprite_rect.size)
-        self.open_menu_sprite = pygame.transform.scale(oms, self.menu_sprite_rect.size)
+        # Shared by every menu of the same size
+        self.close_menu_sprite = self.game.assets.image("sprites/ui/Open Menu.png", self.menu_sprite_rect.size,
+                                                        smooth=False, flip_y=True)
+        self.open_menu_sprite = self.game.assets.image("sprites/ui/Open Menu.png", self.menu_sprite_rect.size,
+                                                       smooth=False)
 
 
 
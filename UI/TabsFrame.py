@@ -8,7 +8,7 @@ class TabsFrame(UIContainer):
     def __init__(self, parent: UICanvas, x=0, y=0, center: tuple[int, int] = None, width=100, height=100,
                  bg_color: tuple | str = (40, 40, 40), fg_color=(0, 0, 0), corner_radius=10,
                  button_hover_color=(63, 200, 255, 20), tabs: dict[str, UIContainer] = None):
-        super().__init__(parent, x, y, center, width, height, bg_color, fg_color, corner_radius)
+        super().__init__(parent, x, y, center, width, height, bg_color, fg_color, corner_radius=corner_radius)
         self.buttons = []
         self.tabs = tabs
         self.selected_tab = list(tabs.keys())[0]
@@ -34,11 +34,12 @@ class TabsFrame(UIContainer):
 
     def goto_tab(self):
         for button in self.buttons:
-            if button.rect.collidepoint(self.game.mousepos):
+            if button.hovered:
                 self.selected_tab = button.text
                 button.original_bg_color = self.button_hover_color
             else:
-                button.original_bg_color = self.bg_color
+                button.original_bg_color = button.bg_color = self.bg_color
+        self.invalidate()
 
     def render(self, surface: Surface):
         super().render(surface)
@@ -47,5 +48,3 @@ class TabsFrame(UIContainer):
 
     def update(self, dt):
         self.top_panel.update(dt)
-        for button in self.buttons:
-            button.update(dt)
@@ -0,0 +1,61 @@
+import unittest
+
+import pygame
+
+from UI.Abstract import UICanvas, UIContainer
+from UI.Containers import VirtualList
+from Utils.Input import InputDispatcher
+
+
+class FakeGame:
+    """
+    The parts of Game the widgets use.
+    """
+    def __init__(self):
+        pygame.font.init()
+        self.font_medium = pygame.font.Font(None, 16)
+        self.input = InputDispatcher(self)
+
+    def invalidate(self, rect=None, layer=None):
+        pass
+
+
+class InputSubscriptionTest(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.canvas = UICanvas(self.game)
+        self.panel = UIContainer(self.canvas, width=200, height=200)
+
+    def wheel_subscriptions(self):
+        return self.game.input.subscriptions[pygame.MOUSEWHEEL]
+
+    def test_removed_list_unsubscribes(self):
+        for _ in range(20):
+            self.panel.add_child(VirtualList(self.canvas, height=100, row_count=0))
+            self.assertEqual(self.wheel_subscriptions(), 1)
+            self.panel.clear()
+            self.assertEqual(self.wheel_subscriptions(), 0)
+
+    def test_removing_an_ancestor_unsubscribes_the_subtree(self):
+        VirtualList(self.panel, height=100)
+        VirtualList(self.panel, height=100)
+        self.assertEqual(self.wheel_subscriptions(), 2)
+        self.canvas.children.remove(self.panel)
+        self.assertEqual(self.wheel_subscriptions(), 0)
+        self.canvas.children.append(self.panel)
+        self.assertEqual(self.wheel_subscriptions(), 2)
+
+    def test_detached_canvas(self):
+        VirtualList(self.panel, height=100)
+        self.canvas.set_input_attached(False)
+        self.canvas.set_input_attached(False)
+        self.assertEqual(self.wheel_subscriptions(), 0)
+        # Added while the canvas is not live: subscribed when it is live again
+        VirtualList(self.panel, height=100)
+        self.assertEqual(self.wheel_subscriptions(), 0)
+        self.canvas.set_input_attached(True)
+        self.assertEqual(self.wheel_subscriptions(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
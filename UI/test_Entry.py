@@ -0,0 +1,54 @@
+import unittest
+
+import pygame
+
+from UI.Abstract import UICanvas
+from UI.Entry import TEXT_PADDING, Entry, Paragraph
+from Utils.Input import InputDispatcher
+
+# Pairs like "AV" and "To" are kerned: a sum of the single glyphs is wider than the text
+KERNED_TEXT = "AVAVAV Tower Wave To"
+
+
+class FakeGame:
+    """
+    The parts of Game the widgets use.
+    """
+    def __init__(self):
+        pygame.font.init()
+        self.font_medium = pygame.font.Font(None, 24)
+        self.input = InputDispatcher(self)
+
+    def invalidate(self, rect=None, layer=None):
+        pass
+
+
+class EntryCaretTest(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.font = self.game.font_medium
+        self.canvas = UICanvas(self.game)
+
+    def test_caret_follows_the_rendered_text(self):
+        entry = Entry(self.canvas, x=0, y=0, width=400, height=40)
+        entry.text = KERNED_TEXT
+        text_x = entry.rect.centerx - self.font.size(KERNED_TEXT)[0] // 2
+        for index in (len(KERNED_TEXT), 7, 2, 0):
+            entry.buffer.set_caret(index)
+            entry._place_caret()
+            self.assertEqual(entry.caret.rect.x, text_x + self.font.size(KERNED_TEXT[:index])[0])
+
+    def test_scrolled_caret_stays_inside(self):
+        entry = Entry(self.canvas, x=0, y=0, width=100, height=40)
+        entry.text = KERNED_TEXT * 3
+        self.assertEqual(entry.scroll_x, self.font.size(entry.text)[0] - (100 - 2 * TEXT_PADDING))
+        self.assertEqual(entry.caret.rect.x, entry.rect.right - TEXT_PADDING)
+
+    def test_paragraph_caret(self):
+        paragraph = Paragraph(self.canvas, x=0, y=0, width=2000, height=100)
+        paragraph.text = "prima riga\n" + KERNED_TEXT
+        self.assertEqual(paragraph.caret.rect.x, TEXT_PADDING + self.font.size(KERNED_TEXT)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
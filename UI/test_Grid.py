@@ -0,0 +1,35 @@
+import unittest
+
+from UI.Grid import GridGeometry
+
+
+class GridGeometryTest(unittest.TestCase):
+    def test_cell_size(self):
+        # 10 + (50 + 10) * 3 = 190
+        geometry = GridGeometry(rows=2, cols=3, width=190, height=130, pad=(10, 10))
+        self.assertEqual((geometry.cell_width, geometry.cell_height), (50, 50))
+        self.assertEqual(geometry.cell_rect(1, 2), (130, 70, 50, 50))
+
+    def test_cell_at(self):
+        geometry = GridGeometry(rows=2, cols=3, width=190, height=130, pad=(10, 10))
+        self.assertEqual(geometry.cell_at(10, 10), (0, 0))
+        self.assertEqual(geometry.cell_at(59, 59), (0, 0))
+        self.assertEqual(geometry.cell_at(179, 119), (1, 2))
+        self.assertEqual(geometry.cell_at(75.5, 100), (1, 1))
+
+    def test_outside_and_between_cells(self):
+        geometry = GridGeometry(rows=2, cols=3, width=190, height=130, pad=(10, 10))
+        for x, y in ((5, 20), (60, 20), (20, 65), (185, 20), (20, 125), (-20, 20), (500, 500)):
+            self.assertIsNone(geometry.cell_at(x, y), (x, y))
+
+    def test_every_cell_maps_back(self):
+        geometry = GridGeometry(rows=10, cols=15, width=600, height=400, pad=(4, 4))
+        for row in range(geometry.rows):
+            for col in range(geometry.cols):
+                rect = geometry.cell_rect(row, col)
+                self.assertEqual(geometry.cell_at(*rect.topleft), (row, col))
+                self.assertEqual(geometry.cell_at(rect.right - 1, rect.bottom - 1), (row, col))
+
+
+if __name__ == '__main__':
+    unittest.main()
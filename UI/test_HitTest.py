@@ -0,0 +1,37 @@
+import unittest
+from types import SimpleNamespace
+
+import pygame
+
+from UI.HitTest import HitTestGrid
+
+
+def widget(x, y, w, h):
+    return SimpleNamespace(rect=pygame.Rect(x, y, w, h))
+
+
+class HitTestGridTest(unittest.TestCase):
+    def test_topmost_widget_wins(self):
+        below, above = widget(0, 0, 200, 200), widget(50, 50, 20, 20)
+        grid = HitTestGrid()
+        grid.rebuild([below, above])
+        self.assertIs(grid.widget_at((60, 60)), above)
+        self.assertIs(grid.widget_at((150, 150)), below)
+
+    def test_miss(self):
+        grid = HitTestGrid(cell_size=10)
+        grid.rebuild([widget(0, 0, 10, 10)])
+        self.assertIsNone(grid.widget_at((10, 5)))
+        self.assertIsNone(grid.widget_at((500, 500)))
+        self.assertIsNone(grid.widget_at(None))
+
+    def test_widget_spanning_cells(self):
+        wide = widget(-30, 5, 100, 10)
+        grid = HitTestGrid(cell_size=16)
+        grid.rebuild([wide])
+        for x in (-30, 0, 40, 69):
+            self.assertIs(grid.widget_at((x, 10)), wide)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+from collections import OrderedDict, namedtuple
+
+import pygame
+
+from Utils.Image import recolor, tint
+
+AssetCacheInfo = namedtuple("AssetCacheInfo", ["hits", "misses", "maxbytes", "currbytes", "currsize"])
+
+DEFAULT_BUDGET = 32 * 1024 * 1024
+
+
+class AssetManager:
+    """
+    Loads the images under Game.assets_dir once and shares them between all the widgets.
+    Surfaces are cached already converted to the display format (convert_alpha, or convert for opaque images),
+    and so are their scaled, flipped and recoloured variants, keyed by target size and palette. The least recently used surfaces are
+    evicted when the memory budget runs out. The returned surfaces are shared and must not be modified.
+    """
+    def __init__(self, assets_dir: str, maxbytes: int = DEFAULT_BUDGET):
+        self.assets_dir = assets_dir
+        self.maxbytes = maxbytes
+        # (path, size, alpha, smooth, flip_x, flip_y) -> surface
+        self._cache: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, name: str) -> str:
+        """
+        Resolves the path of an asset. name is relative to assets_dir and can use '/' or '\\' as separator.
+        """
+        if os.path.isabs(name):
+            return name
+        return os.path.join(self.assets_dir, *name.replace("\\", "/").split("/"))
+
+    def image(self, name: str, size: tuple[int, int] | None = None, alpha: bool = True, smooth: bool = True,
+              flip_x: bool = False, flip_y: bool = False, palette: dict | None = None, tolerance: float = 0.0,
+              tint_color=None) -> pygame.Surface:
+        """
+        Returns an image, loading it only the first time.
+        :param name: path of the image, relative to assets_dir (e.g. "sprites/ui/refresh.png")
+        :param size: scale the image to this size
+        :param alpha: keep the transparency (convert_alpha), False for opaque images (convert, faster to blit)
+        :param smooth: scale with smoothscale instead of scale
+        :param flip_x: mirror horizontally
+        :param flip_y: mirror vertically
+        :param palette: recolour the image, source colour -> target colour (see Utils.Image.recolor)
+        :param tolerance: tolerance of the palette
+        :param tint_color: multiply the colours of the image by this one (see Utils.Image.tint)
+        :return: the shared surface
+        """
+        path = self.path(name)
+        size = tuple(int(v) for v in size) if size is not None else None
+        colors = _colors_key(palette, tolerance, tint_color)
+        key = (path, size, alpha, smooth if size is not None else False, flip_x, flip_y, colors)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return surface
+        self.misses += 1
+        if size is None and not (flip_x or flip_y) and colors is None:
+            surface = pygame.image.load(path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        elif size is None and not (flip_x or flip_y):
+            # The colours are changed once on the original, the scaled variants start from the recoloured one
+            surface = self.image(path, alpha=alpha)
+            if palette:
+                surface = recolor(surface, palette, tolerance)
+            if tint_color is not None:
+                surface = tint(surface, tint_color)
+        else:
+            surface = self.image(path, alpha=alpha, palette=palette, tolerance=tolerance, tint_color=tint_color)
+            if flip_x or flip_y:
+                surface = pygame.transform.flip(surface, flip_x, flip_y)
+            if size is not None and size != surface.get_size():
+                surface = (pygame.transform.smoothscale if smooth else pygame.transform.scale)(surface, size)
+        self._store(key, surface)
+        return surface
+
+    def images(self, names, size: tuple[int, int] | None = None, alpha: bool = True, palette: dict | None = None,
+               tint_color=None) -> list[pygame.Surface]:
+        """
+        Same as image for every name, e.g. the frames of an animation.
+        """
+        return [self.image(name, size, alpha, palette=palette, tint_color=tint_color) for name in names]
+
+    def _store(self, key, surface: pygame.Surface):
+        self._cache[key] = surface
+        self._bytes += _surface_bytes(surface)
+        while self._bytes > self.maxbytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= _surface_bytes(evicted)
+
+    def info(self) -> AssetCacheInfo:
+        """
+        Statistics of the cache, the hit rate is hits / (hits + misses).
+        :return: AssetCacheInfo(hits, misses, maxbytes, currbytes, currsize)
+        """
+        return AssetCacheInfo(self.hits, self.misses, self.maxbytes, self._bytes, len(self._cache))
+
+    def set_budget(self, maxbytes: int):
+        """
+        Changes the memory budget, evicting the least recently used surfaces if needed.
+        :param maxbytes: maximum size in bytes of the cached surfaces
+        :return: None
+        """
+        self.maxbytes = maxbytes
+        while self._bytes > self.maxbytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= _surface_bytes(evicted)
+
+    def clear(self):
+        """
+        Empties the cache and resets its counters.
+        :return: None
+        """
+        self._cache.clear()
+        self._bytes = self.hits = self.misses = 0
+
+
+def _colors_key(palette: dict | None, tolerance: float, tint_color) -> tuple | None:
+    """
+    Part of the cache key for the colour changes, the same palette written in different ways gives the same key.
+    """
+    if not palette and tint_color is None:
+        return None
+    palette = tuple(sorted((tuple(pygame.Color(source)), tuple(pygame.Color(target)))
+                           for source, target in (palette or {}).items()))
+    return palette, tolerance if palette else 0.0, tuple(pygame.Color(tint_color)) if tint_color is not None else None
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
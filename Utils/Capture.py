@@ -0,0 +1,139 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class StackSampler:
+    """
+    Samples the call stack of a thread at a fixed interval from a background thread, counting how many times
+    every stack was seen: the collapsed stacks read by flamegraph.pl, speedscope and similar tools.
+    """
+    def __init__(self, thread_id: int | None = None, interval: float = 0.001):
+        """
+        :param thread_id: the thread to sample, by default the one creating the sampler
+        :param interval: seconds between two samples
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            del frame
+            self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """
+        The samples as collapsed stacks, a line "outermost;...;innermost count" per stack.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileCapture:
+    """
+    Profiles the game for the next frames or seconds, started and stopped with F4 (see Game.get_events).
+    The capture runs cProfile and a StackSampler together, and when it ends it writes next to the database
+    profile-<date>-<time>-<state>.pstats (open it with pstats or snakeviz) and .folded (the collapsed stacks,
+    for a flame graph), <state> being the class of the state on top of the stack when the capture started.
+    """
+    def __init__(self, game, frames: int | None = 600, seconds: float | None = 10.0, interval: float = 0.001):
+        """
+        :param frames: frames after which the capture ends, None for no limit
+        :param seconds: seconds after which the capture ends, None for no limit
+        :param interval: seconds between two samples of the stack
+        """
+        self.game = game
+        self.frames = frames
+        self.seconds = seconds
+        self.interval = interval
+        self.active = False
+        self._profile: cProfile.Profile | None = None
+        self._sampler: StackSampler | None = None
+        self._frames_done = 0
+        self._started = 0.0
+        self._name = ""
+
+    def toggle(self):
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        if self.active:
+            return
+        state_stack = self.game.state_stack
+        state = type(state_stack.top()).__name__ if not state_stack.is_empty() else "NoState"
+        self._name = f"profile-{datetime.now():%Y%m%d-%H%M%S}-{state}"
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler is already running (e.g. python -m cProfile main.py)
+            print(f"Profile capture not started: {e}")
+            self._profile = None
+            return
+        self._sampler = StackSampler(interval=self.interval)
+        self._sampler.start()
+        self.active = True
+        self._frames_done = 0
+        self._started = time.perf_counter()
+        print(f"Profile capture started: {self._name}")
+
+    def on_frame(self):
+        """
+        Called by Game.render after every frame, ends the capture when its frames or seconds are over.
+        :return: None
+        """
+        if not self.active:
+            return
+        self._frames_done += 1
+        if self.frames is not None and self._frames_done >= self.frames or \
+                self.seconds is not None and time.perf_counter() - self._started >= self.seconds:
+            self.stop()
+
+    def stop(self) -> tuple[str, str] | None:
+        """
+        Ends the capture and writes its files.
+        :return: the paths of the .pstats and .folded files, None if no capture was running
+        """
+        if not self.active:
+            return None
+        self._profile.disable()
+        self._sampler.stop()
+        self.active = False
+        directory = os.path.dirname(os.path.abspath(self.game.db_path))
+        stats_path = os.path.join(directory, self._name + ".pstats")
+        folded_path = os.path.join(directory, self._name + ".folded")
+        self._profile.dump_stats(stats_path)
+        with open(folded_path, "w", encoding="utf-8") as file:
+            file.write(self._sampler.collapsed())
+        self._profile = self._sampler = None
+        elapsed = time.perf_counter() - self._started
+        print(f"Profile capture of {self._frames_done} frames ({elapsed:.1f} s) saved to {stats_path} and {folded_path}")
+        return stats_path, folded_path
@@ -0,0 +1,113 @@
+import pygame
+
+# Extra pixels around every reported rect, covering borders and antialiasing that exceed the widget rect
+DIRTY_RECT_MARGIN = 4
+# Above this many disjoint rects a single union is redrawn instead, the layers are rendered once per rect
+MAX_DIRTY_RECTS = 8
+
+
+def merge_rects(rects: list[pygame.Rect], bounds: pygame.Rect) -> list[pygame.Rect]:
+    """
+    Clips the rects to the bounds and merges the overlapping ones.
+    :param rects: the rects to merge
+    :param bounds: the area the rects are clipped to
+    :return: disjoint rects (a single union if there would be more than MAX_DIRTY_RECTS)
+    """
+    merged: list[pygame.Rect] = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if rect.w == 0 or rect.h == 0:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    if len(merged) > MAX_DIRTY_RECTS:
+        merged = [merged[0].unionall(merged[1:])]
+    return merged
+
+
+class Compositor:
+    """
+    Builds the frame out of the render layers of Game.render_stack ("background", "foreground", "above_all").
+    Every layer is rendered on its own surface, which is kept between frames: only the damaged areas of a
+    layer are rendered again, and the frame is re-composited only where some layer changed.
+    """
+    def __init__(self, size: tuple[int, int], render_stack: dict[str, list]):
+        self.size = size
+        self.bounds = pygame.Rect((0, 0), size)
+        self.render_stack = render_stack
+        self.surfaces: dict[str, pygame.Surface] = {}
+        self.damage: dict[str, list[pygame.Rect]] = {layer: [] for layer in render_stack}
+        self.full_damage: dict[str, bool] = {layer: True for layer in render_stack}
+        # Class of the layer surfaces (Utils.Metrics.CountingSurface counts the blits on them)
+        self.surface_class = pygame.Surface
+        # With a single non-empty layer (the usual case) it is rendered straight on the target
+        self.direct = False
+
+    def invalidate(self, rect=None, layer: str | None = None):
+        """
+        Reports a changed area of a layer.
+        :param rect: the area that has to be rendered again, None means the whole layer
+        :param layer: the layer, None means every layer
+        :return: None
+        """
+        layers = self.render_stack.keys() if layer is None else (layer,)
+        for layer in layers:
+            if self.full_damage[layer]:
+                continue
+            if rect is None:
+                self.full_damage[layer] = True
+                self.damage[layer].clear()
+            else:
+                self.damage[layer].append(pygame.Rect(rect).inflate(DIRTY_RECT_MARGIN, DIRTY_RECT_MARGIN))
+
+    def get_surface(self, layer: str) -> pygame.Surface:
+        surface = self.surfaces.get(layer)
+        if surface is None:
+            surface = self.surfaces[layer] = self.surface_class(self.size, pygame.SRCALPHA)
+        return surface
+
+    def compose(self, target: pygame.Surface) -> list[pygame.Rect]:
+        """
+        Renders the damaged areas of every layer and composites them on the target.
+        :param target: the surface receiving the frame (the game canvas)
+        :return: the areas of the target that changed, empty if nothing did
+        """
+        direct = sum(1 for render_functions in self.render_stack.values() if render_functions) == 1
+        if direct != self.direct:
+            self.direct = direct
+            self.invalidate()
+
+        damaged: list[pygame.Rect] = []
+        for layer, render_functions in self.render_stack.items():
+            if self.full_damage[layer]:
+                rects = [self.bounds.copy()]
+                self.full_damage[layer] = False
+            else:
+                rects = merge_rects(self.damage[layer], self.bounds)
+            self.damage[layer].clear()
+            if not rects:
+                continue
+            damaged.extend(rects)
+            if not render_functions:
+                # Not blitted anyway, the surface is rendered again in full when something is added to the layer
+                continue
+            surface = target if direct else self.get_surface(layer)
+            for rect in rects:
+                surface.set_clip(rect)
+                surface.fill((0, 0, 0, 0) if surface is not target else (0, 0, 0))
+                for render_function in render_functions:
+                    render_function(surface)
+            surface.set_clip(None)
+
+        damaged = merge_rects(damaged, self.bounds)
+        if direct:
+            return damaged
+        for rect in damaged:
+            target.fill((0, 0, 0), rect)
+            for layer, render_functions in self.render_stack.items():
+                if render_functions:
+                    target.blit(self.get_surface(layer), rect, rect)
+        return damaged
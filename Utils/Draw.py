@@ -1,7 +1,95 @@
+from collections import OrderedDict, namedtuple
+
 import pygame
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Translucent shapes already rasterized, (size, color, corner_radius, width) -> SRCALPHA surface
+_shape_cache: OrderedDict = OrderedDict()
+_shape_cache_maxsize = 256
+_shape_cache_hits = 0
+_shape_cache_misses = 0
+
 
 def draw_rect_alpha(surface, color, rect, corner_radius=10, width=0):
-    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA)
+    """
+    Draws a (rounded) rect that can be translucent.
+    Fully transparent colors draw nothing, opaque colors are drawn straight on the surface,
+    translucent shapes are rasterized once and then reused from a LRU cache.
+    :param surface: The surface to draw on
+    :param color: RGB or RGBA color
+    :param rect: The rect
+    :param corner_radius: radius of the corners
+    :param width: width of the border, 0 fills the rect
+    :return: None
+    """
+    color = normalize_color(color)
+    alpha = color[3]
+    if alpha == 0:
+        return
+    if alpha == 255:
+        if corner_radius <= 0 and width == 0:
+            surface.fill(color, rect)
+        else:
+            pygame.draw.rect(surface, color, rect, width=width, border_radius=corner_radius)
+        return
+    rect = pygame.Rect(rect)
+    surface.blit(_get_shape(rect.size, color, corner_radius, width), rect)
+
+
+def _get_shape(size, color, corner_radius, width) -> pygame.Surface:
+    global _shape_cache_hits, _shape_cache_misses
+    key = (size, color, corner_radius, width)
+    shape_surf = _shape_cache.get(key)
+    if shape_surf is not None:
+        _shape_cache_hits += 1
+        _shape_cache.move_to_end(key)
+        return shape_surf
+    _shape_cache_misses += 1
+    shape_surf = pygame.Surface(size, pygame.SRCALPHA)
     pygame.draw.rect(shape_surf, color, shape_surf.get_rect(), width=width, border_radius=corner_radius)
-    surface.blit(shape_surf, rect)
+    _shape_cache[key] = shape_surf
+    while len(_shape_cache) > _shape_cache_maxsize:
+        _shape_cache.popitem(last=False)
+    return shape_surf
+
+
+def normalize_color(color) -> tuple[int, int, int, int]:
+    """
+    Returns a color (RGB, RGBA or a name like "white") as an RGBA tuple of ints, e.g. to check its alpha.
+    """
+    if isinstance(color, str):
+        return tuple(pygame.Color(color))
+    if len(color) == 3:
+        return int(color[0]), int(color[1]), int(color[2]), 255
+    return int(color[0]), int(color[1]), int(color[2]), int(color[3])
+
+
+def shape_cache_info() -> CacheInfo:
+    """
+    Statistics of the cache used by draw_rect_alpha, useful to size it.
+    :return: CacheInfo(hits, misses, maxsize, currsize)
+    """
+    return CacheInfo(_shape_cache_hits, _shape_cache_misses, _shape_cache_maxsize, len(_shape_cache))
+
+
+def set_shape_cache_size(maxsize: int):
+    """
+    Changes how many rasterized shapes are kept, evicting the least recently used ones if needed.
+    :param maxsize: maximum number of cached shapes
+    :return: None
+    """
+    global _shape_cache_maxsize
+    _shape_cache_maxsize = maxsize
+    while len(_shape_cache) > _shape_cache_maxsize:
+        _shape_cache.popitem(last=False)
+
+
+def clear_shape_cache():
+    """
+    Empties the cache used by draw_rect_alpha and resets its counters.
+    :return: None
+    """
+    global _shape_cache_hits, _shape_cache_misses
+    _shape_cache.clear()
+    _shape_cache_hits = _shape_cache_misses = 0
@@ -0,0 +1,62 @@
+import os
+from collections import namedtuple
+
+import pygame
+
+FontCacheInfo = namedtuple("FontCacheInfo", ["hits", "misses", "currsize"])
+
+DEFAULT_FACE = "Comfortaa-Regular.ttf"
+
+
+class FontRegistry:
+    """
+    Fonts under Game.font_dir, opened the first time a (face, size, style) is asked for and then shared,
+    so that every widget using the same font also shares the cached text surfaces (see Utils/Text.py).
+    """
+    def __init__(self, font_dir: str, default_face: str = DEFAULT_FACE):
+        self.font_dir = font_dir
+        self.default_face = default_face
+        # (face, size, bold, italic) -> font
+        self._fonts: dict[tuple, pygame.font.Font] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, size: int, face: str | None = None, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+        """
+        Returns a font, opening it on the first request.
+        :param size: size in points
+        :param face: file name of the font in font_dir, None for the default face
+        :param bold: synthetic bold
+        :param italic: synthetic italic
+        :return: the shared font, it must not be modified (e.g. with set_bold)
+        """
+        key = (face or self.default_face, int(size), bold, italic)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        self.misses += 1
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(os.path.join(self.font_dir, key[0]), key[1])
+        font.bold, font.italic = bold, italic
+        self._fonts[key] = font
+        return font
+
+    def preload(self, fonts):
+        """
+        Opens the given fonts in advance, e.g. the ones the first screen needs.
+        :param fonts: sizes, or tuples of arguments of get (size, face, bold, italic)
+        :return: None
+        """
+        for font in fonts:
+            if isinstance(font, tuple):
+                self.get(*font)
+            else:
+                self.get(font)
+
+    def info(self) -> FontCacheInfo:
+        """
+        :return: FontCacheInfo(hits, misses, currsize)
+        """
+        return FontCacheInfo(self.hits, self.misses, len(self._fonts))
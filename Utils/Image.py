@@ -23,3 +23,38 @@ def images_from_spritesheet(path: str, tilesize: tuple[int, int]) -> list[pygame
         x = 0
         y += tilesize[1]
     return images
+
+
+def recolor(surface: pygame.Surface, color_map: dict, tolerance: float = 0.0) -> pygame.Surface:
+    """
+    Returns a copy of surface with some colours replaced, e.g. {(0, 0, 0): (255, 255, 255)} for a black icon
+    on a dark theme. The replacement is done by PixelArray.replace, without looping over the pixels in Python.
+    Colours are compared on RGB only and every pixel keeps its alpha, so the antialiased edges of an icon
+    are recoloured too.
+    :param surface: the image, with per-pixel alpha
+    :param color_map: source colour -> target colour
+    :param tolerance: how far (0 to 1, see PixelArray.replace) a colour can be from a source colour to be replaced
+    :return: the recoloured image
+    """
+    result = surface.copy()
+    # With distance 0 PixelArray.replace would compare the alpha too, a tiny one compares just the RGB
+    distance = max(tolerance, 1e-6)
+    with pygame.PixelArray(result) as pixels:
+        for source, target in color_map.items():
+            pixels.replace(source, target, distance=distance)
+    # replace writes opaque pixels: the alpha of the original is restored by taking the minimum of the two
+    alpha = surface.copy()
+    alpha.fill((255, 255, 255, 0), special_flags=pygame.BLEND_RGBA_MAX)
+    result.blit(alpha, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+    return result
+
+
+def tint(surface: pygame.Surface, color) -> pygame.Surface:
+    """
+    Returns a copy of surface with its colours multiplied by color, keeping the alpha: a white icon becomes
+    an icon of that colour.
+    """
+    color = pygame.Color(color)
+    result = surface.copy()
+    result.fill((color.r, color.g, color.b), special_flags=pygame.BLEND_RGB_MULT)
+    return result
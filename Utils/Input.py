@@ -0,0 +1,116 @@
+from collections import Counter
+
+import pygame as p
+
+# Event types the game loop itself needs, whatever the widgets subscribe to
+CORE_EVENTS = (p.QUIT, p.VIDEOEXPOSE, p.WINDOWEXPOSED, p.MOUSEMOTION, p.MOUSEBUTTONDOWN, p.MOUSEBUTTONUP,
+               p.KEYDOWN, p.KEYUP, p.TEXTINPUT)
+
+
+class InputDispatcher:
+    """
+    Routes the events of a frame to the widgets, which react in their on_* handlers (see UICanvas)
+    instead of polling the game state in update:
+    - pointer events go to the widget under the pointer and up through its parents, until a handler returns True
+    - keyboard events go to the focused widget, the focus moves with the left click to a focusable widget.
+    Event types nobody subscribed to are blocked, so they are neither queued nor wake up the idle frame loop.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.hovered = None  # clickable widget under the pointer
+        self.under_pointer = None  # topmost widget under the pointer, clickable or not
+        self.focused = None
+        self.subscriptions = Counter(CORE_EVENTS)
+        self._filter_changed = True
+
+    def subscribe(self, event_type: int):
+        """
+        Lets events of event_type through, e.g. pygame.MOUSEWHEEL for a scrollable widget.
+        :return: None
+        """
+        self.subscriptions[event_type] += 1
+        if self.subscriptions[event_type] == 1:
+            self._filter_changed = True
+
+    def unsubscribe(self, event_type: int):
+        if self.subscriptions[event_type] > 0:
+            self.subscriptions[event_type] -= 1
+            if self.subscriptions[event_type] == 0:
+                self._filter_changed = True
+
+    def apply_event_filter(self):
+        p.event.set_blocked(None)
+        p.event.set_allowed([event_type for event_type, count in self.subscriptions.items() if count > 0])
+        self._filter_changed = False
+
+    def dispatch(self, events, canvases):
+        """
+        Updates the hovered widget and delivers the events of the frame.
+        :param events: the events of the frame
+        :param canvases: root canvases receiving input, topmost first
+        :return: None
+        """
+        if self._filter_changed:
+            self.apply_event_filter()
+        if self.focused is not None and (not self.focused.visible or self.focused.get_root() not in canvases):
+            self.set_focus(None)
+        self.update_pointer(canvases)
+        for event in events:
+            if event.type == p.MOUSEBUTTONDOWN:
+                self.bubble(self.under_pointer, "on_mouse_down", event)
+            elif event.type == p.MOUSEBUTTONUP:
+                if event.button == 1:
+                    self.set_focus(self.hovered if self.hovered is not None and self.hovered.focusable else None)
+                self.bubble(self.under_pointer, "on_mouse_up", event)
+            elif event.type == p.MOUSEWHEEL:
+                self.bubble(self.under_pointer, "on_mouse_wheel", event)
+            elif self.focused is not None:
+                if event.type == p.KEYDOWN:
+                    self.focused.on_key_down(event)
+                elif event.type == p.KEYUP:
+                    self.focused.on_key_up(event)
+
+    def update_pointer(self, canvases):
+        under_pointer = None
+        for canvas in canvases:
+            if canvas.visible and canvas.interactable:
+                under_pointer = canvas.hit_test(self.game.mousepos)
+                if under_pointer is not None:
+                    break
+        self.under_pointer = under_pointer
+        hovered = under_pointer if under_pointer is not None and under_pointer.clickable else None
+        if hovered is not self.hovered:
+            previous, self.hovered = self.hovered, hovered
+            if previous is not None:
+                previous.hovered = False
+                previous.on_unhover()
+            if hovered is not None:
+                hovered.hovered = True
+                hovered.on_hover()
+
+    @staticmethod
+    def bubble(widget, handler: str, event) -> bool:
+        """
+        Calls the handler on widget and on its parents until one of them returns True.
+        :return: whether the event was handled
+        """
+        while widget is not None:
+            if getattr(widget, handler)(event):
+                return True
+            widget = widget.__dict__.get("parent")
+        return False
+
+    def set_focus(self, widget):
+        """
+        Gives the keyboard focus to widget, None removes it. Without a focused widget the keys go to
+        the game actions (see Game.get_events).
+        :return: None
+        """
+        if widget is self.focused:
+            return
+        previous, self.focused = self.focused, widget
+        if previous is not None:
+            previous.on_blur()
+        if widget is not None:
+            widget.on_focus()
+        self.game.need_key_event_handling = widget is None
@@ -0,0 +1,317 @@
+import bisect
+import functools
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import pygame
+
+from Utils import Draw, Text
+
+# Upper bounds of the buckets of the histograms, in ms for times, the last bucket takes everything above
+TIME_BOUNDS_MS = (0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266, 500, 1000)
+COUNT_BOUNDS = (0, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Counter:
+    """
+    A value that only grows (e.g. queries run), reported as the increase over the last interval.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n: int = 1):
+        self.value += n
+
+    def collect(self) -> int:
+        value, self.value = self.value, 0
+        return value
+
+
+class Gauge:
+    """
+    A value that goes up and down (e.g. live widgets), reported as its last value.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def collect(self):
+        return self.value
+
+
+class Histogram:
+    """
+    Distribution of a value over the last interval: count, sum, max, and the observations per bucket.
+    """
+    __slots__ = ("bounds", "buckets", "count", "total", "max")
+
+    def __init__(self, bounds=TIME_BOUNDS_MS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Upper bound of the bucket holding the q-th percentile (0 to 100), the max for the last bucket.
+        """
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def collect(self) -> dict:
+        result = {"count": self.count, "sum": round(self.total, 3), "max": round(self.max, 3),
+                  "p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99),
+                  "buckets": dict(zip([str(b) for b in self.bounds] + ["inf"], self.buckets))}
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count, self.total, self.max = 0, 0.0, 0.0
+        return result
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms. Asking twice for the same name returns the same metric.
+    """
+    def __init__(self):
+        self.counters: dict[str, Counter] = {}
+        self.gauges: dict[str, Gauge] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        metric = self.counters.get(name)
+        if metric is None:
+            metric = self.counters[name] = Counter()
+        return metric
+
+    def gauge(self, name: str) -> Gauge:
+        metric = self.gauges.get(name)
+        if metric is None:
+            metric = self.gauges[name] = Gauge()
+        return metric
+
+    def histogram(self, name: str, bounds=TIME_BOUNDS_MS) -> Histogram:
+        metric = self.histograms.get(name)
+        if metric is None:
+            metric = self.histograms[name] = Histogram(bounds)
+        return metric
+
+    def collect(self) -> dict:
+        """
+        The values of every metric, starting a new interval for the counters and the histograms.
+        """
+        return {"counters": {name: metric.collect() for name, metric in self.counters.items()},
+                "gauges": {name: metric.collect() for name, metric in self.gauges.items()},
+                "histograms": {name: metric.collect() for name, metric in self.histograms.items()}}
+
+
+# The metrics of the app, see GameMetrics
+metrics = MetricsRegistry()
+
+
+class CountingSurface(pygame.Surface):
+    """
+    Surface counting the blits made on it (pygame.Surface.blit can't be hooked otherwise).
+    Game uses it for the game canvas and the compositor for the layers when the metrics are on.
+    """
+    blits = 0
+
+    def blit(self, *args, **kwargs):
+        CountingSurface.blits += 1
+        return super().blit(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=256)
+def statement_name(sql: str) -> str:
+    """
+    Name of a SQL statement in the metrics: its text on a single line, at most 80 characters.
+    """
+    return re.sub(r"\s+", " ", sql).strip()[:80]
+
+
+class InstrumentedCursor:
+    """
+    sqlite3 cursor recording the latency of every statement in the histogram "sql <statement>", in ms.
+    Everything else (fetchone, lastrowid...) is the cursor's own.
+    """
+    def __init__(self, cursor, registry: MetricsRegistry = metrics):
+        self._cursor = cursor
+        self._registry = registry
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql: str, parameters=()):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, parameters)
+        finally:
+            self._registry.histogram("sql " + statement_name(sql)).observe((time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_parameters)
+        finally:
+            self._registry.histogram("sql " + statement_name(sql)).observe((time.perf_counter() - start) * 1000)
+
+
+class InstrumentedConnection:
+    """
+    sqlite3 connection whose cursors are InstrumentedCursors, recording the latency of the commits too.
+    """
+    def __init__(self, connection, registry: MetricsRegistry = metrics):
+        self._connection = connection
+        self._registry = registry
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self) -> InstrumentedCursor:
+        return InstrumentedCursor(self._connection.cursor(), self._registry)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            self._connection.commit()
+        finally:
+            self._registry.histogram("sql COMMIT").observe((time.perf_counter() - start) * 1000)
+
+
+class JsonlExporter:
+    """
+    Appends the metrics to a JSON-lines file every interval seconds, a line per interval.
+    When the file would grow beyond max_bytes it is renamed to path.1 (path.1 to path.2 and so on,
+    up to backups files) and a new one is started.
+    """
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 60.0, max_bytes: int = 5 * 1024 * 1024,
+                 backups: int = 3, sample=None):
+        """
+        :param path: the file the lines are appended to
+        :param interval: seconds between two lines
+        :param max_bytes: size at which the file is rotated
+        :param backups: rotated files kept
+        :param sample: function called before every line, to update the gauges
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.sample = sample
+        self._scheduler = None
+        self._call = None
+
+    def start(self, scheduler):
+        """
+        Writes a line every interval seconds, from the callbacks of scheduler (e.g. Game.scheduler).
+        :return: None
+        """
+        self.stop()
+        self._scheduler = scheduler
+        self._call = scheduler.call_every(self.interval, self.write)
+
+    def stop(self):
+        if self._call is not None:
+            self._scheduler.cancel(self._call)
+            self._call = None
+
+    def write(self) -> dict:
+        """
+        Writes the metrics of the interval that just ended.
+        :return: the record written
+        """
+        if self.sample is not None:
+            self.sample()
+        record = {"time": datetime.now().isoformat(timespec="seconds"), **self.registry.collect()}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+            self.rotate()
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+        return record
+
+    def rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class GameMetrics:
+    """
+    The metrics of a running game: frame time and blits per frame (histograms "frame ms" and "frame blits"),
+    font.render calls ("font.render", the misses of the text cache), live widgets and cached surfaces (gauges),
+    plus whatever the states record in the same registry (e.g. the SQL latencies of InstrumentedCursor).
+    Started by Game.enable_metrics.
+    """
+    def __init__(self, game, path: str, interval: float = 60.0, registry: MetricsRegistry = metrics, **exporter_args):
+        self.game = game
+        self.registry = registry
+        self.frame_ms = registry.histogram("frame ms")
+        self.frame_blits = registry.histogram("frame blits", COUNT_BOUNDS)
+        self.font_renders = registry.counter("font.render")
+        self._text_misses = Text.text_cache_info().misses
+        self.exporter = JsonlExporter(registry, path, interval, sample=self.sample, **exporter_args)
+
+    def on_frame(self, seconds: float):
+        """
+        Called by Game.game_loop after every frame.
+        :param seconds: time spent in update and render
+        :return: None
+        """
+        self.frame_ms.observe(seconds * 1000)
+        self.frame_blits.observe(CountingSurface.blits)
+        CountingSurface.blits = 0
+        misses = Text.text_cache_info().misses
+        self.font_renders.inc(misses - self._text_misses)
+        self._text_misses = misses
+
+    def sample(self):
+        """
+        Counts the widgets of the states on the stack and the surfaces kept by them and by the caches.
+        :return: None
+        """
+        widgets = surfaces = 0
+        for state in self.game.state_stack.stack:
+            nodes = [state.canvas]
+            while nodes:
+                node = nodes.pop()
+                widgets += 1
+                surfaces += sum(1 for name in ("backing", "surface")
+                                if isinstance(node.__dict__.get(name), pygame.Surface))
+                nodes.extend(node.children)
+        surfaces += Text.text_cache_info().currsize + Draw.shape_cache_info().currsize
+        surfaces += len(self.game.compositor.surfaces)
+        if self.game.assets is not None:
+            surfaces += self.game.assets.info().currsize
+        self.registry.gauge("widgets").set(widgets)
+        self.registry.gauge("surfaces").set(surfaces)
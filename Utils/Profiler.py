@@ -0,0 +1,252 @@
+import functools
+import time
+from collections import deque
+
+import pygame
+
+from UI.Abstract import UICanvas
+from Utils import Draw
+from Utils.Text import render_text
+
+# Upper bounds in ms of the bars of the frame time histogram, the last one takes everything above
+HISTOGRAM_BOUNDS = (2, 4, 8, 16, 33, 66, float("inf"))
+# Widgets listed by the overlay
+SLOWEST_SHOWN = 8
+
+
+def _all_widget_classes(cls=UICanvas) -> list[type]:
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        for c in _all_widget_classes(subclass):
+            if c not in classes:
+                classes.append(c)
+    return classes
+
+
+def describe(widget) -> str:
+    """
+    Short name of a widget for the overlay: its class and its text, if it has one.
+    """
+    text = widget.__dict__.get("text")
+    if isinstance(text, str) and text:
+        return f"{type(widget).__name__} '{text[:16]}'"
+    return type(widget).__name__
+
+
+class FrameProfiler:
+    """
+    Debug overlay toggled with F3 (see Game.get_events): FPS, a histogram of the frame times, the time spent
+    in update, render (composition of the layers) and present, and the slowest widget subtrees of the current
+    state's canvas.
+    While it is on, update and render of every widget class are replaced by timed wrappers, and Game.update,
+    Compositor.compose and Game.present by timed ones; toggling it off puts the original methods back,
+    so when it is off nothing is measured and nothing costs anything.
+    """
+    def __init__(self, game, clock=time.perf_counter, window: int = 30, history: int = 120):
+        """
+        :param clock: function returning the current time in seconds
+        :param window: frames over which the averages and the slowest widgets are computed
+        :param history: frames in the histogram
+        """
+        self.game = game
+        self.clock = clock
+        self.window = window
+        self.enabled = False
+        self.rect = pygame.Rect(0, 0, 330, 0)
+        # (update, render, present) times in seconds of the last frames, and the time between their starts
+        self.frames: deque[tuple[float, float, float]] = deque(maxlen=history)
+        self.intervals: deque[float] = deque(maxlen=history)
+        self._frame_start: float | None = None
+        self._current = [0.0, 0.0, 0.0]
+        # (phase, widget) -> [time of the subtree, time of the widget alone], summed over the current window
+        self._widget_times: dict[tuple[str, UICanvas], list[float]] = {}
+        # Widgets being timed, innermost last, with the time spent in their timed children: [widget, children]
+        self._stack: list[list] = []
+        self._window_frames = 0
+        # Result of the last window: [(phase, description, ms per frame of the subtree, ms of the widget alone)]
+        self.slowest: list[tuple[str, str, float, float]] = []
+        self._patched: list[tuple[object, str, object]] = []
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.frames.clear()
+        self.intervals.clear()
+        self._frame_start = None
+        self._widget_times.clear()
+        self._window_frames = 0
+        self.slowest = []
+        for cls in _all_widget_classes():
+            for phase in ("update", "render"):
+                if phase in cls.__dict__:
+                    self._patch(cls, phase, self._timed_widget_method(phase, cls.__dict__[phase]))
+        game = self.game
+        self._patch(game, "update", self._timed_frame_phase(0, game.update, start=True))
+        self._patch(game.compositor, "compose", self._timed_frame_phase(1, game.compositor.compose))
+        self._patch(game, "present", self._timed_frame_phase(2, game.present, end=True))
+        game.add_to_layer(self.render, "above_all")
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for owner, name, original in reversed(self._patched):
+            if isinstance(owner, type):
+                setattr(owner, name, original)
+            else:
+                # Instance attributes shadowing the methods of the class
+                delattr(owner, name)
+        self._patched.clear()
+        self._stack.clear()
+        self.game.remove_from_layer(self.render, "above_all")
+        self.game.invalidate(self.rect, "above_all")
+
+    def _patch(self, owner, name: str, replacement):
+        self._patched.append((owner, name, owner.__dict__[name] if isinstance(owner, type) else None))
+        setattr(owner, name, replacement)
+
+    def _timed_widget_method(self, phase: str, method):
+        stack = self._stack
+        times = self._widget_times
+        clock = self.clock
+
+        @functools.wraps(method)
+        def timed(widget, *args):
+            if stack and stack[-1][0] is widget:
+                # super().update/render of an override that is already being timed
+                return method(widget, *args)
+            entry = [widget, 0.0]
+            stack.append(entry)
+            start = clock()
+            try:
+                return method(widget, *args)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                total = times.get((phase, widget))
+                if total is None:
+                    times[(phase, widget)] = [elapsed, elapsed - entry[1]]
+                else:
+                    total[0] += elapsed
+                    total[1] += elapsed - entry[1]
+        return timed
+
+    def _timed_frame_phase(self, index: int, method, start=False, end=False):
+        clock = self.clock
+
+        @functools.wraps(method)
+        def timed(*args):
+            begin = clock()
+            if start:
+                if self._frame_start is not None:
+                    self.intervals.append(begin - self._frame_start)
+                self._frame_start = begin
+            result = method(*args)
+            self._current[index] = clock() - begin
+            if end:
+                self.end_frame()
+            return result
+        return timed
+
+    def end_frame(self):
+        """
+        Records the times of the frame that has just been presented, and redraws the overlay in the next one.
+        :return: None
+        """
+        self.frames.append(tuple(self._current))
+        self._current = [0.0, 0.0, 0.0]
+        self._window_frames += 1
+        if self._window_frames >= self.window:
+            self.slowest = self.slowest_subtrees()
+            self._widget_times.clear()
+            self._window_frames = 0
+        self.game.invalidate(self.rect, "above_all")
+
+    def slowest_subtrees(self, n: int = SLOWEST_SHOWN) -> list[tuple[str, str, float, float]]:
+        """
+        The widgets under the canvas of the current state that took the most time, subtree included,
+        averaged over the frames of the current window.
+        :return: [(phase, description, ms per frame of the subtree, ms per frame of the widget alone)]
+        """
+        state_stack = self.game.state_stack
+        if state_stack.is_empty() or not self._window_frames:
+            return []
+        canvas = state_stack.top().canvas
+        rows = [(phase, widget, subtree, alone) for (phase, widget), (subtree, alone) in self._widget_times.items()
+                if widget is not canvas and widget.get_root() is canvas]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        scale = 1000 / self._window_frames
+        return [(phase, describe(widget), subtree * scale, alone * scale) for phase, widget, subtree, alone in rows[:n]]
+
+    def histogram(self) -> list[int]:
+        """
+        Frames of the history in each bar of HISTOGRAM_BOUNDS, by the time spent in update, render and present.
+        """
+        counts = [0] * len(HISTOGRAM_BOUNDS)
+        for frame in self.frames:
+            ms = sum(frame) * 1000
+            for i, bound in enumerate(HISTOGRAM_BOUNDS):
+                if ms < bound:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def fps(self) -> float:
+        recent = list(self.intervals)[-self.window:]
+        return len(recent) / sum(recent) if recent and sum(recent) > 0 else 0.0
+
+    def averages(self) -> tuple[float, float, float]:
+        """
+        Average update, render and present times in ms over the last window of frames.
+        """
+        recent = list(self.frames)[-self.window:]
+        if not recent:
+            return 0.0, 0.0, 0.0
+        return tuple(sum(frame[i] for frame in recent) * 1000 / len(recent) for i in range(3))
+
+    def render(self, surface: pygame.Surface):
+        font = self.game.font_small
+        line_h = font.get_linesize()
+        pad = 6
+        update, render, present = self.averages()
+        lines = [f"FPS {self.fps():.1f}   frame {update + render + present:.2f} ms",
+                 f"update {update:.2f}  render {render:.2f}  present {present:.2f} ms"]
+        hist_h = 40
+        slow_lines = [f"{phase[:3]} {name}  {subtree:.2f} ({alone:.2f}) ms"
+                      for phase, name, subtree, alone in self.slowest]
+        # Always as tall as with SLOWEST_SHOWN widgets, so that the area invalidated in end_frame covers it
+        height = pad * 3 + line_h * (len(lines) + 2 + SLOWEST_SHOWN) + hist_h
+        self.rect.update(self.game.GAME_W - self.rect.w - pad, pad, self.rect.w, height)
+        Draw.draw_rect_alpha(surface, (0, 0, 0, 230), self.rect, corner_radius=0)
+        x, y = self.rect.x + pad, self.rect.y + pad
+        for line in lines:
+            surface.blit(render_text(font, line, (255, 255, 255)), (x, y))
+            y += line_h
+
+        # Histogram, a bar per bucket of HISTOGRAM_BOUNDS with its label below
+        counts = self.histogram()
+        bar_w = (self.rect.w - 2 * pad) // len(counts)
+        y += pad
+        most = max(counts) or 1
+        for i, (count, bound) in enumerate(zip(counts, HISTOGRAM_BOUNDS)):
+            bar_h = round(hist_h * count / most)
+            color = (90, 200, 90) if bound <= 16 else (220, 180, 60) if bound <= 33 else (220, 80, 60)
+            surface.fill(color, (x + i * bar_w + 1, y + hist_h - bar_h, bar_w - 2, bar_h))
+            label = f"<{bound}" if bound != float("inf") else f">{HISTOGRAM_BOUNDS[-2]}"
+            surface.blit(render_text(font, label, (180, 180, 180)), (x + i * bar_w + 2, y + hist_h))
+        y += hist_h + line_h + pad
+
+        surface.blit(render_text(font, "slowest subtrees (self)", (255, 255, 255)), (x, y))
+        y += line_h
+        for line in slow_lines:
+            surface.blit(render_text(font, line, (220, 220, 220)), (x, y))
+            y += line_h
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import time
+
+
+class ScheduledCall:
+    """
+    Handle of a callback in a Scheduler, returned by call_later and call_every.
+    """
+    __slots__ = ("deadline", "interval", "remaining", "callback", "args", "cancelled")
+
+    def __init__(self, deadline: float, interval: float | None, remaining: int, callback, args):
+        self.deadline = deadline
+        self.interval = interval
+        self.remaining = remaining  # Calls left of a repeating callback, -1 for no limit
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled
+
+    def __repr__(self):
+        return f"ScheduledCall(deadline={self.deadline}, interval={self.interval}, callback={self.callback})"
+
+
+class Scheduler:
+    """
+    Callbacks due at a given time, kept in a heap ordered by deadline: the game loop calls run_due once per frame,
+    which looks only at the first deadline unless something is due, and sleeps until next_deadline when idle.
+    Cancelled calls stay in the heap until they reach its top.
+    """
+    def __init__(self, clock=time.monotonic):
+        """
+        :param clock: function returning the current time in seconds
+        """
+        self.clock = clock
+        self._heap: list[tuple[float, int, ScheduledCall]] = []
+        self._counter = itertools.count()  # Keeps the calls with the same deadline in order
+
+    def __len__(self):
+        return sum(1 for _, _, call in self._heap if not call.cancelled)
+
+    def call_later(self, delay: float, callback, *args) -> ScheduledCall:
+        """
+        Calls callback(*args) once, after delay seconds.
+        :return: the handle, for cancel
+        """
+        call = ScheduledCall(self.clock() + delay, None, 1, callback, args)
+        self._push(call)
+        return call
+
+    def call_every(self, interval: float, callback, *args, times: int = -1) -> ScheduledCall:
+        """
+        Calls callback(*args) every interval seconds, the first time after interval seconds.
+        :param times: how many times to call it, -1 until cancelled
+        :return: the handle, for cancel
+        """
+        call = ScheduledCall(self.clock() + interval, interval, times, callback, args)
+        if times != 0:
+            self._push(call)
+        else:
+            call.cancelled = True
+        return call
+
+    def cancel(self, call: ScheduledCall | None):
+        if call is not None:
+            call.cancelled = True
+
+    def _push(self, call: ScheduledCall):
+        heapq.heappush(self._heap, (call.deadline, next(self._counter), call))
+
+    def next_deadline(self) -> float | None:
+        """
+        Returns the time (on self.clock) of the first call that is due, None if there is none.
+        """
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self, now: float | None = None) -> int:
+        """
+        Runs the callbacks that are due. A repeating callback that fell behind (e.g. while the window was
+        dragged) runs once and is rescheduled from now, it doesn't catch up on the missed calls.
+        :param now: the current time, by default self.clock()
+        :return: the number of callbacks run
+        """
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        if not heap or heap[0][0] > now:
+            return 0
+        ran = 0
+        # Calls scheduled by the callbacks themselves wait for the next frame, even with a delay of 0
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap)[2])
+        for call in due:
+            if call.cancelled:
+                continue
+            if call.remaining > 0:
+                call.remaining -= 1
+            if call.interval is None or call.remaining == 0:
+                call.cancelled = True
+            else:
+                call.deadline += call.interval
+                if call.deadline <= now:
+                    call.deadline = now + call.interval
+                self._push(call)
+            call.callback(*call.args)
+            ran += 1
+        return ran
+
+    def clear(self):
+        for _, _, call in self._heap:
+            call.cancelled = True
+        self._heap.clear()
+
+
+# The scheduler of the game loop (see Game.game_loop), Timer and SpacedCallback schedule their callbacks here
+scheduler = Scheduler()
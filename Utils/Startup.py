@@ -0,0 +1,58 @@
+import time
+
+
+class StartupTimer:
+    """
+    Time spent in the phases of the startup, up to the first frame the user can interact with.
+    A phase lasts from the end of the previous one to the call of mark(phase); the whole report is printed
+    once, after the frame requested with finish_after_frame is on screen.
+    The imports are a single phase here, `python -X importtime main.py` breaks them down by module.
+    """
+    def __init__(self, start: float | None = None):
+        """
+        :param start: time.perf_counter() at which the startup began, e.g. before the imports of main.py
+        """
+        self.start = start if start is not None else time.perf_counter()
+        self._last = self.start
+        self.phases: list[tuple[str, float]] = []
+        self.finished = False
+        self._frame_phase: str | None = None
+
+    def mark(self, phase: str):
+        """
+        Ends a phase, after the startup is finished it does nothing.
+        :param phase: name of the phase that just ended
+        :return: None
+        """
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def finish_after_frame(self, phase: str = "first frame"):
+        """
+        The next presented frame ends the startup (see on_frame).
+        :return: None
+        """
+        if not self.finished:
+            self._frame_phase = phase
+
+    def on_frame(self):
+        """
+        Called by Game.render after a frame is presented.
+        :return: None
+        """
+        if self._frame_phase is not None:
+            self.mark(self._frame_phase)
+            self._frame_phase = None
+            self.finished = True
+            print(self.report())
+
+    @property
+    def total(self) -> float:
+        return self._last - self.start
+
+    def report(self) -> str:
+        phases = ", ".join(f"{phase} {duration * 1000:.0f} ms" for phase, duration in self.phases)
+        return f"Startup {self.total * 1000:.0f} ms: {phases}"
@@ -1,6 +1,132 @@
+import functools
+from collections import OrderedDict, namedtuple
+
 import pygame.font
 from pygame import draw
 
+TextCacheInfo = namedtuple("TextCacheInfo", ["hits", "misses", "maxbytes", "currbytes", "currsize"])
+
+# Rendered text, (font, text, color, antialias) -> surface, evicted LRU when the budget is exceeded
+_text_cache: OrderedDict = OrderedDict()
+_text_cache_maxbytes = 8 * 1024 * 1024
+_text_cache_bytes = 0
+_text_cache_hits = 0
+_text_cache_misses = 0
+# Advance (width in pixels) of single characters, (font, char) -> int
+_advance_cache: dict = {}
+
+
+def render_text(font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+    """
+    Same as font.render, but the surfaces are cached and shared until the memory budget runs out.
+    The returned surface must not be modified.
+    :param font: The font used.
+    :param text: The text.
+    :param color: The color
+    :param antialias: Whether to use antialiasing
+    :return: The rendered text
+    """
+    global _text_cache_bytes, _text_cache_hits, _text_cache_misses
+    key = (font, text, color if isinstance(color, (tuple, str)) else tuple(color), antialias)
+    text_surface = _text_cache.get(key)
+    if text_surface is not None:
+        _text_cache_hits += 1
+        _text_cache.move_to_end(key)
+        return text_surface
+    _text_cache_misses += 1
+    text_surface = font.render(text, antialias, color)
+    _text_cache[key] = text_surface
+    _text_cache_bytes += _surface_bytes(text_surface)
+    while _text_cache_bytes > _text_cache_maxbytes and len(_text_cache) > 1:
+        _, evicted = _text_cache.popitem(last=False)
+        _text_cache_bytes -= _surface_bytes(evicted)
+    return text_surface
+
+
+def glyph_advance(font: pygame.font.Font, char: str) -> int:
+    """
+    Width of a single character, measured once per font.
+    """
+    key = (font, char)
+    advance = _advance_cache.get(key)
+    if advance is None:
+        advance = _advance_cache[key] = font.size(char)[0]
+    return advance
+
+
+@functools.lru_cache(maxsize=1024)
+def text_width(font: pygame.font.Font, text: str) -> int:
+    """
+    Width of text as render_text draws it: with the kerning between the characters, which a sum of
+    glyph_advance leaves out, so it drifts from the rendered text as the text gets longer.
+    """
+    return font.size(text)[0]
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def text_cache_info() -> TextCacheInfo:
+    """
+    Statistics of the cache used by render_text.
+    :return: TextCacheInfo(hits, misses, maxbytes, currbytes, currsize)
+    """
+    return TextCacheInfo(_text_cache_hits, _text_cache_misses, _text_cache_maxbytes, _text_cache_bytes,
+                         len(_text_cache))
+
+
+def set_text_cache_budget(maxbytes: int):
+    """
+    Changes the memory budget of the text cache, evicting the least recently used surfaces if needed.
+    :param maxbytes: maximum size in bytes of the cached surfaces
+    :return: None
+    """
+    global _text_cache_maxbytes, _text_cache_bytes
+    _text_cache_maxbytes = maxbytes
+    while _text_cache_bytes > _text_cache_maxbytes and _text_cache:
+        _, evicted = _text_cache.popitem(last=False)
+        _text_cache_bytes -= _surface_bytes(evicted)
+
+
+def clear_text_cache():
+    """
+    Empties the text cache and resets its counters.
+    :return: None
+    """
+    global _text_cache_bytes, _text_cache_hits, _text_cache_misses
+    _text_cache.clear()
+    _advance_cache.clear()
+    text_width.cache_clear()
+    _text_cache_bytes = _text_cache_hits = _text_cache_misses = 0
+
+
+class CachedText:
+    """
+    Rendered text held by a widget. The surface is rendered on first use and then reused
+    until invalidate() is called, which widgets do when their text, fg_color or font change.
+    """
+    def __init__(self):
+        self.surface: pygame.Surface | None = None
+
+    def invalidate(self):
+        self.surface = None
+
+    def get(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        if self.surface is None:
+            self.surface = render_text(font, str(text), color, antialias)
+        return self.surface
+
+    def draw_centered(self, font: pygame.font.Font, surface: pygame.Surface, text: str,
+                      color: tuple, rect: pygame.Rect):
+        """
+        Same as draw_centered_text, reusing the surface held by this object.
+        """
+        text_surface = self.get(font, text, color)
+        text_rect = text_surface.get_rect()
+        text_rect.center = rect.center
+        surface.blit(text_surface, text_rect)
+
 
 def draw_text(font: pygame.font.Font, surface: pygame.Surface, text: str,
               color: tuple, x: int, y: int):
@@ -14,7 +140,7 @@ def draw_text(font: pygame.font.Font, surface: pygame.Surface, text: str,
     :param y: Y of the center of the rectangle containing the text
     :return:
     """
-    text_surface = font.render(str(text), True, color)
+    text_surface = render_text(font, str(text), color)
     text_rect = text_surface.get_rect()
     text_rect.topleft = (x, y)
     surface.blit(text_surface, text_rect)
@@ -31,7 +157,7 @@ def draw_centered_text(font: pygame.font.Font, surface: pygame.Surface, text: st
     :param rect: The rect
     :return:
     """
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(font, text, color)
     text_rect = text_surface.get_rect()
     text_rect.center = rect.center
     surface.blit(text_surface, text_rect)
@@ -1,17 +1,30 @@
-from functools import partial
-import time
+from Utils.Scheduler import scheduler
+
+
+def next_deadline() -> float | None:
+    """
+    Returns the time (on scheduler.clock) at which the first running Timer or SpacedCallback is due.
+
+    Returns:
+        float | None: The earliest deadline, None if nothing is running.
+    """
+    return scheduler.next_deadline()
+
 
 class Timer:
+    """
+    Calls a callback once, after the duration it is started with. The countdown is kept by the scheduler
+    (see Utils/Scheduler.py), which the game loop runs every frame: the timer itself doesn't need to be updated.
+    """
     def __init__(self):
         """
         Initializes the Timer with default values.
         """
         self.desired_duration = -1
         self.started = False
-        self.start_time = time.time()
         self.finished = False
         self.callback = lambda: None
-        self._has_already_executed_callback = False
+        self._call = None
 
     def set_callback(self, callback):
         """
@@ -30,24 +43,18 @@ class Timer:
             duration (float): The duration for the timer in seconds.
         """
         if not self.started:
-            # print(f"Timer started with duration: {duration}")
             self.started = True
             self.desired_duration = duration
             self.finished = False
-            self.start_time = time.time()
+            self._call = scheduler.call_later(duration, self.on_finish)
 
     def update(self, dt: float):
         """
-        Updates the timer status.
+        Kept for compatibility: the scheduler finishes the timer.
 
         Args:
             dt (float): The delta time since the last update.
         """
-        if time.time() - self.start_time >= self.desired_duration:
-            self.finished = True
-            if not self._has_already_executed_callback:
-                self.on_finish()
-                self._has_already_executed_callback = True
 
     def stop(self):
         """
@@ -55,16 +62,25 @@ class Timer:
         """
         self.finished = True
         self.started = False
+        scheduler.cancel(self._call)
+        self._call = None
 
-    def on_finish(self):
+    def deadline(self) -> float | None:
         """
-        Executes a callback function when the timer finishes.
+        Returns the time at which the timer finishes.
 
-        Args:
-            callback (function): The callback function to execute.
+        Returns:
+            float | None: start time + duration (on scheduler.clock), None if the timer is not running.
+        """
+        return self._call.deadline if self._call is not None and self._call.active else None
+
+    def on_finish(self):
+        """
+        Called by the scheduler when the timer finishes, executes the callback.
         """
-        if self.finished:
-            self.callback()
+        self.finished = True
+        self._call = None
+        self.callback()
 
     def __repr__(self) -> str:
         """
@@ -76,6 +92,10 @@ class Timer:
         return f"[ desired_duration: {self.desired_duration} ]"
 
 class SpacedCallback:
+    """
+    Calls a callback every interval seconds, a given number of times or until stopped.
+    Like Timer it is a handle onto the scheduler and doesn't need to be updated.
+    """
     def __init__(self, callback, interval: float, how_many_times: int = -1, *args, **kwargs):
         """
         Initializes the SpacedCallback with the specified parameters.
@@ -85,43 +105,54 @@ class SpacedCallback:
             interval (float): The interval between each callback execution in seconds.
             how_many_times (int): The number of times to execute the callback.
         """
-        # self.callback = partial(callback, args, kwargs)
         self.callback = callback
         self.interval = interval
         self.how_many_times = how_many_times
-        self.last_time = time.time()
         self.executed_times = 0
         self.is_running = False
+        self._call = None
 
     def start(self):
         """
         Starts the SpacedCallback.
         """
-        self.last_time = time.time()
+        scheduler.cancel(self._call)
         self.is_running = True
+        times = -1 if self.how_many_times == -1 else max(0, self.how_many_times - self.executed_times)
+        self._call = scheduler.call_every(self.interval, self._execute, times=times)
+        if times == 0:
+            self.stop()
+
+    def _execute(self):
+        self.executed_times += 1
+        if self.how_many_times != -1 and self.executed_times >= self.how_many_times:
+            self.stop()
+        self.callback()
 
     def update(self, dt: float):
         """
-        Updates the SpacedCallback status and executes the callback if the interval has passed.
+        Kept for compatibility: the scheduler executes the callback.
 
         Args:
             dt (float): The delta time since the last update.
         """
-        if not self.is_running:
-            return
-        if time.time() - self.last_time >= self.interval:
-            if self.how_many_times == -1 or self.executed_times < self.how_many_times:
-                self.callback()
-                self.last_time = time.time()
-                self.executed_times += 1
-        if self.how_many_times != -1 and self.executed_times >= self.how_many_times:
-            self.stop()
 
     def stop(self):
         """
         Stops the SpacedCallback.
         """
         self.is_running = False
+        scheduler.cancel(self._call)
+        self._call = None
+
+    def deadline(self) -> float | None:
+        """
+        Returns the time at which the callback is executed next.
+
+        Returns:
+            float | None: last execution time + interval (on scheduler.clock), None if not running.
+        """
+        return self._call.deadline if self._call is not None and self._call.active else None
 
     def __repr__(self) -> str:
         """
@@ -133,6 +164,8 @@ class SpacedCallback:
         return f"[ interval: {self.interval}, how_many_times: {self.how_many_times} ]"
 
 if __name__ == "__main__":
+    import time
+
     t = Timer()
     x = 0
     def callback():
@@ -142,6 +175,7 @@ if __name__ == "__main__":
     sc = SpacedCallback(callback, 0.5)
     sc.start()
     t.start(5)
-    while True:
-        t.update(0.1)
-        sc.update(0.1)
\ No newline at end of file
+    t.set_callback(sc.stop)
+    while t.started and not t.finished:
+        scheduler.run_due()
+        time.sleep(0.1)
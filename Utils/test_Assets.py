@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from Utils.Assets import AssetManager
+
+
+class AssetManagerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        cls.assets_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(cls.assets_dir, "ui"))
+        image = pygame.Surface((10, 20), pygame.SRCALPHA)
+        image.fill((255, 0, 0, 128))
+        pygame.image.save(image, os.path.join(cls.assets_dir, "ui", "red.png"))
+
+    def setUp(self):
+        self.assets = AssetManager(self.assets_dir)
+
+    def test_image_is_loaded_once(self):
+        first = self.assets.image("ui/red.png")
+        self.assertIs(self.assets.image("ui\\red.png"), first)
+        self.assertEqual(self.assets.info()[:2], (1, 1))
+        self.assertEqual(first.get_at((0, 0)), (255, 0, 0, 128))
+
+    def test_scaled_variants_are_cached_by_size(self):
+        small = self.assets.image("ui/red.png", (5, 10))
+        self.assertEqual(small.get_size(), (5, 10))
+        self.assertIs(self.assets.image("ui/red.png", (5, 10)), small)
+        self.assertEqual(self.assets.image("ui/red.png", (2, 2)).get_size(), (2, 2))
+        # The original, the two sizes
+        self.assertEqual(self.assets.info().currsize, 3)
+
+    def test_recolored_variants_are_cached_by_palette(self):
+        blue = self.assets.image("ui/red.png", palette={(255, 0, 0): (0, 0, 255)})
+        self.assertEqual(blue.get_at((0, 0)), (0, 0, 255, 128))
+        self.assertIs(self.assets.image("ui/red.png", palette={"red": "blue"}), blue)
+        small = self.assets.image("ui/red.png", (5, 10), palette={(255, 0, 0): (0, 0, 255)})
+        self.assertEqual(small.get_at((0, 0)), (0, 0, 255, 128))
+        self.assertEqual(self.assets.image("ui/red.png").get_at((0, 0)), (255, 0, 0, 128))
+        # The original, the recoloured one and its scaled variant
+        self.assertEqual(self.assets.info().currsize, 3)
+
+    def test_budget(self):
+        self.assets.set_budget(10 * 20 * 4)
+        self.assets.image("ui/red.png")
+        self.assets.image("ui/red.png", (10, 10))
+        info = self.assets.info()
+        self.assertLessEqual(info.currbytes, info.maxbytes)
+        self.assertEqual(info.currsize, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from Generic.Stack import Stack
+from Utils.Capture import ProfileCapture
+
+
+class AppState:
+    pass
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class ProfileCaptureTest(unittest.TestCase):
+    def test_capture_ends_after_its_frames(self):
+        with tempfile.TemporaryDirectory() as work:
+            state_stack = Stack()
+            state_stack.push(AppState())
+            game = SimpleNamespace(state_stack=state_stack, db_path=os.path.join(work, "celle.db"))
+            capture = ProfileCapture(game, frames=3, seconds=None)
+            capture.start()
+            for _ in range(3):
+                self.assertTrue(capture.active)
+                busy(0.02)
+                capture.on_frame()
+            self.assertFalse(capture.active)
+
+            names = sorted(os.listdir(work))
+            self.assertEqual(len(names), 2)
+            self.assertTrue(names[0].startswith("profile-") and names[0].endswith("-AppState.folded"))
+            self.assertTrue(names[1].endswith("-AppState.pstats"))
+            stats = pstats.Stats(os.path.join(work, names[1]))
+            self.assertTrue(any(name == "busy" for _, _, name in stats.stats))
+            with open(os.path.join(work, names[0])) as file:
+                lines = file.read().splitlines()
+            self.assertTrue(any("busy (test_Capture.py" in line for line in lines))
+            self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+    def test_stop_without_capture(self):
+        capture = ProfileCapture(SimpleNamespace(state_stack=Stack(), db_path="celle.db"))
+        self.assertIsNone(capture.stop())
+
+
+if __name__ == "__main__":
+    unittest.main()
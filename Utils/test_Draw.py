@@ -0,0 +1,46 @@
+import unittest
+
+import pygame
+
+from Utils import Draw
+
+
+class DrawRectAlphaTest(unittest.TestCase):
+    def setUp(self):
+        Draw.clear_shape_cache()
+        self.surface = pygame.Surface((100, 100))
+
+    def test_opaque_square_rect_is_filled(self):
+        Draw.draw_rect_alpha(self.surface, (10, 20, 30), (10, 10, 20, 20), corner_radius=0)
+        self.assertEqual(self.surface.get_at((15, 15))[:3], (10, 20, 30))
+        self.assertEqual(Draw.shape_cache_info().currsize, 0)
+
+    def test_transparent_rect_draws_nothing(self):
+        Draw.draw_rect_alpha(self.surface, (255, 255, 255, 0), (0, 0, 50, 50))
+        self.assertEqual(self.surface.get_at((10, 10))[:3], (0, 0, 0))
+        self.assertEqual(Draw.shape_cache_info().misses, 0)
+
+    def test_translucent_rect_is_cached(self):
+        Draw.draw_rect_alpha(self.surface, (255, 255, 255, 128), (0, 0, 50, 50))
+        Draw.draw_rect_alpha(self.surface, (255, 255, 255, 128), (40, 40, 50, 50))
+        info = Draw.shape_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertEqual(self.surface.get_at((45, 45))[:3], (192, 192, 192))
+
+    def test_cache_is_bounded(self):
+        Draw.set_shape_cache_size(2)
+        try:
+            for width in range(1, 5):
+                Draw.draw_rect_alpha(self.surface, (255, 0, 0, 100), (0, 0, width * 10, 10))
+            self.assertEqual(Draw.shape_cache_info().currsize, 2)
+        finally:
+            Draw.set_shape_cache_size(256)
+
+    def test_normalize_color(self):
+        self.assertEqual(Draw.normalize_color((10, 20, 30)), (10, 20, 30, 255))
+        self.assertEqual(Draw.normalize_color((10.0, 20, 30, 0)), (10, 20, 30, 0))
+        self.assertEqual(Draw.normalize_color("white"), (255, 255, 255, 255))
+
+
+if __name__ == '__main__':
+    unittest.main()
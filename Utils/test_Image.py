@@ -0,0 +1,46 @@
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from Utils.Image import recolor, tint
+
+
+def strip(*colors):
+    surface = pygame.Surface((len(colors), 1), pygame.SRCALPHA)
+    for x, color in enumerate(colors):
+        surface.set_at((x, 0), color)
+    return surface
+
+
+def pixels(surface):
+    return [tuple(surface.get_at((x, 0))) for x in range(surface.get_width())]
+
+
+class RecolorTest(unittest.TestCase):
+    def test_exact_colors_keep_alpha(self):
+        image = strip((0, 0, 0, 255), (0, 0, 0, 100), (10, 10, 10, 255), (255, 255, 255, 50))
+        result = recolor(image, {(0, 0, 0): (255, 0, 0)})
+        self.assertEqual(pixels(result), [(255, 0, 0, 255), (255, 0, 0, 100), (10, 10, 10, 255), (255, 255, 255, 50)])
+        # The original is untouched
+        self.assertEqual(image.get_at((0, 0)), (0, 0, 0, 255))
+
+    def test_tolerance(self):
+        image = strip((0, 0, 0, 255), (10, 10, 10, 255), (200, 200, 200, 255))
+        result = recolor(image, {(0, 0, 0): (255, 255, 255)}, tolerance=0.1)
+        self.assertEqual(pixels(result), [(255, 255, 255, 255), (255, 255, 255, 255), (200, 200, 200, 255)])
+
+    def test_several_colors(self):
+        image = strip((255, 0, 0, 255), (0, 0, 255, 255))
+        result = recolor(image, {(255, 0, 0): (0, 255, 0), (0, 0, 255): (255, 255, 0)})
+        self.assertEqual(pixels(result), [(0, 255, 0, 255), (255, 255, 0, 255)])
+
+    def test_tint(self):
+        image = strip((255, 255, 255, 255), (255, 255, 255, 64))
+        self.assertEqual(pixels(tint(image, (255, 101, 0))), [(255, 101, 0, 255), (255, 101, 0, 64)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from Utils.Metrics import InstrumentedConnection, JsonlExporter, MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_counter_restarts_every_interval(self):
+        registry = MetricsRegistry()
+        registry.counter("queries").inc()
+        registry.counter("queries").inc(2)
+        self.assertEqual(registry.collect()["counters"], {"queries": 3})
+        self.assertEqual(registry.collect()["counters"], {"queries": 0})
+
+    def test_histogram(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("frame ms", bounds=(1, 10, 100))
+        for value in (0.5, 5, 5, 5, 50, 500):
+            histogram.observe(value)
+        collected = registry.collect()["histograms"]["frame ms"]
+        self.assertEqual(collected["count"], 6)
+        self.assertEqual(collected["max"], 500)
+        self.assertEqual(collected["buckets"], {"1": 1, "10": 3, "100": 1, "inf": 1})
+        self.assertEqual(collected["p50"], 10)
+        self.assertEqual(collected["p99"], 500)
+        self.assertIsNone(registry.collect()["histograms"]["frame ms"]["p50"])
+
+
+class InstrumentedCursorTest(unittest.TestCase):
+    def test_statement_latency(self):
+        registry = MetricsRegistry()
+        con = InstrumentedConnection(sqlite3.connect(":memory:"), registry)
+        cur = con.cursor()
+        cur.execute("CREATE TABLE freezers (id INTEGER PRIMARY KEY, nome TEXT)")
+        cur.execute("INSERT INTO freezers (nome) VALUES (?)", ("Freezer 1",))
+        con.commit()
+        cur.execute("SELECT *\n    FROM freezers")
+        self.assertEqual(cur.fetchall(), [(1, "Freezer 1")])
+        self.assertEqual(cur.lastrowid, 1)
+        histograms = registry.collect()["histograms"]
+        self.assertEqual(histograms["sql SELECT * FROM freezers"]["count"], 1)
+        self.assertEqual(histograms["sql COMMIT"]["count"], 1)
+        con.close()
+
+
+class JsonlExporterTest(unittest.TestCase):
+    def test_rotation(self):
+        registry = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as work:
+            path = os.path.join(work, "metrics.jsonl")
+            exporter = JsonlExporter(registry, path, max_bytes=300, backups=2)
+            for i in range(10):
+                registry.counter("frames").inc(i)
+                exporter.write()
+            self.assertEqual(sorted(os.listdir(work)), ["metrics.jsonl", "metrics.jsonl.1", "metrics.jsonl.2"])
+            with open(path) as file:
+                records = [json.loads(line) for line in file]
+            self.assertEqual(records[-1]["counters"], {"frames": 9})
+            self.assertLessEqual(os.path.getsize(path), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
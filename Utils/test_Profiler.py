@@ -0,0 +1,104 @@
+import unittest
+from types import SimpleNamespace
+
+import pygame
+
+from Generic.Stack import Stack
+from UI.Abstract import UICanvas, UIContainer
+from UI.Button import TextButton
+from Utils.Compositor import Compositor
+from Utils.Profiler import FrameProfiler
+
+
+class Ticks:
+    """
+    Clock that advances by a second every time it is read.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class FakeGame:
+    """
+    The parts of Game the profiler and the widgets use.
+    """
+    GAME_W = 640
+    font_medium = None
+
+    def __init__(self):
+        pygame.font.init()
+        self.font_small = pygame.font.Font(None, 12)
+        self.render_stack = {"foreground": [], "above_all": []}
+        self.compositor = Compositor((640, 480), self.render_stack)
+        self.state_stack = Stack()
+        self.state_stack.push(SimpleNamespace(canvas=UICanvas(self)))
+
+    def invalidate(self, rect=None, layer=None):
+        pass
+
+    def add_to_layer(self, render_function, layer):
+        self.render_stack[layer].append(render_function)
+
+    def remove_from_layer(self, render_function, layer):
+        self.render_stack[layer].remove(render_function)
+
+    def update(self):
+        pass
+
+    def present(self, rects):
+        pass
+
+
+class FrameProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.canvas = self.game.state_stack.top().canvas
+        self.profiler = FrameProfiler(self.game)
+
+    def tearDown(self):
+        self.profiler.disable()
+
+    def test_disable_restores_the_methods(self):
+        originals = {(cls, name): cls.__dict__[name]
+                     for cls in (UICanvas, UIContainer, TextButton) for name in ("update", "render")
+                     if name in cls.__dict__}
+        self.profiler.enable()
+        self.assertIsNot(UIContainer.__dict__["render"], originals[(UIContainer, "render")])
+        self.assertIn("update", self.game.__dict__)
+        self.profiler.disable()
+        for (cls, name), method in originals.items():
+            self.assertIs(cls.__dict__[name], method)
+        self.assertNotIn("update", self.game.__dict__)
+        self.assertNotIn("present", self.game.__dict__)
+        self.assertNotIn("compose", self.game.compositor.__dict__)
+        self.assertEqual(self.game.render_stack["above_all"], [])
+
+    def test_subtree_and_own_time(self):
+        panel = UIContainer(self.canvas, 0, 0, width=100, height=100, corner_radius=0)
+        UIContainer(panel, 10, 10, width=20, height=20, corner_radius=0)
+        self.profiler.clock = Ticks()
+        self.profiler.enable()
+        panel.render(pygame.Surface((100, 100)))
+        self.profiler._window_frames = 1
+        (phase, name, subtree, alone), (_, _, child_subtree, child_alone) = self.profiler.slowest_subtrees()
+        self.assertEqual((phase, name), ("render", "UIContainer"))
+        # Panel: clock read at 1 and 4, child: at 2 and 3
+        self.assertEqual((subtree, alone), (3000, 2000))
+        self.assertEqual((child_subtree, child_alone), (1000, 1000))
+
+    def test_frames(self):
+        self.profiler.enable()
+        for _ in range(3):
+            self.game.update()
+            self.game.present(self.game.compositor.compose(pygame.Surface((640, 480))))
+        self.assertEqual(len(self.profiler.frames), 3)
+        self.assertEqual(len(self.profiler.intervals), 2)
+        self.assertEqual(sum(self.profiler.histogram()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
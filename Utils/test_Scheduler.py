@@ -0,0 +1,62 @@
+import unittest
+
+from Utils.Scheduler import Scheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.scheduler = Scheduler(self.clock)
+        self.calls = []
+
+    def test_call_later(self):
+        self.scheduler.call_later(1.0, self.calls.append, "b")
+        self.scheduler.call_later(0.5, self.calls.append, "a")
+        self.assertEqual(self.scheduler.next_deadline(), 0.5)
+        self.assertEqual(self.scheduler.run_due(0.4), 0)
+        self.assertEqual(self.scheduler.run_due(1.0), 2)
+        self.assertEqual(self.calls, ["a", "b"])
+        self.assertIsNone(self.scheduler.next_deadline())
+
+    def test_call_every(self):
+        call = self.scheduler.call_every(0.5, self.calls.append, "tick", times=3)
+        for now in (0.5, 1.0, 1.5, 2.0):
+            self.scheduler.run_due(now)
+        self.assertEqual(self.calls, ["tick"] * 3)
+        self.assertFalse(call.active)
+
+    def test_late_repeating_call_does_not_catch_up(self):
+        self.scheduler.call_every(0.5, self.calls.append, "tick")
+        self.assertEqual(self.scheduler.run_due(10.2), 1)
+        self.assertAlmostEqual(self.scheduler.next_deadline(), 10.7)
+
+    def test_cancel(self):
+        first = self.scheduler.call_later(0.5, self.calls.append, "a")
+        self.scheduler.call_every(1.0, self.calls.append, "b")
+        self.scheduler.cancel(first)
+        self.assertEqual(self.scheduler.next_deadline(), 1.0)
+        self.assertEqual(len(self.scheduler), 1)
+        self.scheduler.run_due(1.0)
+        self.assertEqual(self.calls, ["b"])
+
+    def test_callbacks_can_reschedule(self):
+        def again():
+            self.calls.append(self.clock())
+            self.scheduler.call_later(0, again)
+        self.scheduler.call_later(0, again)
+        self.assertEqual(self.scheduler.run_due(), 1)
+        self.clock.now = 1.0
+        self.assertEqual(self.scheduler.run_due(), 1)
+        self.assertEqual(self.calls, [0.0, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import pygame
+
+from Utils import Text
+
+
+class RenderTextTest(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 24)
+        self.budget = Text.text_cache_info().maxbytes
+        Text.clear_text_cache()
+
+    def tearDown(self):
+        Text.set_text_cache_budget(self.budget)
+        Text.clear_text_cache()
+
+    def test_hits_and_misses(self):
+        first = Text.render_text(self.font, "cella", (255, 255, 255))
+        self.assertIs(Text.render_text(self.font, "cella", (255, 255, 255)), first)
+        # A list is the same color as the tuple
+        self.assertIs(Text.render_text(self.font, "cella", [255, 255, 255]), first)
+        info = Text.text_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+        self.assertEqual(info.currbytes, first.get_width() * first.get_height() * first.get_bytesize())
+
+    def test_color_and_antialias_are_part_of_the_key(self):
+        white = Text.render_text(self.font, "cella", (255, 255, 255))
+        red = Text.render_text(self.font, "cella", (255, 0, 0))
+        aliased = Text.render_text(self.font, "cella", (255, 255, 255), antialias=False)
+        self.assertEqual(len({id(white), id(red), id(aliased)}), 3)
+        self.assertEqual(Text.text_cache_info()[:2], (0, 3))
+
+    def test_eviction_at_the_byte_budget(self):
+        surfaces = [Text.render_text(self.font, f"scatola {i}", (255, 255, 255)) for i in range(3)]
+        size = max(Text._surface_bytes(surface) for surface in surfaces)
+        Text.set_text_cache_budget(2 * size)
+        info = Text.text_cache_info()
+        self.assertEqual(info.currsize, 2)
+        self.assertLessEqual(info.currbytes, 2 * size)
+        # The oldest was evicted and is rendered again, the others are still there
+        Text.render_text(self.font, "scatola 2", (255, 255, 255))
+        Text.render_text(self.font, "scatola 0", (255, 255, 255))
+        self.assertEqual(Text.text_cache_info()[:2], (1, 4))
+        self.assertLessEqual(Text.text_cache_info().currbytes, 2 * size)
+
+    def test_a_surface_bigger_than_the_budget_is_kept_alone(self):
+        Text.set_text_cache_budget(1)
+        Text.render_text(self.font, "a", (255, 255, 255))
+        Text.render_text(self.font, "freezer", (255, 255, 255))
+        self.assertEqual(Text.text_cache_info().currsize, 1)
+
+
+class CachedTextTest(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 24)
+        Text.clear_text_cache()
+
+    def test_surface_is_kept_until_invalidated(self):
+        cached = Text.CachedText()
+        surface = cached.get(self.font, "cella", (255, 255, 255))
+        # The text isn't looked at again until invalidate
+        self.assertIs(cached.get(self.font, "altro", (255, 255, 255)), surface)
+        cached.invalidate()
+        self.assertIsNot(cached.get(self.font, "altro", (255, 255, 255)), surface)
+        self.assertIs(cached.get(self.font, "altro", (255, 255, 255)),
+                      Text.render_text(self.font, "altro", (255, 255, 255)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,19 @@
+import time
+
+_start = time.perf_counter()
+
+from Utils.Startup import StartupTimer
 from Game import Game
 from States.AppState import AppState
+from States.SplashState import SplashState
 
-g: Game = Game()
-g.load_state(AppState(g))
-g.game_loop()
\ No newline at end of file
+startup = StartupTimer(_start)
+startup.mark("imports")
+g: Game = Game(startup=startup)
+g.dirty_rendering = True
+g.adaptive_fps = True
+# Frame times, query latencies and counts, a line per minute in metrics.jsonl (see Utils/Metrics.py)
+g.enable_metrics(interval=60)
+# AppState (database and UI) is built after the splash is on screen
+g.load_state(SplashState(g, AppState))
+g.game_loop()
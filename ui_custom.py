@@ -138,17 +138,16 @@ class CellInputInterface:
     def render(self, surf):
         if self.canvas.visible:
             p.draw.rect(surf, DARK, self.rect, width=2)
-            self.hc.render(surf)
-            self.button_container.render(surf)
+            self.canvas.render(surf)
 
     def update(self, dt):
-        if self.canvas.visible:
-            self.hc.update(dt)
-            self.button_container.update(dt)
+        self.canvas.update(dt)
 
     def toggle_visibility(self):
         self.canvas.toggle_visibility()
         self.visible = self.canvas.visible
+        # A closed interface doesn't need the wheel events of its paragraph
+        self.canvas.set_input_attached(self.visible)
 
     def reset(self):
         self.nome_entry.text = ""
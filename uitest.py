@@ -1,5 +1,3 @@
-import os.path
-
 import pygame.draw
 
 from Game import Game
@@ -31,7 +29,7 @@ class UITester:
         self.game = game
         state = TestState(self.game)
         state.canvas = elements
-        self.game.state_stack.push(state)
+        self.game.push_state(state)
         while self.game.running:
             self.game.game_loop()
 
@@ -63,13 +61,7 @@ if __name__ == '__main__':
     menu = Menu(parent=canvas, x=500, y=250, width=400, bg_color=(100, 100, 100), height=50,
                 options=["Wela", "Ciao", "Salve"])
 
-    image2 = pygame.image.load(os.path.join(g.base_dir, "Assets/sprites/ui", 'settings.png')).convert_alpha()
-    # image2 = pygame.image.load(os.path.join(g.base_dir, "Assets/sprites/ui", 'Open Menu.png'))
-    settings_images = []
-    for i in range(8):
-        image = pygame.image.load(os.path.join(g.base_dir, "Assets/sprites/ui", f"settings{i}.png")).convert_alpha()
-        settings_images.append(image)
-    settings_images.insert(0, image2)
+    settings_images = g.assets.images(["sprites/ui/settings.png"] + [f"sprites/ui/settings{i}.png" for i in range(8)])
     img_button = ImageButton(parent=canvas, x=100, y=300, width=100, height=100, hover_animation=settings_images,
                              animation_fps=30)
 